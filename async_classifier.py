@@ -0,0 +1,219 @@
+import asyncio
+import random
+import time
+
+from config import Classification
+
+# Default limits for concurrent classification
+CONCURRENCY = 8
+RATE_LIMIT = None
+RETRIES = 3
+BACKOFF = 1.0
+
+class RateLimiter():
+    """
+    Spaces out LLM requests so that no more than `rate` requests start per second.
+
+    Attributes:
+    - interval: The minimum number of seconds between two request starts.
+    """
+    def __init__(self, rate):
+        """
+        Initializes the rate limiter.
+
+        Parameters:
+        - rate: The maximum number of requests started per second.
+        """
+        self.interval = 1.0 / rate
+        self._next_start = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """
+        Waits until the next request is allowed to start.
+        """
+        async with self._lock:
+            now = asyncio.get_running_loop().time()
+            wait = self._next_start - now
+            self._next_start = max(now, self._next_start) + self.interval
+
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+async def classify_with_retries(llm, selection, limiter=None, retries=RETRIES, backoff=BACKOFF):
+    """
+    Classifies a selection, retrying failed requests with exponential backoff.
+
+    Parameters:
+    - llm: The LLM object used for the classification.
+    - selection: The selection text to classify.
+    - limiter: An optional RateLimiter acquired before every request.
+    - retries: The number of retries after the first failed attempt.
+    - backoff: The delay in seconds before the first retry; it doubles (with jitter) on every retry.
+
+    Returns:
+    The Classification of the selection.
+
+    Raises:
+    - Exception: The error of the last attempt, once all retries have failed.
+    """
+    for attempt in range(retries + 1):
+        if limiter is not None:
+            await limiter.acquire()
+        try:
+            return await llm.aclassify(selection)
+        except Exception:
+            if attempt == retries:
+                raise
+            await asyncio.sleep(backoff * 2 ** attempt * (1 + random.random() / 2))
+
+async def aclassify_selections(llm, selections, concurrency=CONCURRENCY, rate_limit=RATE_LIMIT, retries=RETRIES, backoff=BACKOFF):
+    """
+    Classifies selection texts concurrently.
+
+    A failure only affects its own selection: as in LLM.run_llm, the error is printed and the
+    other selections continue.
+
+    Parameters:
+    - llm: The LLM object used for the classification.
+    - selections: The selection texts to classify.
+    - concurrency: The maximum number of requests in flight at once.
+    - rate_limit: The maximum number of requests started per second, or None for no limit.
+    - retries: The number of retries of a failed request.
+    - backoff: The delay in seconds before the first retry.
+
+    Returns:
+    A list with the Classification of each selection, or None where it failed, in the order given.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    limiter = RateLimiter(rate_limit) if rate_limit else None
+
+    async def classify_selection(selection):
+        async with semaphore:
+            try:
+                return await classify_with_retries(llm, selection, limiter, retries, backoff)
+            except Exception as e:
+                print(f"Error: {e}")
+                return None
+
+    return await asyncio.gather(*[classify_selection(selection) for selection in selections])
+
+async def aclassify_bets(llm, bet_outputs, concurrency=CONCURRENCY, rate_limit=RATE_LIMIT, retries=RETRIES, backoff=BACKOFF):
+    """
+    Classifies the processed bets concurrently.
+
+    A bet whose classification fails is returned without one, as in LLM.run_llm.
+
+    Parameters:
+    - llm: The LLM object used for the classification.
+    - bet_outputs: The processed bet dictionaries.
+    - concurrency, rate_limit, retries, backoff: As for aclassify_selections.
+
+    Returns:
+    The updated bet dictionaries, in the order they were given.
+    """
+    selections = [bet_output['selection'] for bet_output in bet_outputs]
+    outputs = await aclassify_selections(llm, selections, concurrency, rate_limit, retries, backoff)
+
+    for bet_output, output in zip(bet_outputs, outputs):
+        if output is not None:
+            llm.apply_classification(bet_output, output)
+
+    return bet_outputs
+
+def classify_selections(llm, selections, concurrency=CONCURRENCY, rate_limit=RATE_LIMIT, retries=RETRIES, backoff=BACKOFF):
+    """
+    Classifies selection texts concurrently from synchronous code.
+
+    Parameters are the same as for aclassify_selections.
+
+    Returns:
+    A list with the Classification of each selection, or None where it failed, in the order given.
+    """
+    return asyncio.run(aclassify_selections(llm, selections, concurrency, rate_limit, retries, backoff))
+
+def classify_bets(llm, bet_outputs, concurrency=CONCURRENCY, rate_limit=RATE_LIMIT, retries=RETRIES, backoff=BACKOFF):
+    """
+    Classifies the processed bets concurrently from synchronous code.
+
+    Parameters are the same as for aclassify_bets.
+
+    Returns:
+    The updated bet dictionaries, in the order they were given.
+    """
+    return asyncio.run(aclassify_bets(llm, bet_outputs, concurrency, rate_limit, retries, backoff))
+
+class StubChain():
+    """
+    A local stand-in for the OpenAI chain, used to benchmark and test classification offline.
+
+    It answers every request with the same classification after a fixed latency and can fail a
+    share of the requests, or every request for some selections, to exercise the retry and error paths.
+
+    Attributes:
+    - latency: The number of seconds each request takes.
+    - failure_rate: The probability that a request raises an error.
+    - failing_inputs: The selection texts whose requests always raise an error.
+    - calls: The number of requests received.
+    - in_flight: The number of asynchronous requests being answered.
+    - max_in_flight: The largest number of asynchronous requests answered at once.
+    """
+    def __init__(self, latency=0.05, failure_rate=0.0, sport='Unknown', bet_type='Unknown', failing_inputs=()):
+        """
+        Initializes the stub chain.
+
+        Parameters:
+        - latency: The number of seconds each request takes.
+        - failure_rate: The probability that a request raises an error.
+        - sport: The sport returned for every request.
+        - bet_type: The bet type returned for every request.
+        - failing_inputs: The selection texts whose requests always raise an error.
+        """
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.failing_inputs = set(failing_inputs)
+        self.output = Classification(sport=sport, bet_type=bet_type)
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def _answer(self, inputs):
+        self.calls += 1
+        if inputs['input'] in self.failing_inputs or random.random() < self.failure_rate:
+            raise RuntimeError("Stub model error")
+        return self.output
+
+    def invoke(self, inputs):
+        time.sleep(self.latency)
+        return self._answer(inputs)
+
+    async def ainvoke(self, inputs):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency)
+        finally:
+            self.in_flight -= 1
+        return self._answer(inputs)
+
+if __name__ == '__main__':
+    import contextlib
+    import io
+
+    from config import LLM
+
+    # compare serial and concurrent classification of 200 bets against the stub model
+    bets = [{'selection': f"Selection {i}", 'bet_type': ''} for i in range(200)]
+    llm = LLM(chain=StubChain(latency=0.02))
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        [llm.run_llm(dict(bet)) for bet in bets]
+        serial = time.perf_counter() - start
+
+        start = time.perf_counter()
+        classify_bets(llm, [dict(bet) for bet in bets], concurrency=CONCURRENCY)
+        concurrent = time.perf_counter() - start
+
+    print(f"serial: {len(bets) / serial:.1f} bets/sec")
+    print(f"concurrent ({CONCURRENCY}): {len(bets) / concurrent:.1f} bets/sec")
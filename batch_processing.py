@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+
+from bet_amounts import NUMBER_PATTERN
+from bet_analytics import implied_probability
+from bet_store import to_odds
+
+def details_frame(all_bet_details, fields):
+    """
+    Collects fields of the extracted bets into a DataFrame, one row per bet.
+
+    Parameters:
+    - all_bet_details: The extracted details of the bets.
+    - fields: The names of the fields to collect.
+
+    Returns:
+    A DataFrame with one object column per field.
+    """
+    return pd.DataFrame({field: [bet_details[field] for bet_details in all_bet_details] for field in fields}, dtype=object)
+
+def first_numbers(strings, field):
+    """
+    Extracts the first dollar amount or percentage of every string, the vectorized form of extract_numbers(string)[0].
+
+    Parameters:
+    - strings: A Series of strings (e.g., "Wager $6.00").
+    - field: The name of the field, used in the error message.
+
+    Returns:
+    A Series with the number of each string, as text (e.g., '6.00').
+
+    Raises:
+    - ValueError: If a string has no number, where the per-bet path fails with an IndexError.
+    """
+    numbers = strings.str.extract('(' + NUMBER_PATTERN + ')', expand=False)
+    if numbers.isna().any():
+        raise ValueError(f"No amount in the '{field}' of bet {int(numbers.isna().to_numpy().argmax())}")
+    return numbers
+
+def settlement_status(wagers, returns, open_bets, cash_outs=True):
+    """
+    Derives the settlement status of every bet from whether it was open, its wager and its return.
+
+    Parameters:
+    - wagers, returns: Arrays of the wagers and returns as floats.
+    - open_bets: Whether each bet was still open when it was exported (see BetExtractor.is_open).
+    - cash_outs: Whether a return equal to the wager marks a cashed out (voided) bet, as for Bet365.
+
+    Returns:
+    An array of 'P' (pending), 'N' (lost), 'R' (cashed out) or 'Y' (won), checked in that order
+    like process_extracted_details does.
+    """
+    conditions = [np.asarray(open_bets, dtype=bool), returns == 0]
+    choices = ['P', 'N']
+    if cash_outs:
+        conditions.append(wagers == returns)
+        choices.append('R')
+    return np.select(conditions, choices, default='Y')
+
+def typed_frame(bet_ids, dates, date_format, wagers, returns, odds, bet_status):
+    """
+    Builds the typed columns of a batch of processed bets.
+
+    Parameters:
+    - bet_ids: The IDs of the bets.
+    - dates: The dates of the bets as text, in the bookmaker's date_format.
+    - date_format: The format of the dates.
+    - wagers, returns: The wagers and returns as floats.
+    - odds: The American odds as text.
+    - bet_status: The settlement status of the bets.
+
+    Returns:
+    A DataFrame with the bet_id, date (datetime64), stake, returned, odds (floats), bet_status and
+    implied_probability of each bet (see bet_analytics.implied_probability), with NaN where the
+    odds are missing.
+    """
+    return pd.DataFrame({
+        'bet_id': bet_ids,
+        'date': pd.to_datetime(pd.Series(dates), format=date_format),
+        'stake': wagers,
+        'returned': returns,
+        'odds': np.array([to_odds(value) for value in odds], dtype=float),
+        'bet_status': bet_status,
+        'implied_probability': np.array([implied_probability(value) for value in odds], dtype=float),
+    })
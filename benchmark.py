@@ -0,0 +1,240 @@
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from async_classifier import StubChain
+from bet_stream import iter_bet_summaries
+from bookmaker_registry import BUILTIN_EXTRACTORS, create_extractor
+from config import LLM, openai_chain
+from stub_model_server import start_stub_server
+from synthetic_exports import write_export
+import run_bet_extractor
+
+# The export sizes benchmarked by default
+SIZES = [10, 100, 1000, 10000, 100000]
+
+# The pipeline stages timed for every run, in order
+STAGES = ['parse', 'extract', 'process', 'classify', 'write']
+
+# The packages of the LLM client, which the extraction-only path must never import
+LLM_MODULES = ['langchain_core', 'langchain_openai', 'openai', 'pydantic']
+
+# Imports the runner in a fresh interpreter and reports the import time and the LLM packages it loaded
+IMPORT_CHECK = """
+import json, sys, time
+start = time.perf_counter()
+import run_bet_extractor
+seconds = time.perf_counter() - start
+print(json.dumps({'seconds': seconds, 'loaded': sorted({name.split('.')[0] for name in sys.modules} & set(%r))}))
+"""
+
+def peak_rss_mb():
+    """
+    Returns the peak resident set size of the current process in MB.
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def run_benchmark(bookmaker, bets, parser_backend='bs4', llm_latency=0.0, seed=0, llm_base_url=None):
+    """
+    Runs the pipeline on a synthetic export and times each stage. This runs in its own process,
+    so the peak RSS belongs to this run only.
+
+    Parameters:
+    - bookmaker: Either 'bet365' or 'fanduel'.
+    - bets: The number of bets in the synthetic export.
+    - parser_backend: The html parser backend - either 'bs4' or 'lxml'.
+    - llm_latency: The latency in seconds of the stub LLM.
+    - seed: The seed of the synthetic export.
+    - llm_base_url: The base URL of a stand-in server (see stub_model_server.py) to classify through
+                    with the OpenAI client, or None to use the stub LLM.
+
+    Returns:
+    A dictionary with the bookmaker, number of bets, backend, time per stage, bets/sec and peak RSS.
+    """
+    bet_extractor = create_extractor(bookmaker, parser_backend)
+    args = run_bet_extractor.parse_args([])
+    timings = {}
+
+    with tempfile.TemporaryDirectory() as directory:
+        html_file = os.path.join(directory, 'export.html')
+        write_export(html_file, bookmaker, bets, seed)
+
+        # the pipeline prints progress for every bet, which would dominate the timings
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            bet_summaries = list(iter_bet_summaries(html_file, bet_extractor.summary_class, bet_extractor.summary_tag, bet_extractor.backend))
+            timings['parse'] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            all_bet_details = [bet_extractor.extract_bet_details(bet_summary) for bet_summary in bet_summaries]
+            timings['extract'] = time.perf_counter() - start
+            del bet_summaries
+
+            start = time.perf_counter()
+            processed = {bookmaker: [(bet_extractor.process_extracted_details(bet_details), bet_details) for bet_details in all_bet_details]}
+            timings['process'] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            chain = StubChain(latency=llm_latency) if llm_base_url is None else openai_chain(llm_base_url)
+            run_bet_extractor.classify(processed, args, LLM(chain=chain))
+            timings['classify'] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            bet_outputs = [bet_output for bet_output, bet_details in processed[bookmaker]]
+            run_bet_extractor.write_csv(os.path.join(directory, 'processed.csv'), bet_outputs, list(run_bet_extractor.TRACKER_COLUMNS.values()))
+            timings['write'] = time.perf_counter() - start
+
+    total = sum(timings.values())
+    return {
+        'bookmaker': bookmaker,
+        'bets': bets,
+        'parser_backend': parser_backend,
+        'stages': timings,
+        'total': total,
+        'bets_per_sec': bets / total if total else 0.0,
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+def measure_startup(repeats=5, bets=10, seed=0):
+    """
+    Measures the startup cost of the extraction-only path, in a fresh interpreter every time as in
+    a cron job: the time to import run_bet_extractor and the time of a whole
+    `run_bet_extractor.py --extract-only` run on a small export.
+
+    Parameters:
+    - repeats: The number of runs; the medians are reported.
+    - bets: The number of bets in the synthetic export of each bookmaker.
+    - seed: The seed of the synthetic exports.
+
+    Returns:
+    A dictionary with the median 'import_seconds' and 'run_seconds', and the LLM packages that
+    were loaded by the import ('llm_modules', which should be empty).
+    """
+    root = os.path.dirname(os.path.abspath(__file__))
+    import_times = []
+    run_times = []
+    loaded = set()
+
+    with tempfile.TemporaryDirectory() as directory:
+        for bookmaker in BUILTIN_EXTRACTORS:
+            write_export(os.path.join(directory, f'{bookmaker}.html'), bookmaker, bets, seed)
+        command = [sys.executable, os.path.join(root, 'run_bet_extractor.py'), directory, '--extract-only',
+                   '--no-ledger', '--no-fragment-cache', '--workers', '1']
+
+        for _ in range(repeats):
+            output = subprocess.run([sys.executable, '-c', IMPORT_CHECK % LLM_MODULES], cwd=root,
+                                    capture_output=True, text=True, check=True).stdout
+            result = json.loads(output)
+            import_times.append(result['seconds'])
+            loaded.update(result['loaded'])
+
+            # the raw csv files are written to the working directory
+            start = time.perf_counter()
+            subprocess.run(command, cwd=directory, stdout=subprocess.DEVNULL, check=True)
+            run_times.append(time.perf_counter() - start)
+
+    return {
+        'import_seconds': statistics.median(import_times),
+        'run_seconds': statistics.median(run_times),
+        'llm_modules': sorted(loaded),
+    }
+
+def run_isolated(*arguments):
+    """
+    Runs a benchmark in a fresh process and returns its result.
+    """
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as executor:
+        return executor.submit(run_benchmark, *arguments).result()
+
+def format_result(result):
+    stages = ' '.join(f"{stage}={result['stages'][stage]:.3f}s" for stage in STAGES)
+    return (f"{result['bookmaker']:>8} {result['bets']:>7} bets [{result['parser_backend']}]: "
+            f"{result['bets_per_sec']:>9.1f} bets/sec, peak RSS {result['peak_rss_mb']:.1f} MB, {stages}")
+
+def find_regressions(results, baseline, tolerance):
+    """
+    Compares the results with a saved baseline.
+
+    Parameters:
+    - results: The results of this run.
+    - baseline: The results of an earlier run.
+    - tolerance: The allowed relative slowdown in bets/sec (e.g., 0.2 for 20%).
+
+    Returns:
+    A message for every benchmark that is slower than the baseline by more than the tolerance.
+    """
+    expected = {(result['bookmaker'], result['bets'], result['parser_backend']): result for result in baseline}
+    regressions = []
+    for result in results:
+        key = (result['bookmaker'], result['bets'], result['parser_backend'])
+        if key in expected and result['bets_per_sec'] < expected[key]['bets_per_sec'] * (1 - tolerance):
+            regressions.append(f"{key}: {result['bets_per_sec']:.1f} bets/sec, baseline {expected[key]['bets_per_sec']:.1f}")
+    return regressions
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark the extraction pipeline on synthetic exports.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES, help="number of bets per export (default: %(default)s)")
+    parser.add_argument('--bookmakers', nargs='+', choices=list(BUILTIN_EXTRACTORS), default=list(BUILTIN_EXTRACTORS))
+    parser.add_argument('--parser-backends', nargs='+', choices=['bs4', 'lxml'], default=['bs4'])
+    parser.add_argument('--llm-latency', type=float, default=0.0, help="latency in seconds of the stub LLM (default: %(default)s)")
+    parser.add_argument('--llm-server', action='store_true', help="classify through the OpenAI client and a local stand-in server (see stub_model_server.py) instead of the stub LLM")
+    parser.add_argument('--llm-error-rate', type=float, default=0.0, help="with --llm-server, share of the requests that fail (default: %(default)s)")
+    parser.add_argument('--output', help="save the results to this json file")
+    parser.add_argument('--baseline', help="compare the results with this json file and exit with an error on regressions")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="allowed relative slowdown against the baseline (default: %(default)s)")
+    parser.add_argument('--startup', action='store_true', help="only measure the startup time of the extraction-only path")
+    parser.add_argument('--max-startup', type=float, help="with --startup, exit with an error if a run takes longer than this many seconds or loads the LLM client")
+    args = parser.parse_args()
+
+    if args.startup:
+        startup = measure_startup()
+        print(f"startup: import {startup['import_seconds']:.3f}s, extraction-only run {startup['run_seconds']:.3f}s, "
+              f"LLM packages loaded: {', '.join(startup['llm_modules']) or 'none'}")
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump(startup, f, indent=2)
+        if args.max_startup is not None and (startup['run_seconds'] > args.max_startup or startup['llm_modules']):
+            print("Regression: the extraction-only path starts too slowly")
+            sys.exit(1)
+        sys.exit(0)
+
+    llm_base_url = None
+    if args.llm_server:
+        server = start_stub_server(latency=args.llm_latency, error_rate=args.llm_error_rate, seed=0)
+        llm_base_url = server.url
+
+    results = []
+    for bookmaker in args.bookmakers:
+        for parser_backend in args.parser_backends:
+            for bets in args.sizes:
+                result = run_isolated(bookmaker, bets, parser_backend, args.llm_latency, 0, llm_base_url)
+                print(format_result(result))
+                results.append(result)
+
+    if args.llm_server:
+        print(f"stand-in server: {server.model.stats()}")
+        server.shutdown()
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = find_regressions(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"Regression: {regression}")
+        if regressions:
+            sys.exit(1)
@@ -0,0 +1,12 @@
+import re
+
+# Helper functions for extracting numbers from strings
+# dollar amounts and percentages
+NUMBER_PATTERN = r'(?<=\$)\d+(?:\.\d+)?|(?<!\d)\d+(?:\.\d+)?(?=%)'
+
+def extract_numbers(string):
+    if string is None:
+        return None
+    
+    numbers = re.findall(NUMBER_PATTERN, string)
+    return numbers
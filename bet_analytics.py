@@ -0,0 +1,271 @@
+import json
+import os
+from decimal import Decimal
+
+from bet_store import to_decimal, to_odds
+
+# Default location of the saved analytics
+ANALYTICS_FILE = "analytics.json"
+
+# The dimensions the bets are grouped by
+DIMENSIONS = ['bookmaker', 'sport', 'bet_type', 'boost', 'month']
+
+# The totals kept for every group: amounts of money as Decimals, counts as integers, and the sum of
+# the implied probabilities of the settled bets as a float
+MONEY_FIELDS = ['staked', 'profit', 'bonus_staked', 'bonus_profit']
+COUNT_FIELDS = ['bets', 'pending', 'settled', 'wins', 'losses', 'voids', 'priced']
+TOTAL_FIELDS = COUNT_FIELDS + MONEY_FIELDS + ['implied_probability_sum']
+
+ZERO = Decimal('0.00')
+CENT = Decimal('0.01')
+
+def decimal_odds(odds):
+    """
+    Converts American odds such as '+150' or '-110' to decimal odds (2.5 and 1.909...), or None if they are missing.
+    """
+    american = to_odds(odds)
+    if not american:
+        return None
+    return 1 + american / 100 if american > 0 else 1 + 100 / -american
+
+def implied_probability(odds):
+    """
+    Returns the probability implied by American odds, or None if they are missing.
+    """
+    decimal = decimal_odds(odds)
+    return 1 / decimal if decimal else None
+
+def winnings(stake, odds):
+    """
+    Returns what a winning bet pays on top of its stake, from its American odds, or None if the odds are missing.
+    """
+    american = to_odds(odds)
+    if not american or stake is None:
+        return None
+    ratio = Decimal(american) / 100 if american > 0 else Decimal(100) / Decimal(-american)
+    return (stake * ratio).quantize(CENT)
+
+def realized_profit(stake, bet_status, odds, bonus_bet=False, returned=None):
+    """
+    Computes the realized profit of a bet.
+
+    Parameters:
+    - stake: The stake as a Decimal.
+    - bet_status: 'Y' (won), 'N' (lost), 'R' (returned, e.g. cashed out for the stake) or 'P' (pending).
+    - odds: The American odds of the bet.
+    - bonus_bet: Whether the stake was a bonus bet, which costs nothing when lost and only pays the winnings when won.
+    - returned: The amount returned as a Decimal, if the export shows it; otherwise a win is valued from the odds.
+
+    Returns:
+    The profit as a Decimal, or None if the bet is pending or a win cannot be valued.
+    """
+    if bet_status == 'P' or stake is None:
+        return None
+    if bet_status == 'R':
+        return ZERO
+    if bet_status == 'N':
+        return ZERO if bonus_bet else -stake
+    if bonus_bet or returned is None:
+        return winnings(stake, odds)
+    return returned - stake
+
+def bet_contribution(bookmaker, bet_output, date, returned=None):
+    """
+    Computes what a processed bet adds to the totals of its groups.
+
+    Parameters:
+    - bookmaker: The bookmaker of the bet.
+    - bet_output: The processed (and classified) bet, as returned by process_extracted_details.
+    - date: The date of the bet as a datetime.
+    - returned: The amount returned, as a number string (see typed_details), or None if it is not known.
+
+    Returns:
+    A dictionary with the group of the bet in every dimension and its value for every total.
+    """
+    stake = to_decimal(bet_output['wager'])
+    bonus_bet = bet_output['bonus_bet'] == 'Y'
+    status = bet_output['bet_status']
+    profit = realized_profit(stake, status, bet_output['odds'], bonus_bet, to_decimal(returned))
+    probability = implied_probability(bet_output['odds'])
+    settled = profit is not None
+
+    return {
+        'bookmaker': bookmaker,
+        'sport': bet_output.get('sport') or 'Unclassified',
+        'bet_type': bet_output['bet_type'] or 'Unclassified',
+        'boost': 'Boost' if bet_output['boost'] == 'Boost' else 'No boost',
+        'month': date.strftime('%Y-%m'),
+        'bets': 1,
+        'pending': int(status == 'P'),
+        'settled': int(settled),
+        'wins': int(settled and status == 'Y'),
+        'losses': int(settled and status == 'N'),
+        'voids': int(settled and status == 'R'),
+        'priced': int(settled and probability is not None),
+        'staked': stake if settled and not bonus_bet else ZERO,
+        'profit': profit if settled and not bonus_bet else ZERO,
+        'bonus_staked': stake if settled and bonus_bet else ZERO,
+        'bonus_profit': profit if settled and bonus_bet else ZERO,
+        'implied_probability_sum': probability if settled and probability is not None else 0.0,
+    }
+
+def new_totals():
+    return {field: ZERO if field in MONEY_FIELDS else 0.0 if field == 'implied_probability_sum' else 0 for field in TOTAL_FIELDS}
+
+def report(totals):
+    """
+    Derives the ratios of a group from its totals.
+
+    Returns:
+    The totals, plus the ROI (profit / staked), the win rate of the decided bets, the average
+    implied probability of the priced bets, the edge (win rate minus implied probability) and the
+    bonus-bet conversion (what the settled bonus bets won / their stakes), each None when undefined.
+    """
+    decided = totals['wins'] + totals['losses']
+    win_rate = totals['wins'] / decided if decided else None
+    average_probability = totals['implied_probability_sum'] / totals['priced'] if totals['priced'] else None
+    return dict(
+        totals,
+        roi=float(totals['profit'] / totals['staked']) if totals['staked'] else None,
+        win_rate=win_rate,
+        average_implied_probability=average_probability,
+        edge=win_rate - average_probability if win_rate is not None and average_probability is not None else None,
+        bonus_conversion=float(totals['bonus_profit'] / totals['bonus_staked']) if totals['bonus_staked'] else None,
+    )
+
+class BankrollAnalytics():
+    """
+    Running totals of the stakes, profit and results of processed bets, grouped by bookmaker, sport,
+    bet type, boost and month.
+
+    Every total is a plain sum, so a new bet is added to the totals of its groups instead of the
+    aggregates being recomputed over the whole history. The contribution of every bet is kept, so a
+    bet that comes back with a new status (e.g., a pending bet that settled) first has its old
+    contribution taken out. Ratios such as the ROI are derived from the totals when reported.
+
+    Attributes:
+    - bets: The contribution of every bet (see bet_contribution), keyed by (bookmaker, bet_id).
+    - total: The totals of all the bets.
+    - groups: The totals of every group, by dimension and then by group.
+    """
+    def __init__(self):
+        self.bets = {}
+        self.total = new_totals()
+        self.groups = {dimension: {} for dimension in DIMENSIONS}
+
+    def add(self, bookmaker, bet_output, date, returned=None):
+        """
+        Adds a bet to the totals, replacing its earlier contribution if it was already added.
+
+        Parameters:
+        - bookmaker, bet_output, date, returned: As for bet_contribution.
+
+        Returns:
+        Whether the totals changed.
+        """
+        key = (bookmaker, bet_output['bet_id'])
+        contribution = bet_contribution(bookmaker, bet_output, date, returned)
+        previous = self.bets.get(key)
+        if previous == contribution:
+            return False
+
+        if previous is not None:
+            self.apply(previous, -1)
+        self.bets[key] = contribution
+        self.apply(contribution, 1)
+        return True
+
+    def add_bets(self, bookmaker, bets, bet_extractor, bet_date):
+        """
+        Adds processed bets, with the amount returned taken from their extracted details.
+
+        Parameters:
+        - bookmaker: The bookmaker of the bets.
+        - bets: A list of (bet_output, bet_details) pairs.
+        - bet_extractor: The extractor of the bookmaker, whose typed_details gives the amount returned.
+        - bet_date: A function returning the date of a processed bet of the bookmaker (see run_bet_extractor.bet_date).
+
+        Returns:
+        The number of bets that changed the totals.
+        """
+        changed = 0
+        for bet_output, bet_details in bets:
+            returned = bet_extractor.typed_details(bet_details)['return']
+            changed += self.add(bookmaker, bet_output, bet_date(bookmaker, bet_output), returned)
+        return changed
+
+    def apply(self, contribution, sign):
+        for dimension in DIMENSIONS:
+            group = contribution[dimension]
+            groups = self.groups[dimension]
+            totals = groups.setdefault(group, new_totals())
+            for field in TOTAL_FIELDS:
+                totals[field] += sign * contribution[field]
+            if totals['bets'] == 0:
+                del groups[group]
+        for field in TOTAL_FIELDS:
+            self.total[field] += sign * contribution[field]
+
+    def summary(self):
+        """
+        Returns the report of all the bets and of every group (see report).
+
+        Returns:
+        A dictionary with the 'total' report and, for every dimension, the reports of its groups in order.
+        """
+        summary = {'total': report(self.total)}
+        for dimension in DIMENSIONS:
+            summary[dimension] = {group: report(totals) for group, totals in sorted(self.groups[dimension].items())}
+        return summary
+
+    def rows(self):
+        """
+        Returns one row per group, starting with the total: the dimension, the group and the values of REPORT_COLUMNS.
+        """
+        rows = [['total', '', *[report(self.total)[column] for column in REPORT_COLUMNS]]]
+        for dimension in DIMENSIONS:
+            for group, totals in sorted(self.groups[dimension].items()):
+                values = report(totals)
+                rows.append([dimension, group, *[values[column] for column in REPORT_COLUMNS]])
+        return rows
+
+    def save(self, path=ANALYTICS_FILE):
+        """
+        Saves the contributions and totals to a JSON file (replaced atomically), so the next run carries on from them.
+        """
+        state = {
+            'bets': [[bookmaker, bet_id, contribution] for (bookmaker, bet_id), contribution in self.bets.items()],
+            'total': self.total,
+            'groups': self.groups,
+        }
+        temporary_path = path + '.tmp'
+        with open(temporary_path, 'w') as file:
+            json.dump(state, file, default=str)
+        os.replace(temporary_path, path)
+
+    @classmethod
+    def load(cls, path=ANALYTICS_FILE):
+        """
+        Loads the analytics saved by save, or starts empty if the file does not exist.
+        """
+        analytics = cls()
+        if not os.path.exists(path):
+            return analytics
+
+        with open(path) as file:
+            state = json.load(file)
+        analytics.bets = {(bookmaker, bet_id): parse_totals(contribution) for bookmaker, bet_id, contribution in state['bets']}
+        analytics.total = parse_totals(state['total'])
+        analytics.groups = {dimension: {group: parse_totals(totals) for group, totals in state['groups'].get(dimension, {}).items()}
+                            for dimension in DIMENSIONS}
+        return analytics
+
+def parse_totals(values):
+    """
+    Restores the Decimal amounts of totals read from JSON.
+    """
+    return {field: Decimal(value) if field in MONEY_FIELDS else value for field, value in values.items()}
+
+# The columns of the rows returned by BankrollAnalytics.rows, after the dimension and group
+REPORT_COLUMNS = ['bets', 'pending', 'settled', 'wins', 'losses', 'voids', 'staked', 'profit', 'roi', 'win_rate',
+                  'average_implied_probability', 'edge', 'bonus_staked', 'bonus_profit', 'bonus_conversion']
@@ -1,445 +1,939 @@
-import re
-
-from config import extract_numbers
-from abc import ABC, abstractmethod
-
-# Abstract class for bet extractors
-class BetExtractor(ABC):
-    """
-    This abstract class defines the structure for bet extractors.
-    Bet extractors are responsible for extracting bet details from various sources.
-    """
-    @abstractmethod
-    def __init__(self):
-        """
-        Initializes the bet extractor. This method is abstract and must be implemented by subclasses.
-        """
-        pass
-
-    @abstractmethod
-    def extract_bet_details(self, bet_summary):
-        """
-        Extracts bet details from a bet summary.
-
-        Parameters:
-        - bet_summary: The summary of the bet from which details are to be extracted.
-
-        This method is abstract and must be implemented by subclasses.
-        """
-        pass
-    
-    @abstractmethod
-    def process_extracted_details(self, bet_details):
-        """
-        Processes the extracted bet details.
-
-        Parameters:
-        - bet_details: The details of the bet that have been extracted.
-
-        This method is abstract and must be implemented by subclasses.
-        """
-        pass
-    
-class Bet365(BetExtractor):
-    """
-    A concrete implementation of BetExtractor for the Bet365 betting platform.
-    """
-    def __init__(self):
-        """
-        Initializes the Bet365 bet extractor.
-        """
-        pass
-    
-    def extract_bet_details(self, bet_summary):
-        """
-        Extracts bet details from a Bet365 bet summary.
-
-        Parameters:
-        - bet_summary: The summary of the bet from Bet365 from which details are to be extracted.
-
-        Returns:
-        A dictionary containing the extracted bet details.
-        """
-        bet_details = {}
-            
-        # Extract date and time from the bet summary
-        date_and_time = bet_summary.find('div', class_='h-BetSummary_DateAndTime').text.strip()
-        bet_details['date_and_time'] = date_and_time
-        
-        # Placeholder for odds, to be extracted or calculated
-        odds_holder = ''
-        
-        # Check for multiple selections in the bet, indicating a parlay bet
-        multiple_selections = bet_summary.find('div', class_='h-BetBuilderMultipleSelections')
-        if multiple_selections:
-            # Extract the bet type from the header container of multiple selections
-            bet_type = multiple_selections.find('div', class_='h-BetBuilderMultipleSelections_HeaderContainer').div.text.strip()
-            # Extract all selections within the bet and their labels
-            selections = multiple_selections.find_all('div', class_='h-BetBuilderSelection_Container')
-            selection_labels = [selection.find('div', class_='h-BetBuilderSelection_SelectionLabel').text.strip() for selection in selections]
-            
-            # Extract odds for each selection from the odds label container
-            odds_elements = multiple_selections.find('div', class_='h-BetBuilderMultipleSelections_OddsLabel').find_all('span')        
-            odds_holder = [float(element.text.strip()) for element in odds_elements]
-            
-            odds = max(odds_elements, key=lambda x: float(x.text.strip())).text.strip()
-                    
-            fixture_label = multiple_selections.find('div', class_='h-BetBuilderMultipleSelections_FixtureLabel').text.strip()
-        else:
-            bet_type = "Single"
-            selection = bet_summary.find('div', class_='h-BetSelection_Container')
-            selection_labels = [selection.find('div', class_='h-BetSelection_Name').text.strip()]
-            odds = selection.find('div', class_='h-BetSelection_Odds').text.strip()
-            fixture_label = ""
-        
-        # Add extracted bet type and selections to the bet details dictionary
-        bet_details['bet_type'] = bet_type
-        bet_details['selection_labels'] = selection_labels
-        # Add extracted odds to the bet details dictionary
-        bet_details['odds'] = odds
-        bet_details['fixture_label'] = fixture_label
-        bet_details['odds_holder'] = odds_holder
-        
-        # Extract stake and return information
-        stake = bet_summary.find('div', class_='h-StakeDescription_Text').text.strip()
-        bet_details['stake'] = stake#extract_numbers(stake)
-        
-        # Extract the wager and return amount
-        try:
-            # this is not a bonus bet
-            wager = bet_summary.find('div', class_='h-StakeReturnSection_StakeContainer').text.strip()
-            ret = bet_summary.find('div', class_='h-StakeReturnSection_ReturnText').text.strip()
-            bonus_bet = False
-        except:
-            # this is a bonus bet
-            wager = bet_summary.find('div', class_='h-StakeReturnSectionIPOffer_StakeDetails').text.strip()
-            ret = bet_summary.find('div', class_='h-StakeReturnSectionIPOffer_ReturnContainer').text.strip()
-            bonus_bet = True        
-                
-        # Check for super boost
-        boost = bet_summary.find('div', class_='h-WinningsBoostBadge_BoostLabel') or bet_summary.find('div', class_='h-BetBoostLabel h-BetBoostLabel-superboost')
-        if boost:
-            # strip text and replace line breaks with a space
-            bet_details['boost'] = boost.text.strip().replace('\n', ' ')
-        else:
-            bet_details['boost'] = None
-            
-        bet_details['wager'] = wager
-        bet_details['return'] = ret
-        bet_details['bonus_bet'] = bonus_bet
-            
-        return bet_details
-    
-    def process_extracted_details(self, bet_details):
-        """
-        Processes the extracted bet details specific to Bet365.
-
-        This method takes the raw bet details extracted from the Bet365 bet summary,
-        and processes them to format or calculate additional information that may be
-        necessary for further use, such as calculating potential winnings or formatting
-        the date and time.
-
-        Parameters:
-        - bet_details: A dictionary containing the details of the bet extracted from the Bet365 summary.
-
-        Returns:
-        A dictionary with the processed bet details, which may include additional keys
-        for calculated or formatted information.
-        """
-        bet_output = {}
-        boost = ''
-    
-        # convert the date format from "dd/mm/yyyy hh:mm" to "yyyy-mm-dd hh:mm"
-        date_time = bet_details['date_and_time']
-        date_time = date_time.split(' ')
-        date = date_time[0].split('/')
-        time = date_time[1]
-        date = date[2] + '-' + date[0] + '-' + date[1]
-        date_time = date + time
-
-        # save just the date
-        bet_output['date'] = date
-        
-        # use the date and time to create a unique bet ID
-        bet_id = date_time.replace(' ', '_')
-        bet_output['bet_id'] = bet_id.replace(':', '').replace('-', '')
-        
-        # set the bookmaker name
-        bookmaker = 'bet365'
-        bet_output['bookmaker'] = bookmaker
-        
-        # set the sport to nothing for now
-        bet_output['sport'] = ''
-        
-        # get the selection labels, and convert the list into a numbered string separated by a line break; if there is only 1 selection, then just use that
-        selection_labels = bet_details['selection_labels']
-        if len(selection_labels) > 1:
-            selection_labels = [str(i+1) + '. ' + selection for i, selection in enumerate(selection_labels)]
-            selection_labels = '\n'.join(selection_labels)
-        else:
-            selection_labels = selection_labels[0]
-            
-        bet_output['selection'] = selection_labels
-        
-        # depending on the selection length, we can set the bet type
-        selection_label_items = len(bet_details['selection_labels'])
-        if selection_label_items == 2:
-            bet_output['bet_type'] = 'Multi Bet - 2 legs'
-        elif selection_label_items == 3:
-            bet_output['bet_type'] = 'Multi Bet - 3 legs'
-        elif selection_label_items >= 4:
-            bet_output['bet_type'] = 'Multi Bet - 4+ legs'
-        else:
-            bet_output['bet_type'] = ''
-            
-        # also check for boost if it's a single leg
-        if bet_details['boost'] and "boost" in bet_details['boost'].lower():
-            boost = 'Boost'
-        
-        bet_output['boost'] = boost
-        
-        # get the stake and extract the number (should be 1 number only)
-        bet_output['wager'] = extract_numbers(bet_details['wager'])[0]
-        
-        # get whether it is a bonus bet or not
-        if bet_details['bonus_bet']:
-            bet_output['bonus_bet'] = 'Y'
-        else:
-            bet_output['bonus_bet'] = 'N'
-        
-        # get the odds and extract the number
-        bet_output['odds'] = bet_details['odds']
-        
-        # get the return and extract the number (should be 1 number only)
-        returned = float(extract_numbers(bet_details['return'])[0])
-        print(bet_output['wager'], returned)
-
-        # if the return is 0, then the bet is a loss. If it is not 0, then the bet is a win. Else, the bet is pending
-        if returned == 0:
-            bet_output['bet_status'] = 'N'
-        # check if the bet was cashed out (i.e., it was voided)
-        elif float(bet_output['wager']) == float(returned):
-            bet_output['bet_status'] = 'R'
-        elif returned > 0:
-            bet_output['bet_status'] = 'Y'
-        else:
-            bet_output['bet_status'] = 'P'
-            
-        # we can use the fixture as is
-        bet_output['fixture'] = bet_details['fixture_label']
-        
-        return bet_output
-    
-class Fanduel(BetExtractor):
-    """
-    A concrete implementation of BetExtractor for the Fanduel betting platform.
-    
-    This class is responsible for extracting and processing bet details specific to the Fanduel platform.
-    It implements the abstract methods defined in the BetExtractor abstract class to provide functionality
-    for initializing the extractor, extracting bet details from a bet summary, and processing those details.
-    """
-    def __init__(self):
-        """
-        Initializes the Fanduel bet extractor.
-        
-        This constructor can be expanded to include initialization of resources or configurations
-        specific to handling Fanduel bet summaries.
-        """
-        pass
-    
-    def extract_bet_details(self, bet_summary):
-        """
-        Extracts bet details from a Fanduel bet summary.
-
-        This method parses the bet summary provided as input to extract relevant details
-        such as the date and time of the bet, the bet type, selections, and odds. The
-        extracted details are returned in a dictionary format.
-
-        Parameters:
-        - bet_summary: The summary of the bet from Fanduel from which details are to be extracted.
-
-        Returns:
-        A dictionary containing the extracted bet details.
-        """
-        bet_details = {}
-    
-        # Extract bet status
-        bet_status = bet_summary['class'][1].split('-')[-1]
-        bet_details['bet_status'] = bet_status
-        
-        # Extract bet type
-        bet_type = bet_summary['class'][3]
-        bet_details['bet_type'] = bet_type
-        
-        # Extract the event name and time
-        event_name = bet_summary.select_one('.eventname')
-        if event_name:
-            bet_details['event_name'] = bet_summary.select_one('.eventname').get_text(strip=True)
-        else:
-            bet_details['event_name'] = None
-        
-        time_status = bet_summary.select_one('.time-player .time') or bet_summary.select_one('.time')
-        if time_status:
-            bet_details['time_status'] = time_status.get_text(strip=True)
-        
-        # Extract leg information
-        legs = []
-        leg_names = bet_summary.select('.leg-name')
-        leg_subs = bet_summary.select('.leginfo-sub .first')
-        
-        for name, sub in zip(leg_names, leg_subs):
-            legs.append({
-                'leg_name': name.get_text(strip=True),
-                'leg_info': sub.get_text(strip=True)
-            })
-        
-        bet_details['legs'] = legs
-        
-        # Extract odds
-        odds = bet_summary.select_one('.leginfo-odds') or bet_summary.select_one('.betodds .value')
-        if odds:
-            bet_details['odds'] = odds.get_text(strip=True)
-        
-        # Extract total wager
-        wager = bet_summary.select_one('.betstake .value span')
-        if wager:
-            bet_details['total_wager'] = wager.get_text(strip=True)
-        
-        # Extract return
-        bet_return = bet_summary.select_one('.betreturn .value span')
-        if bet_return:
-            bet_details['bet_return'] = bet_return.get_text(strip=True)
-        
-        # Extract bet ID
-        bet_id = bet_summary.select_one('.bet-id span:last-child')
-        if bet_id:
-            bet_details['bet_id'] = bet_id.get_text(strip=True)
-        
-        # Extract placed time
-        placed_time = bet_summary.select_one('.time span:last-child')
-        if placed_time:
-            bet_details['placed_time'] = placed_time.get_text(strip=True)
-        
-        # Extract bonus bet information
-        bonus_bet = bet_summary.select_one('.bonus-bets')
-        if bonus_bet:
-            bonus_amount = bonus_bet.select_one('.bonus-amount')
-            bonus_text = bonus_bet.select_one('.bonus-text')
-            if bonus_amount and bonus_text:
-                bet_details['bonus_bet'] = {
-                    'bonus_amount': bonus_amount.get_text(strip=True),
-                    'bonus_text': bonus_text.get_text(strip=True)
-                }
-        else:
-            bet_details['bonus_bet'] = None
-        
-        return bet_details
-    
-    def process_extracted_details(self, bet_details):
-        """
-        Processes the extracted bet details specific to Fanduel.
-
-        This method takes the raw bet details extracted from the Fanduel bet summary,
-        and processes them to format or calculate additional information that may be
-        necessary for further use. This could include formatting the date and time,
-        calculating potential winnings based on odds and stake, or any other processing
-        specific to the Fanduel platform.
-
-        Parameters:
-        - bet_details: A dictionary containing the details of the bet extracted from the Fanduel summary.
-
-        Returns:
-        A dictionary with the processed bet details, which may include additional keys
-        for calculated or formatted information.
-        """
-        bet_output = {}
-        boost = ''
-
-        # store the retrieved bet ID
-        bet_output['bet_id'] = bet_details['bet_id'].strip('#')
-        
-        # get the date and time
-        date_time = bet_details['placed_time']
-        
-        # extract the date from the date and time, parse the date string into a datetime object, and convert the datetime object to the desired format
-        date = date_time.split(' ')[0:3]
-        date = date[1].strip(',') + '-' + date[0] + '-' + date[2]
-        bet_output['date'] = date
-        
-        # set the bookmaker name
-        bookmaker = 'FanDuel'
-        bet_output['bookmaker'] = bookmaker
-            
-        # set the sport to nothing for now
-        bet_output['sport'] = ''
-        
-        # get the selection labels, and convert the list into a numbered string separated by a line break; if there is only 1 selection, then just use that
-        legs = bet_details['legs']
-        if len(legs) > 1:
-            # if there are multiple legs, then extract the leg names and leg info
-            selection_labels = []
-            for leg in legs:
-                leg_name = leg['leg_name']
-                leg_info = leg['leg_info']
-                selection_labels.append(leg_name + ' - ' + leg_info)
-                
-            # Number the selections
-            selection_labels = [str(i+1) + '. ' + selection for i, selection in enumerate(selection_labels)]
-            selection_labels = '\n'.join(selection_labels).strip("\"")
-
-        else:
-            leg_name = legs[0]['leg_name']
-            leg_info = legs[0]['leg_info']
-            
-            # remove all text after a ( in the leg name
-            leg_name = re.sub(r' \(.*\)', '', leg_name).strip()
-                    
-            # also check for boost if it's a single leg
-            if "boost" in leg_info.lower():
-                boost = 'Boost'
-                selection_labels = leg_name
-                # bets that are not boosted have useful information in the leg info
-            else:
-                selection_labels = leg_name + ' - ' + leg_info
-                
-        bet_output['selection'] = selection_labels.replace(',', ';')    # replace , with ; (since we are saving to csv file)
-        bet_output['boost'] = boost
-        
-        # depending on the selection length, we can set the bet type
-        if len(legs) == 2:
-            bet_output['bet_type'] = 'Multi Bet - 2 legs'
-        elif len(legs) == 3:
-            bet_output['bet_type'] = 'Multi Bet - 3 legs'
-        elif len(legs) >= 4:
-            bet_output['bet_type'] = 'Multi Bet - 4+ legs'
-        else:
-            bet_output['bet_type'] = ''
-        
-        # get the stake and extract the number (should be 1 number only)
-        bet_output['wager'] = extract_numbers(bet_details['total_wager'])[0]
-        
-        # get whether it is a bonus bet or not
-        if bet_details['bonus_bet']:
-            bet_output['bonus_bet'] = 'Y'
-        else:
-            bet_output['bonus_bet'] = 'N'
-        
-        
-        # get the odds and extract the number
-        bet_output['odds'] = bet_details['odds']
-        
-        # get the return and extract the number (should be 1 number only)
-        returned = float(extract_numbers(bet_details['bet_return'])[0])
-        
-        # if the return is 0, then the bet is a loss. If it is not 0, then the bet is a win. Else, the bet is pending
-        if returned == 0:
-            bet_output['bet_status'] = 'N'
-        elif returned > 0:
-            bet_output['bet_status'] = 'Y'
-        else:
-            bet_output['bet_status'] = 'P'
-            
-        # set fixture to eveent name
-        bet_output['fixture'] = bet_details['event_name']
-        
-        return bet_output
\ No newline at end of file
+import re
+from datetime import datetime
+
+from bet_amounts import extract_numbers
+from bet_parsers import get_backend
+from bet_record import Bet365Details, FanduelDetails, ProcessedBet
+from selector_plans import SelectorPlan
+from bet_validation import AMOUNT_PATTERN, InvalidBet, check_selectors, validate_details
+from instrumentation import timed
+from abc import ABC, abstractmethod
+
+# Bet365 shows the return of a bet that is still open as "To Return $30.00" (a settled bet shows "Return $30.00")
+BET365_OPEN_RETURN = re.compile(r'^\s*(?:To|Potential) Return\b', re.IGNORECASE)
+
+# the betstatus-* class of the Fanduel bets that are not settled yet (settled ones are won, lost, void, ...)
+FANDUEL_OPEN_STATUSES = {'open', 'pending', 'unsettled', 'active'}
+
+# Abstract class for bet extractors
+class BetExtractor(ABC):
+    """
+    This abstract class defines the structure for bet extractors.
+    Bet extractors are responsible for extracting bet details from various sources.
+
+    Each extractor holds a parser backend (see bet_parsers.py) that parses the exported HTML
+    into the nodes passed to extract_bet_details.
+
+    Each subclass declares how its exports are routed and read, so the pipeline needs no per-bookmaker
+    code (see bookmaker_registry.py).
+    """
+    # the name of the bookmaker, used on the command line and in the outputs
+    bookmaker = None
+
+    # text that only appears in exports of this bookmaker, used to detect the bookmaker of a file
+    markers = ()
+
+    # the element that contains a single bet: its tag (None for any tag) and class
+    summary_tag = None
+    summary_class = None
+
+    # the file the extracted (unprocessed) bet details are saved to
+    raw_csv = None
+
+    # the format of the 'date' produced by process_extracted_details
+    date_format = None
+
+    @abstractmethod
+    def __init__(self, backend='bs4'):
+        """
+        Initializes the bet extractor. This method is abstract and must be implemented by subclasses.
+
+        Parameters:
+        - backend: The name of the parser backend to use, either 'bs4' or 'lxml'.
+        """
+        self.backend = get_backend(backend)
+
+    def parse_document(self, html_content):
+        """
+        Parses a full bet history export with the extractor's parser backend.
+
+        Parameters:
+        - html_content: The HTML of the export.
+
+        Returns:
+        The root node of the document.
+        """
+        return self.backend.parse_document(html_content)
+
+    def parse_fragment(self, fragment):
+        """
+        Parses a single bet summary fragment with the extractor's parser backend.
+
+        Parameters:
+        - fragment: The raw HTML of one bet summary.
+
+        Returns:
+        The node of the bet container, ready to be passed to extract_bet_details.
+        """
+        return self.backend.parse_fragment(fragment)
+
+    @abstractmethod
+    def extract_bet_details(self, bet_summary):
+        """
+        Extracts bet details from a bet summary.
+
+        Parameters:
+        - bet_summary: The summary of the bet from which details are to be extracted.
+
+        This method is abstract and must be implemented by subclasses.
+        """
+        pass
+    
+    @abstractmethod
+    def required_selectors(self, fields):
+        """
+        Returns the fields of the selector plan a bet summary must have to be extracted.
+
+        Parameters:
+        - fields: The fields found by the selector plan, as some fields are only needed for some kinds of bets.
+
+        This method is abstract and must be implemented by subclasses. The extracted details are
+        then checked against the 'schema' of the subclass (see bet_validation.py).
+        """
+        pass
+
+    @abstractmethod
+    def process_extracted_details(self, bet_details):
+        """
+        Processes the extracted bet details.
+
+        Parameters:
+        - bet_details: The details of the bet that have been extracted.
+
+        This method is abstract and must be implemented by subclasses.
+        """
+        pass
+
+    @abstractmethod
+    def extract_bet_id(self, bet_summary):
+        """
+        Extracts only the bet ID from a bet summary, without extracting the other details.
+
+        Parameters:
+        - bet_summary: The summary of the bet from which the ID is to be extracted.
+
+        This method is abstract and must be implemented by subclasses. The ID must be the same
+        as the 'bet_id' produced by process_extracted_details.
+        """
+        pass
+
+    @abstractmethod
+    def is_open(self, bet_details):
+        """
+        Checks whether a bet was still open (not settled) when it was exported, from its markup.
+
+        Parameters:
+        - bet_details: The details of the bet that have been extracted.
+
+        Returns:
+        True if the bet is pending. Its return is then only the potential return, so the bet must
+        be processed again until it settles (see bet_ledger.py).
+
+        This method is abstract and must be implemented by subclasses.
+        """
+        pass
+
+    @abstractmethod
+    def leg_selections(self, bet_details):
+        """
+        Returns the selection text of each leg of a bet.
+
+        Parameters:
+        - bet_details: The details of the bet that have been extracted.
+
+        This method is abstract and must be implemented by subclasses.
+        """
+        pass
+
+    @abstractmethod
+    def typed_details(self, bet_details):
+        """
+        Returns the details of a bet that are stored as typed columns (see bet_store.py).
+
+        Parameters:
+        - bet_details: The details of the bet that have been extracted.
+
+        Returns:
+        A dictionary with the time the bet was placed ('placed', a datetime), the amount returned
+        ('return', a number string, or None if it is not known) and the legs of the bet ('legs', a
+        list of dictionaries with the 'name' and 'info' of each leg).
+
+        This method is abstract and must be implemented by subclasses.
+        """
+        pass
+    
+class Bet365(BetExtractor):
+    """
+    A concrete implementation of BetExtractor for the Bet365 betting platform.
+    """
+    bookmaker = 'bet365'
+    markers = ('h-BetSummary',)
+    summary_tag = 'div'
+    summary_class = 'h-BetSummary'
+    raw_csv = "bet365.csv"
+
+    # the format of the 'date' produced by process_extracted_details
+    date_format = '%Y-%m-%d'
+
+    # the record returned by extract_bet_details
+    details_class = Bet365Details
+
+    # the fields of a Bet365 bet summary, compiled once and found in a single walk over each summary
+    plan = SelectorPlan({
+        'date_and_time': ('select_one', 'div.h-BetSummary_DateAndTime'),
+        'multiple_selections': ('select_one', 'div.h-BetBuilderMultipleSelections'),
+        'multiple_bet_type': ('select_one', 'div.h-BetBuilderMultipleSelections_HeaderContainer div', 'multiple_selections'),
+        'multiple_labels': ('select', 'div.h-BetBuilderSelection_Container div.h-BetBuilderSelection_SelectionLabel', 'multiple_selections'),
+        'multiple_odds': ('select', 'div.h-BetBuilderMultipleSelections_OddsLabel span', 'multiple_selections'),
+        'fixture_label': ('select_one', 'div.h-BetBuilderMultipleSelections_FixtureLabel', 'multiple_selections'),
+        'selection_name': ('select_one', 'div.h-BetSelection_Container div.h-BetSelection_Name'),
+        'selection_odds': ('select_one', 'div.h-BetSelection_Container div.h-BetSelection_Odds'),
+        'stake': ('select_one', 'div.h-StakeDescription_Text'),
+        'wager': ('select_one', 'div.h-StakeReturnSection_StakeContainer'),
+        'return': ('select_one', 'div.h-StakeReturnSection_ReturnText'),
+        'bonus_wager': ('select_one', 'div.h-StakeReturnSectionIPOffer_StakeDetails'),
+        'bonus_return': ('select_one', 'div.h-StakeReturnSectionIPOffer_ReturnContainer'),
+        'boost_badge': ('select_one', 'div.h-WinningsBoostBadge_BoostLabel'),
+        'super_boost': ('select_one', 'div.h-BetBoostLabel.h-BetBoostLabel-superboost'),
+    })
+
+    # the patterns the text of the required details must contain for the bet to be processed
+    schema = {
+        'date_and_time': re.compile(r'^\d{1,2}/\d{1,2}/\d{4} \d{1,2}:\d{2}:\d{2}$'),
+        'wager': AMOUNT_PATTERN,
+        'return': AMOUNT_PATTERN,
+    }
+
+    def __init__(self, backend='bs4'):
+        """
+        Initializes the Bet365 bet extractor.
+
+        Parameters:
+        - backend: The name of the parser backend to use, either 'bs4' or 'lxml'.
+        """
+        super().__init__(backend)
+    
+    @timed('extract_bet_details_seconds')
+    def extract_bet_details(self, bet_summary):
+        """
+        Extracts bet details from a Bet365 bet summary.
+
+        Parameters:
+        - bet_summary: The summary of the bet from Bet365 from which details are to be extracted.
+
+        Returns:
+        A Bet365Details record containing the extracted bet details.
+
+        Raises:
+        - InvalidBet: If the summary does not match the schema of Bet365 bets.
+        """
+        bet_details = self.details_class()
+
+        # find all fields of the summary in one walk over it
+        fields = self.plan.run(bet_summary, self.backend)
+        check_selectors(fields, self.required_selectors(fields), self.plan)
+            
+        # Extract date and time from the bet summary
+        date_and_time = fields['date_and_time'].text.strip()
+        bet_details['date_and_time'] = date_and_time
+        
+        # Placeholder for odds, to be extracted or calculated
+        odds_holder = ''
+        
+        # Check for multiple selections in the bet, indicating a parlay bet
+        if fields['multiple_selections']:
+            # Extract the bet type from the header container of multiple selections
+            bet_type = fields['multiple_bet_type'].text.strip()
+            # Extract the labels of all selections within the bet
+            selection_labels = [label.text.strip() for label in fields['multiple_labels']]
+            
+            # Extract odds for each selection from the odds label container
+            odds_elements = fields['multiple_odds']
+            odds_holder = [float(element.text.strip()) for element in odds_elements]
+            
+            odds = max(odds_elements, key=lambda x: float(x.text.strip())).text.strip()
+                    
+            fixture_label = fields['fixture_label'].text.strip()
+        else:
+            bet_type = "Single"
+            selection_labels = [fields['selection_name'].text.strip()]
+            odds = fields['selection_odds'].text.strip()
+            fixture_label = ""
+        
+        # Add extracted bet type and selections to the bet details dictionary
+        bet_details['bet_type'] = bet_type
+        bet_details['selection_labels'] = selection_labels
+        # Add extracted odds to the bet details dictionary
+        bet_details['odds'] = odds
+        bet_details['fixture_label'] = fixture_label
+        bet_details['odds_holder'] = odds_holder
+        
+        # Extract stake and return information
+        stake = fields['stake'].text.strip()
+        bet_details['stake'] = stake#extract_numbers(stake)
+        
+        # Extract the wager and return amount
+        if fields['wager'] and fields['return']:
+            # this is not a bonus bet
+            wager = fields['wager'].text.strip()
+            ret = fields['return'].text.strip()
+            bonus_bet = False
+        else:
+            # this is a bonus bet
+            wager = fields['bonus_wager'].text.strip()
+            ret = fields['bonus_return'].text.strip()
+            bonus_bet = True        
+                
+        # Check for super boost
+        boost = fields['boost_badge'] or fields['super_boost']
+        if boost:
+            # strip text and replace line breaks with a space
+            bet_details['boost'] = boost.text.strip().replace('\n', ' ')
+        else:
+            bet_details['boost'] = None
+            
+        bet_details['wager'] = wager
+        bet_details['return'] = ret
+        bet_details['bonus_bet'] = bonus_bet
+
+        validate_details(bet_details, self.schema)
+        return bet_details
+
+    def required_selectors(self, fields):
+        """
+        Returns the fields of the selector plan a Bet365 bet summary must have, depending on whether it is a parlay and a bonus bet.
+        """
+        if fields['multiple_selections']:
+            selections = ['multiple_bet_type', 'multiple_labels', 'multiple_odds', 'fixture_label']
+        else:
+            selections = ['selection_name', 'selection_odds']
+        amounts = ['wager', 'return'] if fields['wager'] and fields['return'] else ['bonus_wager', 'bonus_return']
+        return ['date_and_time', *selections, 'stake', *amounts]
+    
+    @timed('process_extracted_details_seconds')
+    def process_extracted_details(self, bet_details):
+        """
+        Processes the extracted bet details specific to Bet365.
+
+        This method takes the raw bet details extracted from the Bet365 bet summary,
+        and processes them to format or calculate additional information that may be
+        necessary for further use, such as calculating potential winnings or formatting
+        the date and time.
+
+        Parameters:
+        - bet_details: A dictionary containing the details of the bet extracted from the Bet365 summary.
+
+        Returns:
+        A ProcessedBet record with the processed bet details.
+        """
+        bet_output = ProcessedBet()
+    
+        # convert the date format from "dd/mm/yyyy hh:mm" to "yyyy-mm-dd hh:mm"
+        date_time = bet_details['date_and_time']
+        date_time = date_time.split(' ')
+        date = date_time[0].split('/')
+        time = date_time[1]
+        date = date[2] + '-' + date[0] + '-' + date[1]
+        date_time = date + time
+
+        # save just the date
+        bet_output['date'] = date
+        
+        # use the date and time to create a unique bet ID
+        bet_output['bet_id'] = self.bet_id_from_date_and_time(bet_details['date_and_time'])
+        
+        # set the bookmaker name
+        bookmaker = 'bet365'
+        bet_output['bookmaker'] = bookmaker
+        
+        # set the sport to nothing for now
+        bet_output['sport'] = ''
+        
+        # get the selection, the bet type and the boost from the selection labels
+        bet_output['selection'], bet_output['bet_type'], bet_output['boost'] = self.selection_fields(bet_details)
+        
+        # get the stake and extract the number (should be 1 number only)
+        bet_output['wager'] = extract_numbers(bet_details['wager'])[0]
+        
+        # get whether it is a bonus bet or not
+        if bet_details['bonus_bet']:
+            bet_output['bonus_bet'] = 'Y'
+        else:
+            bet_output['bonus_bet'] = 'N'
+        
+        # get the odds and extract the number
+        bet_output['odds'] = bet_details['odds']
+        
+        # get the return and extract the number (should be 1 number only)
+        returned = float(extract_numbers(bet_details['return'])[0])
+
+        # an open bet is pending whatever its (potential) return. Otherwise, if the return is 0, then the bet is a loss,
+        # and if it is not 0, then the bet is a win
+        if self.is_open(bet_details):
+            bet_output['bet_status'] = 'P'
+        elif returned == 0:
+            bet_output['bet_status'] = 'N'
+        # check if the bet was cashed out (i.e., it was voided)
+        elif float(bet_output['wager']) == float(returned):
+            bet_output['bet_status'] = 'R'
+        else:
+            bet_output['bet_status'] = 'Y'
+            
+        # we can use the fixture as is
+        bet_output['fixture'] = bet_details['fixture_label']
+        
+        return bet_output
+
+    def process_batch(self, all_bet_details):
+        """
+        Processes the extracted details of many Bet365 bets at once.
+
+        The stakes, returns, odds, dates and settlement status are converted as pandas/NumPy columns
+        instead of one bet at a time (see batch_processing.py); the records are the same as the ones
+        process_extracted_details returns for each bet.
+
+        Parameters:
+        - all_bet_details: The extracted details of the bets.
+
+        Returns:
+        A tuple with the list of ProcessedBet records and a DataFrame of their typed columns
+        (see batch_processing.typed_frame).
+        """
+        # imported here so numpy and pandas are only required in batch mode
+        import batch_processing
+
+        frame = batch_processing.details_frame(all_bet_details, ['date_and_time', 'wager', 'return', 'bonus_bet'])
+
+        # "mm/dd/yyyy hh:mm:ss" -> "yyyy-mm-dd" and the "yyyymmddhhmmss" bet ID
+        date_and_time = frame['date_and_time'].str.split(' ')
+        date = date_and_time.str[0].str.split('/')
+        dates = date.str[2] + '-' + date.str[0] + '-' + date.str[1]
+        bet_ids = (dates + date_and_time.str[1]).str.replace(':', '').str.replace('-', '')
+
+        wagers = batch_processing.first_numbers(frame['wager'], 'wager')
+        returns = batch_processing.first_numbers(frame['return'], 'return').astype(float).to_numpy()
+        open_bets = [self.is_open(bet_details) for bet_details in all_bet_details]
+        bet_status = batch_processing.settlement_status(wagers.astype(float).to_numpy(), returns, open_bets, cash_outs=True)
+        bonus_bets = ['Y' if bonus_bet else 'N' for bonus_bet in frame['bonus_bet']]
+
+        bet_outputs = []
+        for bet_details, date, bet_id, wager, bonus_bet, status in zip(all_bet_details, dates.tolist(), bet_ids.tolist(), wagers.tolist(), bonus_bets, bet_status.tolist()):
+            selection, bet_type, boost = self.selection_fields(bet_details)
+            bet_outputs.append(ProcessedBet(
+                date=date, bet_id=bet_id, bookmaker='bet365', sport='', selection=selection, bet_type=bet_type, boost=boost,
+                fixture=bet_details['fixture_label'], wager=wager, odds=bet_details['odds'], bonus_bet=bonus_bet, bet_status=status,
+            ))
+
+        odds = [bet_details['odds'] for bet_details in all_bet_details]
+        return bet_outputs, batch_processing.typed_frame(bet_ids, dates, self.date_format, wagers.astype(float).to_numpy(), returns, odds, bet_status)
+
+    def is_open(self, bet_details):
+        """
+        Checks whether a Bet365 bet was open when it was exported: its return is labelled "To Return" instead of "Return".
+        """
+        return bool(BET365_OPEN_RETURN.match(bet_details['return'] or ''))
+
+    def selection_fields(self, bet_details):
+        """
+        Builds the selection, bet type and boost of a processed Bet365 bet.
+
+        Parameters:
+        - bet_details: A dictionary containing the details of the bet extracted from the Bet365 summary.
+
+        Returns:
+        A tuple with the selection, the bet type and the boost.
+        """
+        boost = ''
+
+        # get the selection labels, and convert the list into a numbered string separated by a line break; if there is only 1 selection, then just use that
+        selection_labels = bet_details['selection_labels']
+        if len(selection_labels) > 1:
+            selection_labels = [str(i+1) + '. ' + selection for i, selection in enumerate(selection_labels)]
+            selection_labels = '\n'.join(selection_labels)
+        else:
+            selection_labels = selection_labels[0]
+            
+        selection = selection_labels
+        
+        # depending on the selection length, we can set the bet type
+        selection_label_items = len(bet_details['selection_labels'])
+        if selection_label_items == 2:
+            bet_type = 'Multi Bet - 2 legs'
+        elif selection_label_items == 3:
+            bet_type = 'Multi Bet - 3 legs'
+        elif selection_label_items >= 4:
+            bet_type = 'Multi Bet - 4+ legs'
+        else:
+            bet_type = ''
+            
+        # also check for boost if it's a single leg
+        if bet_details['boost'] and "boost" in bet_details['boost'].lower():
+            boost = 'Boost'
+
+        return selection, bet_type, boost
+
+    def leg_selections(self, bet_details):
+        """
+        Returns the selection text of each leg of a Bet365 bet.
+
+        Parameters:
+        - bet_details: A dictionary containing the details of the bet extracted from the Bet365 summary.
+
+        Returns:
+        A list with the selection label of every leg (a single item for single bets).
+        """
+        return list(bet_details['selection_labels'])
+
+    def typed_details(self, bet_details):
+        """
+        Returns the placement time, return and legs of a Bet365 bet.
+
+        Parameters:
+        - bet_details: A dictionary containing the details of the bet extracted from the Bet365 summary.
+
+        Returns:
+        A dictionary with the 'placed', 'return' and 'legs' of the bet. Bet365 legs only have a name.
+        """
+        returned = extract_numbers(bet_details['return'])
+        return {
+            'placed': datetime.strptime(bet_details['date_and_time'], '%m/%d/%Y %H:%M:%S'),
+            'return': returned[0] if returned else None,
+            'legs': [{'name': label, 'info': None} for label in bet_details['selection_labels']],
+        }
+
+    @timed('extract_bet_id_seconds')
+    def extract_bet_id(self, bet_summary):
+        """
+        Extracts only the bet ID from a Bet365 bet summary.
+
+        Parameters:
+        - bet_summary: The summary of the bet from Bet365.
+
+        Returns:
+        The bet ID, derived from the date and time the bet was placed.
+
+        Raises:
+        - InvalidBet: If the summary has no valid date and time.
+        """
+        date_and_time = bet_summary.find('div', class_='h-BetSummary_DateAndTime')
+        if date_and_time is None:
+            raise InvalidBet('date_and_time', f"no element matches '{self.plan.selectors['date_and_time']}'")
+        date_and_time = date_and_time.text.strip()
+        if not self.schema['date_and_time'].search(date_and_time):
+            raise InvalidBet('date_and_time', f"{date_and_time!r} does not match '{self.schema['date_and_time'].pattern}'")
+        return self.bet_id_from_date_and_time(date_and_time)
+
+    def bet_id_from_date_and_time(self, date_and_time):
+        """
+        Creates the Bet365 bet ID from the "mm/dd/yyyy hh:mm:ss" date and time of the bet.
+
+        Parameters:
+        - date_and_time: The date and time extracted from the bet summary.
+
+        Returns:
+        The date and time as "yyyymmddhhmmss".
+        """
+        date_time = date_and_time.split(' ')
+        date = date_time[0].split('/')
+        date_time = date[2] + '-' + date[0] + '-' + date[1] + date_time[1]
+
+        bet_id = date_time.replace(' ', '_')
+        return bet_id.replace(':', '').replace('-', '')
+    
+class Fanduel(BetExtractor):
+    """
+    A concrete implementation of BetExtractor for the Fanduel betting platform.
+    
+    This class is responsible for extracting and processing bet details specific to the Fanduel platform.
+    It implements the abstract methods defined in the BetExtractor abstract class to provide functionality
+    for initializing the extractor, extracting bet details from a bet summary, and processing those details.
+    """
+    bookmaker = 'fanduel'
+    markers = ('stmnt-bet',)
+    summary_tag = None
+    summary_class = 'stmnt-bet'
+    raw_csv = "fanduel.csv"
+
+    # the format of the 'date' produced by process_extracted_details
+    date_format = '%d-%b-%Y'
+
+    # the record returned by extract_bet_details
+    details_class = FanduelDetails
+
+    # the fields of a Fanduel bet summary, compiled once and found in a single walk over each summary
+    plan = SelectorPlan({
+        'event_name': ('select_one', '.eventname'),
+        'player_time_status': ('select_one', '.time-player .time'),
+        'time_status': ('select_one', '.time'),
+        'leg_names': ('select', '.leg-name'),
+        'leg_subs': ('select', '.leginfo-sub .first'),
+        'leg_odds': ('select_one', '.leginfo-odds'),
+        'bet_odds': ('select_one', '.betodds .value'),
+        'total_wager': ('select_one', '.betstake .value span'),
+        'bet_return': ('select_one', '.betreturn .value span'),
+        'bet_id': ('select_one', '.bet-id span:last-child'),
+        'placed_time': ('select_one', '.time span:last-child'),
+        'bonus_bet': ('select_one', '.bonus-bets'),
+        'bonus_amount': ('select_one', '.bonus-bets .bonus-amount'),
+        'bonus_text': ('select_one', '.bonus-bets .bonus-text'),
+    })
+
+    # the patterns the text of the required details must contain for the bet to be processed
+    schema = {
+        'bet_id': re.compile(r'\w'),
+        'placed_time': re.compile(r'^[A-Za-z]{3} \d{1,2}, \d{4} \d{1,2}:\d{2}[AP]M'),
+        'total_wager': AMOUNT_PATTERN,
+        'bet_return': AMOUNT_PATTERN,
+    }
+
+    def __init__(self, backend='bs4'):
+        """
+        Initializes the Fanduel bet extractor.
+        
+        This constructor can be expanded to include initialization of resources or configurations
+        specific to handling Fanduel bet summaries.
+
+        Parameters:
+        - backend: The name of the parser backend to use, either 'bs4' or 'lxml'.
+        """
+        super().__init__(backend)
+    
+    @timed('extract_bet_details_seconds')
+    def extract_bet_details(self, bet_summary):
+        """
+        Extracts bet details from a Fanduel bet summary.
+
+        This method parses the bet summary provided as input to extract relevant details
+        such as the date and time of the bet, the bet type, selections, and odds. The
+        extracted details are returned in a dictionary format.
+
+        Parameters:
+        - bet_summary: The summary of the bet from Fanduel from which details are to be extracted.
+
+        Returns:
+        A FanduelDetails record containing the extracted bet details.
+
+        Raises:
+        - InvalidBet: If the summary does not match the schema of Fanduel bets.
+        """
+        bet_details = self.details_class()
+
+        # the status and type of the bet are the second and fourth classes of the summary
+        if len(bet_summary.get('class') or []) < 4:
+            raise InvalidBet('class', f"expected the bet status and bet type in the classes of the summary, got {bet_summary.get('class')!r}")
+
+        # find all fields of the summary in one walk over it
+        fields = self.plan.run(bet_summary, self.backend)
+        check_selectors(fields, self.required_selectors(fields), self.plan)
+    
+        # Extract bet status
+        bet_status = bet_summary['class'][1].split('-')[-1]
+        bet_details['bet_status'] = bet_status
+        
+        # Extract bet type
+        bet_type = bet_summary['class'][3]
+        bet_details['bet_type'] = bet_type
+        
+        # Extract the event name and time
+        event_name = fields['event_name']
+        if event_name:
+            bet_details['event_name'] = event_name.get_text(strip=True)
+        else:
+            bet_details['event_name'] = None
+        
+        time_status = fields['player_time_status'] or fields['time_status']
+        if time_status:
+            bet_details['time_status'] = time_status.get_text(strip=True)
+        
+        # Extract leg information
+        legs = []
+        for name, sub in zip(fields['leg_names'], fields['leg_subs']):
+            legs.append({
+                'leg_name': name.get_text(strip=True),
+                'leg_info': sub.get_text(strip=True)
+            })
+        
+        bet_details['legs'] = legs
+        
+        # Extract odds
+        odds = fields['leg_odds'] or fields['bet_odds']
+        if odds:
+            bet_details['odds'] = odds.get_text(strip=True)
+        
+        # Extract total wager
+        wager = fields['total_wager']
+        if wager:
+            bet_details['total_wager'] = wager.get_text(strip=True)
+        
+        # Extract return
+        bet_return = fields['bet_return']
+        if bet_return:
+            bet_details['bet_return'] = bet_return.get_text(strip=True)
+        
+        # Extract bet ID
+        bet_id = fields['bet_id']
+        if bet_id:
+            bet_details['bet_id'] = bet_id.get_text(strip=True)
+        
+        # Extract placed time
+        placed_time = fields['placed_time']
+        if placed_time:
+            bet_details['placed_time'] = placed_time.get_text(strip=True)
+        
+        # Extract bonus bet information
+        if fields['bonus_bet']:
+            bonus_amount = fields['bonus_amount']
+            bonus_text = fields['bonus_text']
+            if bonus_amount and bonus_text:
+                bet_details['bonus_bet'] = {
+                    'bonus_amount': bonus_amount.get_text(strip=True),
+                    'bonus_text': bonus_text.get_text(strip=True)
+                }
+        else:
+            bet_details['bonus_bet'] = None
+
+        validate_details(bet_details, self.schema)
+        return bet_details
+
+    def required_selectors(self, fields):
+        """
+        Returns the fields of the selector plan a Fanduel bet summary must have.
+        """
+        return ['leg_names', 'leg_subs', 'total_wager', 'bet_return', 'bet_id', 'placed_time']
+    
+    @timed('process_extracted_details_seconds')
+    def process_extracted_details(self, bet_details):
+        """
+        Processes the extracted bet details specific to Fanduel.
+
+        This method takes the raw bet details extracted from the Fanduel bet summary,
+        and processes them to format or calculate additional information that may be
+        necessary for further use. This could include formatting the date and time,
+        calculating potential winnings based on odds and stake, or any other processing
+        specific to the Fanduel platform.
+
+        Parameters:
+        - bet_details: A dictionary containing the details of the bet extracted from the Fanduel summary.
+
+        Returns:
+        A ProcessedBet record with the processed bet details.
+        """
+        bet_output = ProcessedBet()
+
+        # store the retrieved bet ID
+        bet_output['bet_id'] = bet_details['bet_id'].strip('#')
+        
+        # get the date and time
+        date_time = bet_details['placed_time']
+        
+        # extract the date from the date and time, parse the date string into a datetime object, and convert the datetime object to the desired format
+        date = date_time.split(' ')[0:3]
+        date = date[1].strip(',') + '-' + date[0] + '-' + date[2]
+        bet_output['date'] = date
+        
+        # set the bookmaker name
+        bookmaker = 'FanDuel'
+        bet_output['bookmaker'] = bookmaker
+            
+        # set the sport to nothing for now
+        bet_output['sport'] = ''
+        
+        # get the selection, the bet type and the boost from the legs
+        bet_output['selection'], bet_output['bet_type'], bet_output['boost'] = self.selection_fields(bet_details)
+        
+        # get the stake and extract the number (should be 1 number only)
+        bet_output['wager'] = extract_numbers(bet_details['total_wager'])[0]
+        
+        # get whether it is a bonus bet or not
+        if bet_details['bonus_bet']:
+            bet_output['bonus_bet'] = 'Y'
+        else:
+            bet_output['bonus_bet'] = 'N'
+        
+        
+        # get the odds and extract the number
+        bet_output['odds'] = bet_details['odds']
+        
+        # get the return and extract the number (should be 1 number only)
+        returned = float(extract_numbers(bet_details['bet_return'])[0])
+        
+        # an open bet is pending whatever its (potential) return. Otherwise, if the return is 0, then the bet is a loss,
+        # and if it is not 0, then the bet is a win
+        if self.is_open(bet_details):
+            bet_output['bet_status'] = 'P'
+        elif returned == 0:
+            bet_output['bet_status'] = 'N'
+        else:
+            bet_output['bet_status'] = 'Y'
+            
+        # set fixture to eveent name
+        bet_output['fixture'] = bet_details['event_name']
+        
+        return bet_output
+
+    def process_batch(self, all_bet_details):
+        """
+        Processes the extracted details of many Fanduel bets at once.
+
+        The stakes, returns, odds, dates and settlement status are converted as pandas/NumPy columns
+        instead of one bet at a time (see batch_processing.py); the records are the same as the ones
+        process_extracted_details returns for each bet.
+
+        Parameters:
+        - all_bet_details: The extracted details of the bets.
+
+        Returns:
+        A tuple with the list of ProcessedBet records and a DataFrame of their typed columns
+        (see batch_processing.typed_frame).
+        """
+        # imported here so numpy and pandas are only required in batch mode
+        import batch_processing
+
+        frame = batch_processing.details_frame(all_bet_details, ['bet_id', 'placed_time', 'total_wager', 'bet_return', 'bonus_bet'])
+
+        bet_ids = frame['bet_id'].str.strip('#')
+
+        # "May 31, 2024 7:10PMET" -> "31-May-2024"
+        date = frame['placed_time'].str.split(' ')
+        dates = date.str[1].str.strip(',') + '-' + date.str[0] + '-' + date.str[2]
+
+        wagers = batch_processing.first_numbers(frame['total_wager'], 'total_wager')
+        returns = batch_processing.first_numbers(frame['bet_return'], 'bet_return').astype(float).to_numpy()
+        open_bets = [self.is_open(bet_details) for bet_details in all_bet_details]
+        bet_status = batch_processing.settlement_status(wagers.astype(float).to_numpy(), returns, open_bets, cash_outs=False)
+        bonus_bets = ['Y' if bonus_bet else 'N' for bonus_bet in frame['bonus_bet']]
+
+        bet_outputs = []
+        for bet_details, date, bet_id, wager, bonus_bet, status in zip(all_bet_details, dates.tolist(), bet_ids.tolist(), wagers.tolist(), bonus_bets, bet_status.tolist()):
+            selection, bet_type, boost = self.selection_fields(bet_details)
+            bet_outputs.append(ProcessedBet(
+                date=date, bet_id=bet_id, bookmaker='FanDuel', sport='', selection=selection, bet_type=bet_type, boost=boost,
+                fixture=bet_details['event_name'], wager=wager, odds=bet_details['odds'], bonus_bet=bonus_bet, bet_status=status,
+            ))
+
+        odds = [bet_details['odds'] for bet_details in all_bet_details]
+        return bet_outputs, batch_processing.typed_frame(bet_ids, dates, self.date_format, wagers.astype(float).to_numpy(), returns, odds, bet_status)
+
+    def is_open(self, bet_details):
+        """
+        Checks whether a Fanduel bet was open when it was exported, from the betstatus-* class of its summary.
+        """
+        return bet_details['bet_status'] in FANDUEL_OPEN_STATUSES
+
+    def selection_fields(self, bet_details):
+        """
+        Builds the selection, bet type and boost of a processed Fanduel bet.
+
+        Parameters:
+        - bet_details: A dictionary containing the details of the bet extracted from the Fanduel summary.
+
+        Returns:
+        A tuple with the selection, the bet type and the boost.
+        """
+        boost = ''
+
+        # get the selection labels, and convert the list into a numbered string separated by a line break; if there is only 1 selection, then just use that
+        legs = bet_details['legs']
+        if len(legs) > 1:
+            # if there are multiple legs, then extract the leg names and leg info
+            selection_labels = []
+            for leg in legs:
+                leg_name = leg['leg_name']
+                leg_info = leg['leg_info']
+                selection_labels.append(leg_name + ' - ' + leg_info)
+                
+            # Number the selections
+            selection_labels = [str(i+1) + '. ' + selection for i, selection in enumerate(selection_labels)]
+            selection_labels = '\n'.join(selection_labels).strip("\"")
+
+        else:
+            leg_name = legs[0]['leg_name']
+            leg_info = legs[0]['leg_info']
+            
+            # remove all text after a ( in the leg name
+            leg_name = re.sub(r' \(.*\)', '', leg_name).strip()
+                    
+            # also check for boost if it's a single leg
+            if "boost" in leg_info.lower():
+                boost = 'Boost'
+                selection_labels = leg_name
+                # bets that are not boosted have useful information in the leg info
+            else:
+                selection_labels = leg_name + ' - ' + leg_info
+                
+        selection = selection_labels.replace(',', ';')    # replace , with ; (since we are saving to csv file)
+        
+        # depending on the selection length, we can set the bet type
+        if len(legs) == 2:
+            bet_type = 'Multi Bet - 2 legs'
+        elif len(legs) == 3:
+            bet_type = 'Multi Bet - 3 legs'
+        elif len(legs) >= 4:
+            bet_type = 'Multi Bet - 4+ legs'
+        else:
+            bet_type = ''
+
+        return selection, bet_type, boost
+
+    def leg_selections(self, bet_details):
+        """
+        Returns the selection text of each leg of a Fanduel bet.
+
+        Parameters:
+        - bet_details: A dictionary containing the details of the bet extracted from the Fanduel summary.
+
+        Returns:
+        A list with the "leg name - leg info" text of every leg, as used for multi bet selections.
+        """
+        return [leg['leg_name'] + ' - ' + leg['leg_info'] for leg in bet_details['legs']]
+
+    def typed_details(self, bet_details):
+        """
+        Returns the placement time, return and legs of a Fanduel bet.
+
+        Parameters:
+        - bet_details: A dictionary containing the details of the bet extracted from the Fanduel summary.
+
+        Returns:
+        A dictionary with the 'placed', 'return' and 'legs' of the bet.
+        """
+        # the placement time ends with the time zone (e.g., "May 31, 2024 7:10PMET"), which is dropped
+        placed_time = re.match(r'.*?[AP]M', bet_details['placed_time']).group(0)
+        returned = extract_numbers(bet_details.get('bet_return'))
+        return {
+            'placed': datetime.strptime(placed_time, '%b %d, %Y %I:%M%p'),
+            'return': returned[0] if returned else None,
+            'legs': [{'name': leg['leg_name'], 'info': leg['leg_info']} for leg in bet_details['legs']],
+        }
+
+    @timed('extract_bet_id_seconds')
+    def extract_bet_id(self, bet_summary):
+        """
+        Extracts only the bet ID from a Fanduel bet summary.
+
+        Parameters:
+        - bet_summary: The summary of the bet from Fanduel.
+
+        Returns:
+        The bet ID without its leading '#'.
+
+        Raises:
+        - InvalidBet: If the summary has no bet ID.
+        """
+        bet_id = bet_summary.select_one(self.plan.selectors['bet_id'])
+        if bet_id is None:
+            raise InvalidBet('bet_id', f"no element matches '{self.plan.selectors['bet_id']}'")
+        bet_id = bet_id.get_text(strip=True).strip('#')
+        if not bet_id:
+            raise InvalidBet('bet_id', "missing")
+        return bet_id
\ No newline at end of file
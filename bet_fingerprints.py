@@ -0,0 +1,287 @@
+import hashlib
+import sqlite3
+import time
+from datetime import datetime, timedelta
+
+from bet_store import to_decimal, to_odds
+from leg_index import parse_leg
+
+# Default location of the fingerprint index
+FINGERPRINT_FILE = "bet_fingerprints.sqlite"
+
+# Time zone offsets are whole quarter hours and at most 14 hours, so a bet exported again from a
+# page in another time zone has its placement time moved by a multiple of SHIFT_STEP up to MAX_SHIFT
+SHIFT_STEP = timedelta(minutes=15)
+MAX_SHIFT = timedelta(hours=14)
+
+# The columns of the conflicts returned by FingerprintIndex.conflict_rows:
+# - kind: 'collision' (a different bet with the same bet ID, given a new ID) or 'duplicate' (the same bet seen again with its time shifted)
+# - bet_id: the bet ID from the export
+# - stable_id: the ID the bet is stored under
+CONFLICT_COLUMNS = ['kind', 'bookmaker', 'bet_id', 'stable_id', 'placed', 'export', 'detected']
+
+def occurrence_keys(bets):
+    """
+    Numbers the bets of an export that share a bet ID (e.g. Bet365 bets placed in the same second).
+
+    Parameters:
+    - bets: A list of (bet_id, bet_details) pairs, in export order.
+
+    Returns:
+    A list of ((bet_id, occurrence), bet_details) pairs, the occurrence counting from 1, so bets with
+    the same ID are not merged into one before they are fingerprinted.
+    """
+    counts = {}
+    keyed = []
+    for bet_id, bet_details in bets:
+        counts[bet_id] = counts.get(bet_id, 0) + 1
+        keyed.append(((bet_id, counts[bet_id]), bet_details))
+    return keyed
+
+def digest(*values):
+    return hashlib.blake2b(repr(values).encode(), digest_size=16).hexdigest()
+
+class FingerprintIndex():
+    """
+    An index of the fingerprints of every processed bet, stored in a local SQLite database.
+
+    A bet is fingerprinted from what identifies it rather than from its bet ID: its bookmaker, the
+    time it was placed, its stake (and whether it was a bonus bet), its odds and its normalized legs
+    (see leg_index.parse_leg, in any order). Identical bets listed in the same export (e.g., the
+    same bet placed twice in a second) are told apart by their copy number. This separates bets
+    that share an ID (Bet365 IDs are the placement time, so two bets placed in the same second
+    collide) and recognizes a bet that comes back under another ID (a page exported in another
+    time zone shifts the placement time, and the Bet365 ID with it).
+
+    Each fingerprint maps to the stable ID the bet is stored under: its own bet ID, or that ID with
+    a suffix ('_2', '_3', ...) if a different bet already has it. A bet whose time is shifted by a
+    time zone offset keeps the ID of the bet it duplicates, unless both come from the same export:
+    an export is its path within one run (see start_run), so a file that is exported again over
+    the last one is a new export. Lookups are hash lookups on the exact
+    fingerprint and on a bucket that leaves out the hour and day of the placement time, so no bet is
+    compared with the whole history. The index is loaded into memory once and only new entries are
+    written back.
+
+    Attributes:
+    - path: The path of the SQLite database file, or None to keep the index in memory.
+    - stable_ids: The stable ID of every fingerprint, keyed by (bookmaker, fingerprint).
+    - buckets: The (placed, stable_id, export, run) of the bets in every shift bucket, keyed by (bookmaker, bucket).
+    - run: The number of the current run; the bets loaded from the database belong to run 0.
+    - taken: The (bookmaker, stable_id) of every bet.
+    - conflicts: The conflicts found, as rows of CONFLICT_COLUMNS.
+    """
+    def __init__(self, path=FINGERPRINT_FILE):
+        """
+        Opens (or creates) the fingerprint database and loads the index.
+
+        Parameters:
+        - path: The path of the SQLite database file, or None to keep the index in memory.
+        """
+        self.path = path
+        self.stable_ids = {}
+        self.buckets = {}
+        self.taken = set()
+        self.conflicts = []
+        self.run = 1
+        self.new_fingerprints = []
+        self.new_conflicts = []
+        # the normalized legs of every distinct (name, info) leg text
+        self.legs = {}
+        self.counts = {'bets': 0, 'new': 0, 'collisions': 0, 'duplicates': 0}
+
+        self.connection = sqlite3.connect(path) if path else None
+        if self.connection is None:
+            return
+
+        self.connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS fingerprints (
+                bookmaker TEXT NOT NULL,
+                fingerprint TEXT NOT NULL,
+                bucket TEXT NOT NULL,
+                placed TEXT NOT NULL,
+                stable_id TEXT NOT NULL,
+                export TEXT,
+                PRIMARY KEY (bookmaker, fingerprint)
+            )
+            """
+        )
+        self.connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS conflicts (
+                kind TEXT NOT NULL,
+                bookmaker TEXT NOT NULL,
+                bet_id TEXT NOT NULL,
+                stable_id TEXT NOT NULL,
+                placed TEXT NOT NULL,
+                export TEXT,
+                detected REAL NOT NULL
+            )
+            """
+        )
+        self.connection.commit()
+
+        for bookmaker, fingerprint, bucket, placed, stable_id, export in self.connection.execute(
+            "SELECT bookmaker, fingerprint, bucket, placed, stable_id, export FROM fingerprints ORDER BY rowid"
+        ):
+            self.remember(bookmaker, fingerprint, bucket, datetime.fromisoformat(placed), stable_id, export, 0)
+        self.conflicts = [list(row) for row in self.connection.execute("SELECT * FROM conflicts ORDER BY rowid")]
+
+    def remember(self, bookmaker, fingerprint, bucket, placed, stable_id, export, run):
+        self.stable_ids[(bookmaker, fingerprint)] = stable_id
+        self.buckets.setdefault((bookmaker, bucket), []).append((placed, stable_id, export, run))
+        self.taken.add((bookmaker, stable_id))
+
+    def start_run(self):
+        """
+        Starts a new run, so the exports read from now on are new exports even where their paths
+        were read before (e.g., the watch service reading a file that was exported again over the last one).
+        """
+        self.run += 1
+
+    def normalized_legs(self, legs):
+        """
+        Returns the normalized legs of a bet in a canonical order, parsing each leg text only the first time it is seen.
+        """
+        normalized = []
+        for leg in legs:
+            key = (leg['name'], leg['info'])
+            parsed = self.legs.get(key)
+            if parsed is None:
+                parsed = self.legs[key] = tuple(parse_leg(*key))
+            normalized.append(parsed)
+        return tuple(sorted(normalized, key=repr))
+
+    def fingerprint(self, bookmaker, placed, stake, bonus_bet, odds, legs, copy=1):
+        """
+        Computes the fingerprint of a bet and its shift bucket.
+
+        Parameters:
+        - bookmaker: The bookmaker of the bet.
+        - placed: The time the bet was placed, as a datetime.
+        - stake: The stake as a number string (e.g., '20.00').
+        - bonus_bet: 'Y' if the stake was a bonus bet.
+        - odds: The American odds (e.g., '+150').
+        - legs: The legs of the bet, as dictionaries with a 'name' and an 'info' (see typed_details).
+        - copy: How many bets of the export up to this one are identical to it.
+
+        Returns:
+        A tuple with the fingerprint and the bucket, both hex digests. The bucket leaves out the part
+        of the placement time that a time zone offset changes, so the shifted copies of a bet share it.
+        """
+        details = (to_decimal(stake), bonus_bet == 'Y', to_odds(odds), self.normalized_legs(legs), copy)
+        offset = (placed.minute * 60 + placed.second) % int(SHIFT_STEP.total_seconds())
+        return digest(bookmaker, placed.isoformat(), *details), digest(bookmaker, offset, *details)
+
+    def assign(self, bookmaker, bet_id, placed, stake, bonus_bet, odds, legs, export=None, occurrence=1, copy=1):
+        """
+        Returns the stable ID of a bet, adding the bet to the index if it is new.
+
+        Parameters:
+        - bookmaker: The bookmaker of the bet.
+        - bet_id: The ID of the bet in the export.
+        - placed, stake, bonus_bet, odds, legs, copy: As for fingerprint.
+        - export: The path of the export the bet was found in; within a run, a path is one export.
+        - occurrence: How many bets of the export up to this one have the same ID (see occurrence_keys).
+
+        Returns:
+        The stable ID of the bet.
+        """
+        self.counts['bets'] += 1
+        fingerprint, bucket = self.fingerprint(bookmaker, placed, stake, bonus_bet, odds, legs, copy)
+        stable_id = self.stable_ids.get((bookmaker, fingerprint))
+        if stable_id is not None:
+            return stable_id
+
+        placed_text = placed.isoformat()
+
+        # the same bet from an export in another time zone (never from the same export, where all times share a zone)
+        for other_placed, other_id, other_export, other_run in self.buckets.get((bookmaker, bucket), ()):
+            shift = abs(placed - other_placed)
+            if (other_export, other_run) != (export, self.run) and shift <= MAX_SHIFT and shift % SHIFT_STEP == timedelta(0):
+                stable_id = other_id
+                self.add_conflict('duplicate', bookmaker, bet_id, stable_id, placed_text, export)
+                self.counts['duplicates'] += 1
+                break
+
+        # a different bet with an ID that is already in use, e.g. placed in the same second as another one
+        if stable_id is None:
+            number = occurrence
+            stable_id = bet_id if number == 1 else f"{bet_id}_{number}"
+            while (bookmaker, stable_id) in self.taken:
+                number += 1
+                stable_id = f"{bet_id}_{number}"
+            if stable_id != bet_id:
+                self.add_conflict('collision', bookmaker, bet_id, stable_id, placed_text, export)
+                self.counts['collisions'] += 1
+            self.counts['new'] += 1
+
+        self.remember(bookmaker, fingerprint, bucket, placed, stable_id, export, self.run)
+        self.new_fingerprints.append((bookmaker, fingerprint, bucket, placed_text, stable_id, export))
+        return stable_id
+
+    def assign_bets(self, bookmaker, bets, bet_extractor, origins):
+        """
+        Gives processed bets their stable IDs and drops the ones that are the same bet as another.
+
+        Parameters:
+        - bookmaker: The bookmaker of the bets.
+        - bets: A list of (bet_output, bet_details) pairs, oldest export first.
+        - bet_extractor: The extractor of the bookmaker, whose typed_details gives the placement time and legs.
+        - origins: The (export, occurrence) of every bet (see occurrence_keys).
+
+        Returns:
+        The (bet_output, bet_details) pairs with the stable ID set as the bet ID of each output. A
+        bet found more than once keeps the position of its first copy and the values of its last
+        one, so the newest export wins.
+        """
+        unique = {}
+        copies = {}
+        for (bet_output, bet_details), (export, occurrence) in zip(bets, origins):
+            typed = bet_extractor.typed_details(bet_details)
+            identity = (export, typed['placed'], bet_output.wager, bet_output.bonus_bet, bet_output.odds,
+                        tuple((leg['name'], leg['info']) for leg in typed['legs']))
+            copy = copies[identity] = copies.get(identity, 0) + 1
+            bet_output.bet_id = self.assign(bookmaker, bet_output.bet_id, typed['placed'], bet_output.wager, bet_output.bonus_bet,
+                                            bet_output.odds, typed['legs'], export, occurrence, copy)
+            unique[bet_output.bet_id] = (bet_output, bet_details)
+        return list(unique.values())
+
+    def add_conflict(self, kind, bookmaker, bet_id, stable_id, placed, export):
+        row = [kind, bookmaker, bet_id, stable_id, placed, export, time.time()]
+        self.conflicts.append(row)
+        self.new_conflicts.append(row)
+
+    def conflict_rows(self):
+        """
+        Returns every conflict found so far, oldest first, as rows of CONFLICT_COLUMNS.
+        """
+        return list(self.conflicts)
+
+    def stats(self):
+        """
+        Returns the number of bets looked up since the index was opened, how many of them were new,
+        collisions or duplicates, and the size of the index.
+        """
+        return dict(self.counts, fingerprints=len(self.stable_ids), conflicts=len(self.conflicts))
+
+    def save(self):
+        """
+        Writes the fingerprints and conflicts found since the last save to disk.
+        """
+        if self.connection is None:
+            return
+        self.connection.executemany("INSERT OR REPLACE INTO fingerprints VALUES (?, ?, ?, ?, ?, ?)", self.new_fingerprints)
+        self.connection.executemany("INSERT INTO conflicts VALUES (?, ?, ?, ?, ?, ?, ?)", self.new_conflicts)
+        self.connection.commit()
+        self.new_fingerprints = []
+        self.new_conflicts = []
+
+    def close(self):
+        """
+        Saves and closes the fingerprint database.
+        """
+        self.save()
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
@@ -0,0 +1,121 @@
+import json
+import sqlite3
+import time
+
+from bet_record import ProcessedBet
+
+# Default location of the bet ledger
+LEDGER_FILE = "bet_ledger.sqlite"
+
+# Status of a bet that has not been settled yet (see process_extracted_details)
+PENDING_STATUS = 'P'
+
+def glob_escape(text):
+    """
+    Escapes the characters of a bet ID that are wildcards in a GLOB pattern.
+    """
+    return ''.join(f"[{character}]" if character in '*?[' else character for character in text)
+
+class BetLedger():
+    """
+    A persistent record of the bets that have already been processed, stored in a local SQLite database.
+
+    Each bet is keyed by its bookmaker and the 'bet_id' produced by process_extracted_details, and
+    the ledger keeps its settlement status and its processed output row. A bet only needs to be
+    extracted and classified again if it is not in the ledger or if it was still pending.
+
+    Attributes:
+    - path: The path of the SQLite database file.
+    """
+    def __init__(self, path=LEDGER_FILE):
+        """
+        Opens (or creates) the ledger database.
+
+        Parameters:
+        - path: The path of the SQLite database file.
+        """
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS bets (
+                bookmaker TEXT NOT NULL,
+                bet_id TEXT NOT NULL,
+                bet_status TEXT NOT NULL,
+                row TEXT NOT NULL,
+                updated REAL NOT NULL,
+                PRIMARY KEY (bookmaker, bet_id)
+            )
+            """
+        )
+        self.connection.commit()
+
+    def needs_processing(self, bookmaker, bet_id):
+        """
+        Checks whether a bet has to go through extraction and classification.
+
+        Parameters:
+        - bookmaker: The bookmaker the bet was placed with.
+        - bet_id: The ID of the bet.
+
+        Returns:
+        True if the bet is not in the ledger or was pending when it was last processed. Bets that
+        share the ID and were stored with a suffix (see bet_fingerprints.py) are extracted together
+        with it, so the bet is also processed if any of them is pending.
+        """
+        statuses = dict(self.connection.execute(
+            "SELECT bet_id, bet_status FROM bets WHERE bookmaker = ? AND (bet_id = ? OR bet_id GLOB ?)",
+            (bookmaker, bet_id, f"{glob_escape(bet_id)}_[0-9]*")
+        ))
+        return bet_id not in statuses or PENDING_STATUS in statuses.values()
+
+    def record(self, bookmaker, bet):
+        """
+        Stores (or replaces) the processed output of a bet.
+
+        Parameters:
+        - bookmaker: The bookmaker the bet was placed with.
+        - bet: The processed bet (a ProcessedBet). It is stored keyed by the tracker columns.
+        """
+        self.connection.execute(
+            """
+            INSERT INTO bets VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (bookmaker, bet_id) DO UPDATE SET
+                bet_status = excluded.bet_status, row = excluded.row, updated = excluded.updated
+            """,
+            (bookmaker, bet.bet_id, bet.bet_status, json.dumps(bet.tracker_row()), time.time())
+        )
+
+    def commit(self):
+        """
+        Writes the recorded bets to disk.
+        """
+        self.connection.commit()
+
+    def merge(self, bookmaker, bet_ids):
+        """
+        Returns every processed bet of a bookmaker, with the bets of the current export first.
+
+        Parameters:
+        - bookmaker: The bookmaker to return the rows of.
+        - bet_ids: The IDs of the bets in the current export, in export order.
+
+        Returns:
+        The ProcessedBet records of the given bets in the given order, followed by the other bets in
+        the ledger in the order they were first recorded.
+        """
+        rows = {
+            bet_id: ProcessedBet.from_tracker_row(json.loads(row)) for bet_id, row in self.connection.execute(
+                "SELECT bet_id, row FROM bets WHERE bookmaker = ? ORDER BY rowid", (bookmaker,)
+            )
+        }
+
+        merged = [rows.pop(bet_id) for bet_id in dict.fromkeys(bet_ids) if bet_id in rows]
+        return merged + list(rows.values())
+
+    def close(self):
+        """
+        Commits and closes the ledger database.
+        """
+        self.connection.commit()
+        self.connection.close()
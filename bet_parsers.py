@@ -0,0 +1,263 @@
+from abc import ABC, abstractmethod
+
+from bs4 import BeautifulSoup, Tag
+
+from instrumentation import timed
+
+# Abstract class for HTML parser backends
+class ParserBackend(ABC):
+    """
+    This abstract class defines the structure for HTML parser backends.
+
+    A parser backend turns exported HTML into nodes that the bet extractors can query. Every
+    backend exposes the same small node API (find, find_all, select_one, select, text,
+    get_text and class lookup), so the extractors work unchanged whichever backend is used.
+    """
+    name = None
+
+    @abstractmethod
+    def parse_document(self, html_content):
+        """
+        Parses a full bet history export.
+
+        Parameters:
+        - html_content: The HTML of the export.
+
+        Returns:
+        The root node of the document.
+        """
+        pass
+
+    @abstractmethod
+    def parse_fragment(self, fragment):
+        """
+        Parses a single bet summary fragment.
+
+        Parameters:
+        - fragment: The raw HTML of one bet summary.
+
+        Returns:
+        The node of the bet container.
+        """
+        pass
+
+    @abstractmethod
+    def walk(self, node):
+        """
+        Visits the descendants of a node in document order (see selector_plans.py).
+
+        Parameters:
+        - node: The node to walk, as returned by parse_fragment or a query.
+
+        Returns:
+        A generator of (depth, tag name, classes, element) tuples, where the children of the node
+        have depth 1. The element is the backend's raw element; pass it to wrap to query it.
+        """
+        pass
+
+    @abstractmethod
+    def wrap(self, element):
+        """
+        Turns a raw element yielded by walk into a node of this backend.
+        """
+        pass
+
+    @abstractmethod
+    def to_html(self, node):
+        """
+        Returns the HTML of a node, e.g. to quarantine a bet summary that failed validation.
+        """
+        pass
+
+class SoupBackend(ParserBackend):
+    """
+    The default backend, built on BeautifulSoup's pure-Python 'html.parser'.
+    """
+    name = 'bs4'
+
+    @timed('parse_document_seconds')
+    def parse_document(self, html_content):
+        return BeautifulSoup(html_content, 'html.parser')
+
+    @timed('parse_fragment_seconds')
+    def parse_fragment(self, fragment):
+        return BeautifulSoup(fragment, 'html.parser').find(True)
+
+    def walk(self, node):
+        stack = [(child, 1) for child in reversed(node.contents) if isinstance(child, Tag)]
+        while stack:
+            element, depth = stack.pop()
+            yield depth, element.name, element.get('class') or (), element
+            stack.extend([(child, depth + 1) for child in reversed(element.contents) if isinstance(child, Tag)])
+
+    def wrap(self, element):
+        return element
+
+    def to_html(self, node):
+        return str(node)
+
+class LxmlBackend(ParserBackend):
+    """
+    A compiled backend built on lxml, with XPath and CSS selectors compiled once and reused.
+
+    The lxml elements are wrapped in LxmlNode so they answer the same queries as BeautifulSoup tags.
+    """
+    name = 'lxml'
+
+    def __init__(self):
+        # imported here so lxml is only required when this backend is selected
+        import lxml.html
+        from lxml import etree
+        self._html = lxml.html
+        self._etree = etree
+
+    @timed('parse_document_seconds')
+    def parse_document(self, html_content):
+        return LxmlNode(self._html.document_fromstring(html_content))
+
+    @timed('parse_fragment_seconds')
+    def parse_fragment(self, fragment):
+        return LxmlNode(self._html.fragment_fromstring(fragment.strip()))
+
+    def walk(self, node):
+        depth = 0
+        for event, element in self._etree.iterwalk(node.element, events=('start', 'end')):
+            # skip comments and processing instructions
+            if not isinstance(element.tag, str):
+                continue
+            if event == 'start':
+                if depth:
+                    yield depth, element.tag, (element.get('class') or '').split(), element
+                depth += 1
+            else:
+                depth -= 1
+
+    def wrap(self, element):
+        return LxmlNode(element)
+
+    def to_html(self, node):
+        return self._etree.tostring(node.element, encoding='unicode', method='html', with_tail=False)
+
+# Compiled XPath expressions, keyed by the query that produced them
+_xpath_cache = {}
+
+def _compile_find(name, class_):
+    """
+    Compiles a BeautifulSoup style find(name, class_=...) query into a descendant XPath expression.
+
+    As in BeautifulSoup, a class_ matches either a single class of the element or, when it
+    contains spaces, the element's whole class attribute.
+    """
+    key = ('find', name, class_)
+    if key not in _xpath_cache:
+        from lxml import etree
+
+        path = 'descendant::' + (name or '*')
+        if class_:
+            if ' ' in class_:
+                path += '[normalize-space(@class) = "%s"]' % ' '.join(class_.split())
+            else:
+                path += '[contains(concat(" ", normalize-space(@class), " "), " %s ")]' % class_
+        _xpath_cache[key] = etree.XPath(path)
+    return _xpath_cache[key]
+
+def _compile_select(css):
+    """
+    Compiles a CSS selector into a descendant XPath expression, matching soupsieve's select semantics.
+    """
+    key = ('select', css)
+    if key not in _xpath_cache:
+        from cssselect import HTMLTranslator
+        from lxml import etree
+
+        _xpath_cache[key] = etree.XPath(HTMLTranslator().css_to_xpath(css, prefix='descendant::'))
+    return _xpath_cache[key]
+
+def _soup_strings(element):
+    """
+    Yields the text of an element the way BeautifulSoup stores it.
+
+    BeautifulSoup collapses every whitespace-only string to a single newline (or a single space
+    when it has no newline), so the same is done here to keep the text byte-identical.
+    """
+    for text in element.itertext():
+        if text.isspace():
+            text = '\n' if '\n' in text else ' '
+        yield text
+
+class LxmlNode:
+    """
+    A thin wrapper that gives an lxml element the subset of the BeautifulSoup tag API used by the extractors.
+
+    Attributes:
+    - element: The wrapped lxml element.
+    """
+    __slots__ = ('element',)
+
+    def __init__(self, element):
+        self.element = element
+
+    def __getitem__(self, key):
+        # class is a multi-valued attribute, as in BeautifulSoup
+        if key == 'class':
+            return self.element.get('class', '').split()
+        return self.element.attrib[key]
+
+    def get(self, key, default=None):
+        if key == 'class':
+            return self['class'] if 'class' in self.element.attrib else default
+        return self.element.get(key, default)
+
+    def __getattr__(self, name):
+        # tag.div style access returns the first descendant with that tag name
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return self.find(name)
+
+    @property
+    def text(self):
+        return ''.join(_soup_strings(self.element))
+
+    def get_text(self, separator='', strip=False):
+        texts = _soup_strings(self.element)
+        if strip:
+            texts = [text.strip() for text in texts]
+            texts = [text for text in texts if text]
+        return separator.join(texts)
+
+    def find(self, name=None, class_=None):
+        matches = _compile_find(name, class_)(self.element)
+        return LxmlNode(matches[0]) if matches else None
+
+    def find_all(self, name=None, class_=None):
+        return [LxmlNode(element) for element in _compile_find(name, class_)(self.element)]
+
+    def select_one(self, css):
+        matches = _compile_select(css)(self.element)
+        return LxmlNode(matches[0]) if matches else None
+
+    def select(self, css):
+        return [LxmlNode(element) for element in _compile_select(css)(self.element)]
+
+# The available backends, keyed by the name used to select them
+BACKENDS = {
+    SoupBackend.name: SoupBackend,
+    LxmlBackend.name: LxmlBackend,
+}
+
+def get_backend(name):
+    """
+    Creates the parser backend with the given name.
+
+    Parameters:
+    - name: The backend name, either 'bs4' or 'lxml'.
+
+    Returns:
+    A ParserBackend instance.
+
+    Raises:
+    - ValueError: If no backend has the given name.
+    """
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown parser backend '{name}', expected one of {list(BACKENDS)}")
+    return BACKENDS[name]()
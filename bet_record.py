@@ -0,0 +1,114 @@
+class BetRecord():
+    """
+    The base class of the bet records passed through the pipeline.
+
+    A record has a fixed set of fields, declared in __slots__ by each subclass, so a bet takes a
+    fraction of the memory of a dictionary and a misspelled field raises an error instead of adding
+    a new key (a TypeError when the record is built, an AttributeError or KeyError when it is set). Records also answer dictionary-style lookups (record['odds'], record.get('legs')),
+    so the extractors and classifiers can read and fill them like the dictionaries they replace.
+
+    Fields that are never set are None.
+    """
+    __slots__ = ()
+
+    def __init__(self, **values):
+        unknown = values.keys() - self.__slots__
+        if unknown:
+            raise TypeError(f"{type(self).__name__} has no field {', '.join(sorted(unknown))}")
+        for field in self.__slots__:
+            setattr(self, field, values.get(field))
+
+    def __getitem__(self, field):
+        if field not in self.__slots__:
+            raise KeyError(field)
+        return getattr(self, field)
+
+    def __setitem__(self, field, value):
+        if field not in self.__slots__:
+            raise KeyError(field)
+        setattr(self, field, value)
+
+    def get(self, field, default=None):
+        """
+        Returns the value of a field, or the default if the record has no such field.
+        """
+        if field not in self.__slots__:
+            return default
+        return getattr(self, field)
+
+    def keys(self):
+        """
+        Returns the names of the fields, in the order they are saved to csv files.
+        """
+        return list(self.__slots__)
+
+    def values(self):
+        """
+        Returns the values of the fields, in the order of keys.
+        """
+        return [getattr(self, field) for field in self.__slots__]
+
+    def to_dict(self):
+        return dict(zip(self.__slots__, self.values()))
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.values() == other.values()
+
+    def __repr__(self):
+        fields = ', '.join(f"{field}={value!r}" for field, value in zip(self.__slots__, self.values()))
+        return f"{type(self).__name__}({fields})"
+
+class Bet365Details(BetRecord):
+    """
+    The details of a bet extracted from a Bet365 bet summary (see Bet365.extract_bet_details).
+    """
+    __slots__ = ('date_and_time', 'bet_type', 'selection_labels', 'odds', 'fixture_label', 'odds_holder',
+                 'stake', 'boost', 'wager', 'return', 'bonus_bet')
+
+class FanduelDetails(BetRecord):
+    """
+    The details of a bet extracted from a Fanduel bet summary (see Fanduel.extract_bet_details).
+    """
+    __slots__ = ('bet_status', 'bet_type', 'event_name', 'time_status', 'legs', 'odds', 'total_wager',
+                 'bet_return', 'bet_id', 'placed_time', 'bonus_bet')
+
+# the columns of the tracker workbook, mapped from the fields of ProcessedBet
+TRACKER_COLUMNS = {
+    'date': "Date",
+    'bet_id': 'Notes',
+    'bookmaker': 'Bookmaker',
+    'sport': 'Sport / League',
+    'selection': 'Selection',
+    'bet_type': 'Bet Type',
+    'boost': 'My Variable',
+    'fixture': 'Fixture / Event',
+    'wager': 'Stake',
+    'odds': 'Odds (US)',
+    'bonus_bet': 'BB',
+    'bet_status': 'Win',
+}
+
+class ProcessedBet(BetRecord):
+    """
+    A processed and classified bet, as produced by process_extracted_details of every bookmaker.
+
+    The fields are in the order of the tracker columns, so a record is saved to the processed csv
+    file or the tracker workbook as it is, without renaming its keys.
+    """
+    __slots__ = tuple(TRACKER_COLUMNS)
+
+    # the tracker column of each field
+    COLUMNS = TRACKER_COLUMNS
+
+    def tracker_row(self):
+        """
+        Returns the bet as a dictionary keyed by the tracker columns (as stored in the bet ledger).
+        """
+        return {column: getattr(self, field) for field, column in self.COLUMNS.items()}
+
+    @classmethod
+    def from_tracker_row(cls, row):
+        """
+        Builds a bet from a dictionary keyed by the tracker columns.
+        """
+        return cls(**{field: row.get(column) for field, column in cls.COLUMNS.items()})
@@ -0,0 +1,405 @@
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from bet_analytics import BankrollAnalytics, REPORT_COLUMNS
+from bet_ledger import BetLedger
+from bet_record import TRACKER_COLUMNS
+from bet_fingerprints import FingerprintIndex, occurrence_keys
+from bet_store import BetStore
+from bet_stream import iter_bet_fragments, iter_bet_summaries
+from fragment_cache import FragmentCache
+from instrumentation import metrics
+from leg_index import LegIndex
+from bookmaker_registry import bookmakers, create_extractor, detect_bookmaker
+from run_bet_extractor import (bet_date, build_llm, build_parser, check_args, classify, extract_summaries,
+                               find_exports, process_extracted, report_conflicts, report_quarantine, write_csv, write_metrics, write_rows)
+from tracker_writer import upsert_tracker
+
+# Default number of seconds between two scans of the watched directories
+POLL_INTERVAL = 2.0
+
+# Default number of seconds a file must stay unmodified before it is processed, so exports that are still being copied are skipped
+SETTLE_SECONDS = 1.0
+
+# Default port of the status endpoint (bound to localhost only)
+STATUS_PORT = 8765
+
+class BetService():
+    """
+    A resident service that watches directories of exports and processes new or changed ones as they land.
+
+    A one-off run of run_bet_extractor.py pays for the interpreter startup, the imports, the LLM
+    client and a full pass over every export each time. The service keeps all of that warm between
+    drops: the extractors and their parser backends are built once, the LLM client (and its
+    classification cache) is built on the first bet to classify and reused, and the processed bets
+    are kept in an in-memory index keyed by bookmaker and bet ID, loaded from the ledger at start.
+    Each scan only processes the exports whose modification time or size changed, merges their
+    bets into the index (a bet exported again replaces the earlier one) and publishes the processed
+    csv file atomically.
+
+    Attributes:
+    - args: The parsed command line arguments (see run_bet_extractor.build_parser).
+    - bets: The in-memory index, mapping (bookmaker, bet_id) to a (date, bet_output) pair.
+    - files: The status of every export that was processed, keyed by path.
+    - quarantined: The number of bets validated and the bets that failed validation in the last
+                   processing of every export, keyed by path.
+    - leg_index: The legs of the bets processed since the service started, by entity and market
+                 (see leg_index.py); the ledger only keeps processed rows, not the legs.
+    - analytics: The running totals of the bets by bookmaker, sport, bet type, boost and month
+                 (see bet_analytics.py), loaded from args.analytics, or None without it.
+    """
+    def __init__(self, args, settle=SETTLE_SECONDS):
+        """
+        Builds the warm state of the service.
+
+        Parameters:
+        - args: The parsed command line arguments; args.paths are the watched directories, files or glob patterns.
+        - settle: The number of seconds a file must stay unmodified before it is processed.
+        """
+        self.args = args
+        self.settle = settle
+        self.ledger_path = None if args.no_ledger else args.ledger
+        self.fragment_cache_path = None if args.no_fragment_cache else args.fragment_cache
+
+        # the extractors and fragment caches of the bookmakers seen so far, created on first use (see extractor)
+        self.extractors = {}
+        self.llm = None
+        self.store = BetStore(args.parquet) if args.parquet else None
+        self.fragment_caches = {}
+
+        # the (mtime, size) of every export when it was last processed
+        self.signatures = {}
+        self.bets = {}
+        self.files = {}
+        self.quarantined = {}
+        self.leg_index = LegIndex()
+        self.fingerprints = FingerprintIndex(None if args.no_fingerprints else args.fingerprints)
+        self.analytics = BankrollAnalytics.load(args.analytics) if args.analytics else None
+        self.started = time.time()
+        self.polls = 0
+        self.published = None
+
+        # the status endpoint reads snapshots taken after each scan, so it never waits for a scan to finish
+        self.lock = threading.Lock()
+        self.status_snapshot = {}
+        self.prometheus_snapshot = ''
+
+        if self.ledger_path:
+            ledger = BetLedger(self.ledger_path)
+            for bookmaker in bookmakers():
+                for bet_output in ledger.merge(bookmaker, []):
+                    self.bets[(bookmaker, bet_output.bet_id)] = (bet_date(bookmaker, bet_output), bet_output)
+            ledger.close()
+
+        self.take_snapshot()
+
+    def scan(self):
+        """
+        Finds the exports that are new or changed since they were processed.
+
+        Returns:
+        A list of (html_file, signature) pairs, oldest export first. Files modified less than
+        settle seconds ago are left for a later scan.
+        """
+        changed = []
+        now = time.time()
+        for html_file in find_exports(self.args.paths):
+            try:
+                stat = os.stat(html_file)
+            except FileNotFoundError:
+                continue
+            signature = (stat.st_mtime_ns, stat.st_size)
+            if self.signatures.get(html_file) == signature or now - stat.st_mtime < self.settle:
+                continue
+            changed.append((html_file, signature))
+        return changed
+
+    def extractor(self, bookmaker):
+        """
+        Returns the extractor of a bookmaker, creating it (and opening its fragment cache) the first time an export of the bookmaker is processed.
+        """
+        bet_extractor = self.extractors.get(bookmaker)
+        if bet_extractor is None:
+            bet_extractor = self.extractors[bookmaker] = create_extractor(bookmaker, self.args.parser_backend)
+            if self.fragment_cache_path:
+                self.fragment_caches[bookmaker] = FragmentCache.for_extractor(bet_extractor, self.fragment_cache_path)
+        return bet_extractor
+
+    def process_file(self, html_file, bookmaker):
+        """
+        Extracts, processes and classifies the new or pending bets of an export, and merges them into the index.
+
+        Parameters:
+        - html_file: The path of the export.
+        - bookmaker: The bookmaker of the export.
+
+        Returns:
+        A tuple with the number of bets in the export and the list of (bet_output, bet_details) pairs
+        that were processed.
+        """
+        bet_extractor = self.extractor(bookmaker)
+
+        with metrics.stage('extract'):
+            if self.fragment_cache_path:
+                bet_summaries = iter_bet_fragments(html_file, bet_extractor.summary_class, bet_extractor.summary_tag)
+            else:
+                bet_summaries = iter_bet_summaries(html_file, bet_extractor.summary_class, bet_extractor.summary_tag, bet_extractor.backend)
+            result = extract_summaries(bet_extractor, bet_summaries, bookmaker, self.ledger_path, self.fragment_cache_path)
+        if self.fragment_cache_path:
+            self.fragment_caches[bookmaker].update(result['cache_hits'], result['cache_entries'])
+        self.quarantined[html_file] = (bookmaker, len(result['bets']) + len(result['quarantined']), result['quarantined'])
+
+        keyed_bets = occurrence_keys(result['bets'])
+        with metrics.stage('process'):
+            processed = process_extracted({bookmaker: dict(keyed_bets)}, self.args)
+        with metrics.stage('fingerprint'):
+            # the file may have been exported again over one that was processed before
+            self.fingerprints.start_run()
+            processed[bookmaker] = self.fingerprints.assign_bets(bookmaker, processed[bookmaker], bet_extractor,
+                                                                 [(html_file, occurrence) for (bet_id, occurrence), bet_details in keyed_bets])
+        bets = processed[bookmaker]
+
+        if bets:
+            if self.llm is None:
+                self.llm = build_llm(self.args)
+            with metrics.stage('classify'):
+                classify(processed, self.args, self.llm)
+
+            if self.store is not None:
+                with metrics.stage('parquet'):
+                    self.store.write(bookmaker, bets, bet_extractor)
+
+            if self.ledger_path:
+                with metrics.stage('ledger'):
+                    ledger = BetLedger(self.ledger_path)
+                    for bet_output, bet_details in bets:
+                        ledger.record(bookmaker, bet_output)
+                    ledger.close()
+
+        with self.lock:
+            for bet_output, bet_details in bets:
+                self.bets[(bookmaker, bet_output.bet_id)] = (bet_date(bookmaker, bet_output), bet_output)
+            self.leg_index.add_bets(bookmaker, bets, bet_extractor)
+            if self.analytics is not None:
+                self.analytics.add_bets(bookmaker, bets, bet_extractor, bet_date)
+
+        return len(result['bet_ids']), bets
+
+    def publish(self, changed):
+        """
+        Writes the processed csv file from the index (replacing it atomically, see write_csv), saves
+        the analytics and upserts the changed bets into the tracker workbook.
+
+        Parameters:
+        - changed: The (date, bet_output) pairs processed since the last publish.
+        """
+        with self.lock:
+            rows = sorted(self.bets.values(), key=lambda row: row[0])
+
+        with metrics.stage('write'):
+            write_csv(self.args.output, [bet_output for date, bet_output in rows], list(TRACKER_COLUMNS.values()))
+
+        if self.analytics is not None and changed:
+            with metrics.stage('analytics'):
+                with self.lock:
+                    self.analytics.save(self.args.analytics)
+                    analytics_rows = self.analytics.rows()
+                if self.args.analytics_csv:
+                    write_rows(self.args.analytics_csv, analytics_rows, ['dimension', 'group', *REPORT_COLUMNS])
+
+        report_quarantine([(html_file, *quarantined) for html_file, quarantined in self.quarantined.items()], self.args.quarantine)
+
+        if changed:
+            self.fingerprints.save()
+            report_conflicts(self.fingerprints, self.args.conflicts)
+
+        if self.args.tracker and changed:
+            with metrics.stage('tracker'):
+                updated, inserted = upsert_tracker(self.args.tracker, [bet_output for date, bet_output in changed], [date for date, bet_output in changed])
+            print(f"{self.args.tracker}: {updated} bets updated, {inserted} inserted")
+
+        self.published = time.time()
+
+    def poll(self):
+        """
+        Processes the new and changed exports once and publishes the result if anything changed.
+
+        Returns:
+        The number of exports that were processed.
+        """
+        changed_files = self.scan()
+        changed_bets = []
+
+        for html_file, signature in changed_files:
+            start = time.perf_counter()
+            status = {'processed_at': time.time(), 'bookmaker': None, 'bets': 0, 'processed_bets': 0, 'error': None}
+            try:
+                bookmaker = self.args.bookmaker or detect_bookmaker(html_file, self.args.sniff_size)
+                status['bookmaker'] = bookmaker
+                if bookmaker is None:
+                    status['error'] = "unknown bookmaker"
+                else:
+                    status['bets'], bets = self.process_file(html_file, bookmaker)
+                    status['processed_bets'] = len(bets)
+                    changed_bets.extend((bet_date(bookmaker, bet_output), bet_output) for bet_output, bet_details in bets)
+            except Exception as e:
+                # a broken export must not stop the service; it is tried again once it changes
+                status['error'] = f"{type(e).__name__}: {e}"
+                metrics.increment('file_errors')
+
+            status['seconds'] = time.perf_counter() - start
+            metrics.observe('file_seconds', status['seconds'])
+            metrics.increment('files_processed')
+            self.signatures[html_file] = signature
+            with self.lock:
+                self.files[html_file] = status
+
+            if status['error']:
+                print(f"{html_file}: {status['error']}")
+            else:
+                print(f"{html_file} ({status['bookmaker']}): {status['processed_bets']} of {status['bets']} bets are new or pending, {status['seconds']:.3f}s")
+
+        if changed_files:
+            self.publish(changed_bets)
+
+        self.polls += 1
+        self.take_snapshot()
+        return len(changed_files)
+
+    def take_snapshot(self):
+        """
+        Saves the status and metrics served by the status endpoint.
+        """
+        with self.lock:
+            self.status_snapshot = {
+                'started': self.started,
+                'uptime_seconds': time.time() - self.started,
+                'polls': self.polls,
+                'published': self.published,
+                'bets_indexed': len(self.bets),
+                'bets_quarantined': sum(len(entries) for bookmaker, checked, entries in self.quarantined.values()),
+                'leg_index': self.leg_index.stats(),
+                'fingerprints': self.fingerprints.stats(),
+                'files': dict(self.files),
+                'metrics': metrics.summary(),
+            }
+            self.prometheus_snapshot = metrics.to_prometheus()
+
+    def status(self):
+        with self.lock:
+            return dict(self.status_snapshot, uptime_seconds=time.time() - self.started)
+
+    def find_bets(self, entity=None, market=None):
+        """
+        Returns the processed bets with a leg on an entity and/or a market, as tracker rows.
+        """
+        with self.lock:
+            keys = self.leg_index.bets(entity, market)
+            return [self.bets[key][1].tracker_row() for key in keys if key in self.bets]
+
+    def analytics_summary(self):
+        """
+        Returns the analytics report of all the bets and of every group, or None without --analytics.
+        """
+        with self.lock:
+            return self.analytics.summary() if self.analytics is not None else None
+
+    def prometheus(self):
+        with self.lock:
+            return self.prometheus_snapshot
+
+    def run(self, poll_interval=POLL_INTERVAL, max_polls=None):
+        """
+        Scans the watched paths every poll_interval seconds until interrupted (or max_polls scans).
+        """
+        while max_polls is None or self.polls < max_polls:
+            self.poll()
+            if max_polls is None or self.polls < max_polls:
+                time.sleep(poll_interval)
+
+    def close(self):
+        for fragment_cache in self.fragment_caches.values():
+            fragment_cache.close()
+        self.fingerprints.close()
+        if self.llm is not None and self.llm.cache is not None:
+            self.llm.cache.close()
+
+class StatusHandler(BaseHTTPRequestHandler):
+    """
+    Serves the status of the service as JSON on /status, its metrics in the Prometheus text format on
+    /metrics, the bets with a leg on a player or team and/or a market on /bets?entity=...&market=...,
+    and the analytics report on /analytics.
+    """
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path in ('/', '/status'):
+            body = json.dumps(self.server.service.status(), indent=2).encode()
+            content_type = 'application/json'
+        elif url.path == '/bets':
+            query = {name: values[0] for name, values in parse_qs(url.query).items()}
+            body = json.dumps(self.server.service.find_bets(query.get('entity'), query.get('market')), indent=2).encode()
+            content_type = 'application/json'
+        elif url.path == '/analytics':
+            body = json.dumps(self.server.service.analytics_summary(), indent=2, default=str).encode()
+            content_type = 'application/json'
+        elif url.path == '/metrics':
+            body = self.server.service.prometheus().encode()
+            content_type = 'text/plain; version=0.0.4'
+        else:
+            self.send_error(404)
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # keep the console for the output of the pipeline
+        pass
+
+def start_status_server(service, port=STATUS_PORT, host='127.0.0.1'):
+    """
+    Starts the status endpoint of a service in a background thread.
+
+    Returns:
+    The HTTP server; call shutdown() to stop it.
+    """
+    server = ThreadingHTTPServer((host, port), StatusHandler)
+    server.service = service
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def main(argv=None):
+    parser = build_parser()
+    parser.description = ("Watch directories of Bet365 and FanDuel exports and process new or changed exports as they land, "
+                          "keeping the parsers, the LLM client and the processed bets warm between drops.")
+    parser.add_argument('--poll-interval', type=float, default=POLL_INTERVAL, help="seconds between two scans of the watched paths (default: %(default)s)")
+    parser.add_argument('--settle', type=float, default=SETTLE_SECONDS, help="seconds a file must stay unmodified before it is processed (default: %(default)s)")
+    parser.add_argument('--status-port', type=int, default=STATUS_PORT, help="port of the local status endpoint, 0 to disable it (default: %(default)s)")
+    args = parser.parse_args(argv)
+    check_args(parser, args)
+
+    service = BetService(args, args.settle)
+    server = start_status_server(service, args.status_port) if args.status_port else None
+    if server is not None:
+        print(f"Status on http://127.0.0.1:{args.status_port}/status")
+
+    try:
+        service.run(args.poll_interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if server is not None:
+            server.shutdown()
+        service.close()
+        if args.metrics:
+            write_metrics(args.metrics, args.metrics_file)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,156 @@
+import os
+from decimal import Decimal
+
+# Default location of the Parquet bet store
+STORE_DIR = "bet_store"
+
+# The name of the file in each partition directory
+PARTITION_FILE = "bets.parquet"
+
+def to_decimal(amount):
+    """
+    Converts a number string such as '24.00' to a Decimal with cents, or None if there is no amount.
+    """
+    if amount in (None, ''):
+        return None
+    return Decimal(amount).quantize(Decimal('0.01'))
+
+def to_odds(odds):
+    """
+    Converts American odds such as '+150' or '-110' to an integer, or None if they are missing.
+    """
+    try:
+        return int(odds)
+    except (TypeError, ValueError):
+        return None
+
+def bet_record(bet_extractor, bet_output, bet_details):
+    """
+    Builds the typed record of a processed bet.
+
+    Parameters:
+    - bet_extractor: The extractor of the bet's bookmaker.
+    - bet_output: The processed bet, as returned by process_extracted_details (and classified).
+    - bet_details: The extracted details of the bet.
+
+    Returns:
+    A dictionary with the values of the store's columns, including the 'month' partition.
+    """
+    typed = bet_extractor.typed_details(bet_details)
+    placed = typed['placed']
+    return {
+        'bet_id': bet_output['bet_id'],
+        'placed': placed,
+        'date': placed.date(),
+        'month': placed.strftime('%Y-%m'),
+        'sport': bet_output.get('sport') or None,
+        'bet_type': bet_output['bet_type'] or None,
+        'selection': bet_output['selection'],
+        'fixture': bet_output['fixture'] or None,
+        'boost': bet_output['boost'] == 'Boost',
+        'bonus_bet': bet_output['bonus_bet'] == 'Y',
+        'stake': to_decimal(bet_output['wager']),
+        'return': to_decimal(typed['return']),
+        'odds': to_odds(bet_output['odds']),
+        'bet_status': bet_output['bet_status'],
+        'legs': typed['legs'],
+    }
+
+class BetStore():
+    """
+    A columnar store of processed bets, saved as Parquet files partitioned by bookmaker and month.
+
+    The partitions follow the Hive layout (bet_store/bookmaker=fanduel/month=2024-05/bets.parquet),
+    so the store can be scanned with pyarrow.dataset, pandas, DuckDB or Spark. Every column is typed:
+    stakes and returns are decimals, the placement time is a timestamp and the legs are a list of
+    structs. Writing a bet again replaces the stored one, so the store can be updated on every run.
+
+    Attributes:
+    - root: The directory of the store.
+    """
+    def __init__(self, root=STORE_DIR):
+        """
+        Parameters:
+        - root: The directory of the store; it is created when the first bet is written.
+        """
+        # imported here so pyarrow is only required when the store is used
+        import pyarrow
+        import pyarrow.compute
+        import pyarrow.parquet
+        self._pa = pyarrow
+        self._pq = pyarrow.parquet
+
+        self.root = root
+        self.schema = pyarrow.schema([
+            ('bet_id', pyarrow.string()),
+            ('placed', pyarrow.timestamp('s')),
+            ('date', pyarrow.date32()),
+            ('sport', pyarrow.string()),
+            ('bet_type', pyarrow.string()),
+            ('selection', pyarrow.string()),
+            ('fixture', pyarrow.string()),
+            ('boost', pyarrow.bool_()),
+            ('bonus_bet', pyarrow.bool_()),
+            ('stake', pyarrow.decimal128(12, 2)),
+            ('return', pyarrow.decimal128(12, 2)),
+            ('odds', pyarrow.int32()),
+            ('bet_status', pyarrow.string()),
+            ('legs', pyarrow.list_(pyarrow.struct([('name', pyarrow.string()), ('info', pyarrow.string())]))),
+        ])
+
+    def partition_path(self, bookmaker, month):
+        return os.path.join(self.root, f"bookmaker={bookmaker}", f"month={month}", PARTITION_FILE)
+
+    def write(self, bookmaker, bets, bet_extractor):
+        """
+        Writes (or replaces) processed bets in the store.
+
+        Only the partitions of the given bets are rewritten: the stored bets of each partition are
+        read, the ones with the same IDs are replaced, and the partition is written to a temporary
+        file that then replaces the old one, so readers never see a half-written file.
+
+        Parameters:
+        - bookmaker: The bookmaker the bets were placed with.
+        - bets: A list of (bet_output, bet_details) pairs.
+        - bet_extractor: The extractor of the bookmaker, used to type the raw details.
+
+        Returns:
+        The number of bets written.
+        """
+        months = {}
+        for bet_output, bet_details in bets:
+            record = bet_record(bet_extractor, bet_output, bet_details)
+            months.setdefault(record.pop('month'), {})[record['bet_id']] = record
+
+        for month, records in months.items():
+            path = self.partition_path(bookmaker, month)
+            table = self._pa.Table.from_pylist(list(records.values()), schema=self.schema)
+
+            if os.path.exists(path):
+                stored = self._pq.read_table(path, schema=self.schema)
+                kept = self._pa.compute.invert(self._pa.compute.is_in(stored['bet_id'], value_set=table['bet_id']))
+                table = self._pa.concat_tables([stored.filter(kept), table])
+
+            table = table.sort_by([('placed', 'ascending'), ('bet_id', 'ascending')])
+
+            # the temporary file starts with a dot so dataset scans skip it
+            directory = os.path.dirname(path)
+            temporary_path = os.path.join(directory, '.' + PARTITION_FILE + '.tmp')
+            os.makedirs(directory, exist_ok=True)
+            self._pq.write_table(table, temporary_path)
+            os.replace(temporary_path, path)
+
+        return sum(len(records) for records in months.values())
+
+    def dataset(self):
+        """
+        Returns the store as a pyarrow dataset, with 'bookmaker' and 'month' as partition columns.
+
+        Example:
+        store.dataset().to_table(filter=pyarrow.compute.field('month') >= '2024-01')
+        """
+        import pyarrow.dataset
+        partition_schema = self._pa.schema([('bookmaker', self._pa.string()), ('month', self._pa.string())])
+        partitioning = pyarrow.dataset.partitioning(partition_schema, flavor='hive')
+        schema = self._pa.unify_schemas([self.schema, partition_schema])
+        return pyarrow.dataset.dataset(self.root, schema=schema, format='parquet', partitioning=partitioning)
@@ -0,0 +1,167 @@
+from html.parser import HTMLParser
+
+from bet_parsers import SoupBackend
+
+# HTML elements that never have a closing tag, so they must not change the nesting depth
+VOID_ELEMENTS = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+                 'link', 'meta', 'param', 'source', 'track', 'wbr'}
+
+# Default number of characters read from the export file per chunk
+CHUNK_SIZE = 64 * 1024
+
+class BetFragmentParser(HTMLParser):
+    """
+    An event-based HTML parser that cuts a bet history export into bet summary fragments.
+
+    The parser is fed the export in chunks and never builds a document tree. Each time an
+    element carrying the bet container class is fully closed, its raw HTML is queued as a
+    fragment, so only one bet summary is held in memory at a time.
+
+    The elements open inside the container are kept on a stack. An end tag closes the most recent
+    open element of its name along with any element left open inside it, as browsers do for the
+    implied end tags of <p> or <li>, and a container that is never closed ends where the next one
+    starts, so an unclosed tag cannot merge the following bets into one fragment.
+
+    Attributes:
+    - class_name: The CSS class that marks a bet container (e.g., 'h-BetSummary' or 'stmnt-bet').
+    - tag: The tag name of the bet container, or None to accept any tag.
+    - fragments: The completed fragments that have not been consumed yet.
+    """
+    def __init__(self, class_name, tag=None):
+        """
+        Initializes the parser for the given bet container.
+
+        Parameters:
+        - class_name: The CSS class that marks a bet container.
+        - tag: The tag name of the bet container, or None to accept any tag.
+        """
+        # keep character references as they are so fragments are copied verbatim
+        super().__init__(convert_charrefs=False)
+        self.class_name = class_name
+        self.tag = tag
+        self.fragments = []
+        self._buffer = None
+        self._open = []
+
+    def _is_container(self, tag, attrs):
+        """
+        Checks whether a start tag opens a bet container.
+        """
+        if self.tag is not None and tag != self.tag:
+            return False
+        classes = (dict(attrs).get('class') or '').split()
+        return self.class_name in classes
+
+    def handle_starttag(self, tag, attrs):
+        if self._is_container(tag, attrs):
+            # the previous container was never closed
+            if self._buffer is not None:
+                self._flush()
+            self._buffer = []
+        elif self._buffer is None:
+            return
+
+        self._buffer.append(self.get_starttag_text())
+        if tag not in VOID_ELEMENTS:
+            self._open.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        if self._buffer is not None:
+            self._buffer.append(self.get_starttag_text())
+
+    def handle_endtag(self, tag):
+        if self._buffer is None:
+            return
+
+        self._buffer.append('</' + tag + '>')
+        if tag not in self._open:
+            # a void element or an end tag that matches nothing open
+            return
+
+        index = len(self._open) - 1 - self._open[::-1].index(tag)
+        del self._open[index:]
+
+        # the bet container has been closed, so the fragment is complete
+        if not self._open:
+            self._flush()
+
+    def handle_data(self, data):
+        if self._buffer is not None:
+            self._buffer.append(data)
+
+    def handle_entityref(self, name):
+        if self._buffer is not None:
+            self._buffer.append('&' + name + ';')
+
+    def handle_charref(self, name):
+        if self._buffer is not None:
+            self._buffer.append('&#' + name + ';')
+
+    def handle_comment(self, data):
+        if self._buffer is not None:
+            self._buffer.append('<!--' + data + '-->')
+
+    def close(self):
+        """
+        Finishes parsing, keeping a trailing bet container that was never closed.
+        """
+        super().close()
+        if self._buffer:
+            self._flush()
+
+    def _flush(self):
+        self.fragments.append(''.join(self._buffer))
+        self._buffer = None
+        self._open = []
+
+    def pop_fragments(self):
+        """
+        Returns the completed fragments and clears the queue.
+        """
+        fragments = self.fragments
+        self.fragments = []
+        return fragments
+
+def iter_bet_fragments(html_file, class_name, tag=None, chunk_size=CHUNK_SIZE):
+    """
+    Reads a bet history export in chunks and yields the raw HTML of one bet summary at a time.
+
+    Parameters:
+    - html_file: The path of the exported HTML file.
+    - class_name: The CSS class that marks a bet container.
+    - tag: The tag name of the bet container, or None to accept any tag.
+    - chunk_size: The number of characters read from the file per chunk.
+
+    Returns:
+    A generator of HTML strings, one per bet summary, in document order.
+    """
+    parser = BetFragmentParser(class_name, tag)
+    with open(html_file) as f:
+        for chunk in iter(lambda: f.read(chunk_size), ''):
+            parser.feed(chunk)
+            yield from parser.pop_fragments()
+    parser.close()
+    yield from parser.pop_fragments()
+
+def iter_bet_summaries(html_file, class_name, tag=None, backend=None, chunk_size=CHUNK_SIZE):
+    """
+    Yields the parsed bet summaries of an export one at a time.
+
+    Only the current bet summary is parsed into a tree, so memory stays flat no matter how
+    large the export is.
+
+    Parameters:
+    - html_file: The path of the exported HTML file.
+    - class_name: The CSS class that marks a bet container.
+    - tag: The tag name of the bet container, or None to accept any tag.
+    - backend: The parser backend used to parse each fragment (defaults to BeautifulSoup).
+    - chunk_size: The number of characters read from the file per chunk.
+
+    Returns:
+    A generator of parsed bet summaries, one per bet summary, in document order.
+    """
+    if backend is None:
+        backend = SoupBackend()
+
+    for fragment in iter_bet_fragments(html_file, class_name, tag, chunk_size):
+        yield backend.parse_fragment(fragment)
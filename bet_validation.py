@@ -0,0 +1,131 @@
+import json
+import os
+import re
+
+from bet_amounts import NUMBER_PATTERN
+
+# Default location of the bets that failed validation
+QUARANTINE_FILE = "quarantine.jsonl"
+
+# An amount extract_numbers can read (e.g., '$10.00'), for the schema of stakes and returns
+AMOUNT_PATTERN = re.compile(NUMBER_PATTERN)
+
+class InvalidBet(ValueError):
+    """
+    Raised when a bet summary does not match the schema of its bookmaker.
+
+    Only the bet is rejected: the pipeline moves it to the quarantine file and carries on with the
+    other bets of the export.
+
+    Attributes:
+    - field: The field of the selector plan (see selector_plans.py) that failed, e.g. 'date_and_time'.
+    - reason: Why the field failed.
+    """
+    def __init__(self, field, reason):
+        super().__init__(f"{field}: {reason}")
+        self.field = field
+        self.reason = reason
+
+def check_selectors(fields, required, plan):
+    """
+    Checks that the selectors a bet needs found an element, before its details are extracted.
+
+    Parameters:
+    - fields: The fields found by the selector plan (see SelectorPlan.run).
+    - required: The names of the fields that must be found.
+    - plan: The selector plan, whose selectors are named in the errors.
+
+    Raises:
+    - InvalidBet: For the first required field that found nothing.
+    """
+    for field in required:
+        if not fields[field]:
+            raise InvalidBet(field, f"no element matches '{plan.selectors[field]}'")
+
+def validate_details(bet_details, schema):
+    """
+    Checks the extracted details of a bet against the schema of its bookmaker.
+
+    Parameters:
+    - bet_details: The extracted details of the bet.
+    - schema: A dictionary mapping each required field of the details to the compiled pattern its text must contain.
+
+    Raises:
+    - InvalidBet: For the first field that is missing or does not match its pattern.
+    """
+    for field, pattern in schema.items():
+        value = bet_details[field]
+        if not value:
+            raise InvalidBet(field, "missing")
+        if not pattern.search(value):
+            raise InvalidBet(field, f"{value!r} does not match '{pattern.pattern}'")
+
+def quarantine_entry(bookmaker, bet_id, fragment, error):
+    """
+    Describes a bet that failed validation.
+
+    Parameters:
+    - bookmaker: The bookmaker of the bet.
+    - bet_id: The ID of the bet, or None if it could not be extracted.
+    - fragment: The raw HTML of the bet summary.
+    - error: The InvalidBet raised for the bet.
+
+    Returns:
+    A dictionary with the bookmaker, bet ID, failed selector field, reason and raw HTML of the bet.
+    """
+    return {
+        'bookmaker': bookmaker,
+        'bet_id': bet_id,
+        'selector': error.field,
+        'reason': error.reason,
+        'fragment': fragment,
+    }
+
+def failure_rates(checked, quarantined):
+    """
+    Summarizes the validation failures of a run per bookmaker and selector.
+
+    Parameters:
+    - checked: A dictionary mapping each bookmaker to the number of bets validated.
+    - quarantined: The quarantine entries of the run (see quarantine_entry).
+
+    Returns:
+    A dictionary mapping each bookmaker to the number of bets checked and quarantined and the
+    failure rate of every selector that failed at least once, highest first.
+    """
+    failures = {}
+    for entry in quarantined:
+        selectors = failures.setdefault(entry['bookmaker'], {})
+        selectors[entry['selector']] = selectors.get(entry['selector'], 0) + 1
+
+    summary = {}
+    for bookmaker, count in checked.items():
+        selectors = failures.get(bookmaker, {})
+        summary[bookmaker] = {
+            'checked': count,
+            'quarantined': sum(selectors.values()),
+            'selectors': {selector: failed / count for selector, failed in sorted(selectors.items(), key=lambda item: -item[1])} if count else {},
+        }
+    return summary
+
+def write_quarantine(path, quarantined):
+    """
+    Saves the bets that failed validation to a JSON lines file, one bet per line.
+
+    The file is replaced atomically. A run without failures removes the file of an earlier run,
+    since quarantined bets are never recorded in the ledger and are checked again every run.
+
+    Parameters:
+    - path: The path of the quarantine file.
+    - quarantined: The quarantine entries of the run (see quarantine_entry).
+    """
+    if not quarantined:
+        if os.path.exists(path):
+            os.remove(path)
+        return
+
+    temporary_path = path + '.tmp'
+    with open(temporary_path, 'w', encoding='utf-8') as file:
+        for entry in quarantined:
+            file.write(json.dumps(entry) + '\n')
+    os.replace(temporary_path, path)
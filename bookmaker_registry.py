@@ -0,0 +1,143 @@
+from importlib import import_module
+from importlib.metadata import entry_points
+
+# The entry point group that packages use to add bookmakers, e.g. in their pyproject.toml:
+#   [project.entry-points."bet_extractor.bookmakers"]
+#   draftkings = "draftkings_extractor:DraftKings"
+ENTRY_POINT_GROUP = 'bet_extractor.bookmakers'
+
+# The bookmakers shipped with the extractor, as 'module:Class' references so they are only imported when needed
+BUILTIN_EXTRACTORS = {
+    'bet365': 'bet_extractor:Bet365',
+    'fanduel': 'bet_extractor:Fanduel',
+}
+
+# number of bytes read from the start of a file to detect its bookmaker
+SNIFF_SIZE = 8 * 1024
+
+# the class attributes every registered extractor must declare (see BetExtractor)
+DECLARED_ATTRIBUTES = ['markers', 'summary_class', 'raw_csv', 'date_format']
+
+def load_reference(reference):
+    """
+    Imports the class named by a 'module:Class' reference.
+    """
+    module_name, _, class_name = reference.partition(':')
+    return getattr(import_module(module_name), class_name)
+
+class BookmakerRegistry():
+    """
+    The bet extractors of the supported bookmakers, by name.
+
+    The built-in bookmakers come first, then those that installed packages declare in the
+    ENTRY_POINT_GROUP entry point group (a plugin cannot replace a built-in bookmaker). Each
+    extractor declares what the pipeline needs to route and read its exports as class attributes
+    (see BetExtractor): its detection markers, bet summary element, raw CSV file and date format.
+
+    Extractors are referenced by 'module:Class' and only imported the first time they are needed:
+    when a run names the bookmaker, or when detection gets to it because no bookmaker before it
+    matched the file.
+
+    Attributes:
+    - references: The 'module:Class' reference of every bookmaker, in detection order.
+    - extractors: The extractor classes imported so far, by bookmaker.
+    """
+    def __init__(self, builtins=BUILTIN_EXTRACTORS, group=ENTRY_POINT_GROUP):
+        """
+        Initializes the registry with the built-in bookmakers and those of the installed plugins.
+
+        Parameters:
+        - builtins: A dictionary mapping the built-in bookmakers to their 'module:Class' references.
+        - group: The entry point group to discover plugins in, or None to skip discovery.
+        """
+        self.references = dict(builtins)
+        self.extractors = {}
+        if group:
+            for entry_point in entry_points(group=group):
+                self.references.setdefault(entry_point.name, entry_point.value)
+
+    def register(self, extractor_class):
+        """
+        Adds an extractor class to the registry under its bookmaker name, e.g. from a script or a test.
+
+        The class is checked right away and replaces any bookmaker of the same name. It can be used as
+        a class decorator.
+
+        Raises:
+        - ValueError: If the class does not declare its bookmaker or one of DECLARED_ATTRIBUTES.
+        """
+        if not getattr(extractor_class, 'bookmaker', None):
+            raise ValueError(f"{extractor_class.__name__} does not declare its bookmaker")
+        check_declarations(extractor_class.bookmaker, extractor_class)
+        self.references[extractor_class.bookmaker] = f"{extractor_class.__module__}:{extractor_class.__qualname__}"
+        self.extractors[extractor_class.bookmaker] = extractor_class
+        return extractor_class
+
+    def names(self):
+        """
+        Returns the names of the registered bookmakers, in detection order.
+        """
+        return list(self.references)
+
+    def get(self, bookmaker):
+        """
+        Returns the extractor class of a bookmaker, importing it on first use.
+
+        Raises:
+        - KeyError: If the bookmaker is not registered.
+        - ValueError: If the extractor does not declare one of DECLARED_ATTRIBUTES.
+        """
+        extractor_class = self.extractors.get(bookmaker)
+        if extractor_class is None:
+            extractor_class = load_reference(self.references[bookmaker])
+            check_declarations(bookmaker, extractor_class)
+            self.extractors[bookmaker] = extractor_class
+        return extractor_class
+
+    def create(self, bookmaker, backend='bs4'):
+        """
+        Returns a new extractor of a bookmaker that parses with the given backend (see bet_parsers.py).
+        """
+        return self.get(bookmaker)(backend)
+
+    def detect(self, html_file, sniff_size=SNIFF_SIZE):
+        """
+        Detects the bookmaker of an export from the markers in the start of the file.
+
+        Only the first sniff_size bytes are read, and they are not decoded, so routing an export
+        costs a single small read however large it is.
+
+        Parameters:
+        - html_file: The path of the HTML export.
+        - sniff_size: The number of bytes to look for the markers in.
+
+        Returns:
+        The name of the bookmaker, or None if no marker was found.
+        """
+        with open(html_file, 'rb') as f:
+            head = f.read(sniff_size)
+
+        for bookmaker in self.references:
+            if any(marker.encode() in head for marker in self.get(bookmaker).markers):
+                return bookmaker
+        return None
+
+def check_declarations(bookmaker, extractor_class):
+    missing = [attribute for attribute in DECLARED_ATTRIBUTES if not getattr(extractor_class, attribute, None)]
+    if missing:
+        raise ValueError(f"The extractor of {bookmaker} ({extractor_class.__name__}) does not declare {', '.join(missing)}")
+
+# The registry used by the pipeline
+registry = BookmakerRegistry()
+
+def bookmakers():
+    return registry.names()
+
+def get_extractor(bookmaker):
+    return registry.get(bookmaker)
+
+def create_extractor(bookmaker, backend='bs4'):
+    return registry.create(bookmaker, backend)
+
+def detect_bookmaker(html_file, sniff_size=SNIFF_SIZE):
+    return registry.detect(html_file, sniff_size)
@@ -0,0 +1,192 @@
+import re
+import sqlite3
+import time
+
+# Default location and limits of the on-disk classification cache
+CACHE_FILE = "classification_cache.sqlite"
+MAX_ENTRIES = 50000
+TTL_SECONDS = 90 * 24 * 60 * 60
+
+def normalize_selection(selection):
+    """
+    Normalizes a selection so that labels differing only in case or spacing share a cache entry.
+
+    Parameters:
+    - selection: The selection text sent to the LLM.
+
+    Returns:
+    The lower-cased selection with non-breaking spaces and runs of whitespace collapsed to one space.
+    """
+    selection = selection.replace('\xa0', ' ')
+    return re.sub(r'\s+', ' ', selection).strip().lower()
+
+class ClassificationCache():
+    """
+    A persistent cache of LLM classifications, stored in a local SQLite database.
+
+    Entries are keyed by the normalized selection text and by a version string identifying the
+    model and prompt, so changing either one never returns stale labels. The cache is bounded:
+    entries older than the TTL are ignored and removed, and once it holds more than max_entries
+    the least recently used entries are evicted.
+
+    Lookups only read the database. The entries used and added during a run are kept in memory
+    and written with save in one transaction, and old entries are only evicted when the number of
+    entries goes over max_entries.
+
+    Attributes:
+    - version: The model/prompt version the entries belong to.
+    - max_entries: The maximum number of entries kept for this version.
+    - ttl: The number of seconds an entry stays valid, or None to never expire.
+    - hits: The number of lookups answered from the cache.
+    - misses: The number of lookups that had to go to the LLM.
+    - entries: The number of entries of this version in the database, counting the unsaved ones.
+    """
+    def __init__(self, version, path=CACHE_FILE, max_entries=MAX_ENTRIES, ttl=TTL_SECONDS):
+        """
+        Opens (or creates) the cache database and removes the expired entries.
+
+        Parameters:
+        - version: The model/prompt version the entries belong to.
+        - path: The path of the SQLite database file.
+        - max_entries: The maximum number of entries kept for this version.
+        - ttl: The number of seconds an entry stays valid, or None to never expire.
+        """
+        self.version = version
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        # the time each entry was last used and the new entries, by normalized selection, until they are saved
+        self.used = {}
+        self.new_entries = {}
+
+        self.connection = sqlite3.connect(path)
+        self.connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS classifications (
+                version TEXT NOT NULL,
+                selection TEXT NOT NULL,
+                sport TEXT NOT NULL,
+                bet_type TEXT NOT NULL,
+                created REAL NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (version, selection)
+            )
+            """
+        )
+        self.connection.execute(
+            "CREATE INDEX IF NOT EXISTS classifications_last_used ON classifications (version, last_used)"
+        )
+        self.evict()
+        self.connection.commit()
+
+    def get(self, selection):
+        """
+        Looks up the classification of a selection.
+
+        Parameters:
+        - selection: The selection text sent to the LLM.
+
+        Returns:
+        A (sport, bet_type) tuple, or None if the selection is not cached or its entry has expired.
+        """
+        key = normalize_selection(selection)
+        now = time.time()
+        row = self.new_entries.get(key)
+        if row is None:
+            row = self.connection.execute(
+                "SELECT sport, bet_type, created FROM classifications WHERE version = ? AND selection = ?",
+                (self.version, key)
+            ).fetchone()
+
+        if row is None or (self.ttl is not None and now - row[2] > self.ttl):
+            self.misses += 1
+            return None
+
+        # refresh the entry so it is evicted last
+        self.used[key] = now
+        self.hits += 1
+        return row[0], row[1]
+
+    def put(self, selection, sport, bet_type):
+        """
+        Stores the classification of a selection (on disk at the next save).
+
+        Parameters:
+        - selection: The selection text sent to the LLM.
+        - sport: The sport returned by the LLM.
+        - bet_type: The bet type returned by the LLM.
+        """
+        self.new_entries[normalize_selection(selection)] = (sport, bet_type, time.time())
+
+    def save(self):
+        """
+        Writes the entries used and added since the last save in one transaction, evicting old
+        entries if the cache is over max_entries.
+        """
+        if not self.used and not self.new_entries:
+            return
+
+        self.connection.executemany(
+            "UPDATE classifications SET last_used = ? WHERE version = ? AND selection = ?",
+            [(last_used, self.version, key) for key, last_used in self.used.items()]
+        )
+        self.connection.executemany(
+            "INSERT OR REPLACE INTO classifications VALUES (?, ?, ?, ?, ?, ?)",
+            [(self.version, key, sport, bet_type, created, self.used.get(key, created))
+             for key, (sport, bet_type, created) in self.new_entries.items()]
+        )
+        # an entry replacing an expired one is counted twice, which at worst evicts (and recounts) early
+        self.entries += len(self.new_entries)
+        if self.entries > self.max_entries:
+            self.evict()
+        self.connection.commit()
+        self.used = {}
+        self.new_entries = {}
+
+    def evict(self, now=None):
+        """
+        Removes expired entries and, above max_entries, the least recently used ones, then counts the entries left.
+
+        Parameters:
+        - now: The current time, defaults to time.time().
+        """
+        now = time.time() if now is None else now
+        if self.ttl is not None:
+            self.connection.execute(
+                "DELETE FROM classifications WHERE version = ? AND created < ?",
+                (self.version, now - self.ttl)
+            )
+        self.connection.execute(
+            """
+            DELETE FROM classifications WHERE version = ? AND selection IN (
+                SELECT selection FROM classifications WHERE version = ?
+                ORDER BY last_used DESC LIMIT -1 OFFSET ?
+            )
+            """,
+            (self.version, self.version, self.max_entries)
+        )
+        self.entries = self.connection.execute(
+            "SELECT COUNT(*) FROM classifications WHERE version = ?", (self.version,)
+        ).fetchone()[0]
+
+    def stats(self):
+        """
+        Returns the hit/miss counters of the cache.
+
+        Returns:
+        A dictionary with the number of hits, misses and the hit rate.
+        """
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+    def close(self):
+        """
+        Saves and closes the cache database.
+        """
+        self.save()
+        self.connection.close()
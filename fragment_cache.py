@@ -0,0 +1,178 @@
+import hashlib
+import inspect
+import json
+import sqlite3
+import sys
+import time
+
+# Default location and limit of the on-disk fragment cache
+FRAGMENT_CACHE_FILE = "fragment_cache.sqlite"
+MAX_ENTRIES = 200000
+
+# The modules whose code decides the extracted details of a bet summary
+EXTRACTION_MODULES = ('bet_extractor', 'bet_parsers', 'selector_plans', 'bet_record', 'bet_validation')
+
+def fragment_key(fragment):
+    """
+    Returns the hash of the raw HTML of a bet summary, which keys its cache entry.
+    """
+    return hashlib.sha1(fragment.encode()).hexdigest()
+
+def extractor_version(bet_extractor):
+    """
+    Returns a short fingerprint of an extractor, its parser backend and the code they run.
+
+    Cached details are stored under this version, so changing the extraction code (a selector, a
+    parser backend, the fields of the records, ...) never returns details extracted by the old code.
+
+    Parameters:
+    - bet_extractor: The extractor of the bookmaker.
+    """
+    fingerprint = type(bet_extractor).__name__ + bet_extractor.backend.name
+    for module in EXTRACTION_MODULES:
+        if module in sys.modules:
+            fingerprint += inspect.getsource(sys.modules[module])
+    return hashlib.sha1(fingerprint.encode()).hexdigest()[:12]
+
+class FragmentCache():
+    """
+    A persistent cache of the details extracted from bet summaries, stored in a local SQLite database.
+
+    Bookmakers export the same settled bets every time, so most bet summaries of an export are
+    byte-for-byte the same as in the previous run. Entries are keyed by the hash of a summary's HTML,
+    so an unchanged summary is not parsed again, while a changed one (e.g., a pending bet that has
+    settled) misses the cache and is extracted. Entries also carry the version of the extractor that
+    produced them (see extractor_version); entries of other versions of the same extractor are
+    removed, and once the cache holds more than max_entries the least recently used ones are evicted.
+
+    Lookups only read the database, so worker processes can share it; the main process stores the
+    new entries of a run in one transaction with update.
+
+    Attributes:
+    - extractor: The name of the extractor class the entries belong to.
+    - version: The version of the extractor (see extractor_version).
+    - max_entries: The maximum number of entries kept, across all extractors.
+    - hits: The number of bet summaries found in the cache.
+    - misses: The number of bet summaries that had to be extracted.
+    """
+    def __init__(self, extractor, version, path=FRAGMENT_CACHE_FILE, max_entries=MAX_ENTRIES):
+        """
+        Opens (or creates) the cache database.
+
+        Parameters:
+        - extractor: The name of the extractor class the entries belong to.
+        - version: The version of the extractor (see extractor_version).
+        - path: The path of the SQLite database file.
+        - max_entries: The maximum number of entries kept, across all extractors.
+        """
+        self.extractor = extractor
+        self.version = version
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        self.connection = sqlite3.connect(path)
+        self.connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS fragments (
+                extractor TEXT NOT NULL,
+                version TEXT NOT NULL,
+                key TEXT NOT NULL,
+                bet_id TEXT NOT NULL,
+                details TEXT NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (extractor, version, key)
+            )
+            """
+        )
+        self.connection.execute(
+            "CREATE INDEX IF NOT EXISTS fragments_last_used ON fragments (last_used)"
+        )
+        self.connection.commit()
+
+    @classmethod
+    def for_extractor(cls, bet_extractor, path=FRAGMENT_CACHE_FILE, max_entries=MAX_ENTRIES):
+        """
+        Opens the cache entries of an extractor at its current version.
+        """
+        return cls(type(bet_extractor).__name__, extractor_version(bet_extractor), path, max_entries)
+
+    def get(self, key):
+        """
+        Looks up the extracted details of a bet summary.
+
+        Parameters:
+        - key: The hash of the summary's HTML (see fragment_key).
+
+        Returns:
+        A (bet_id, details) tuple with the details as a dictionary, or None if the summary is not cached.
+        """
+        row = self.connection.execute(
+            "SELECT bet_id, details FROM fragments WHERE extractor = ? AND version = ? AND key = ?",
+            (self.extractor, self.version, key)
+        ).fetchone()
+
+        if row is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return row[0], json.loads(row[1])
+
+    def update(self, hits, entries):
+        """
+        Refreshes the entries that were used and stores new ones, then evicts old entries.
+
+        Parameters:
+        - hits: The keys of the entries that were found by get, so they are evicted last.
+        - entries: (key, bet_id, details) tuples of newly extracted bet summaries, with the
+                   details as a dictionary.
+        """
+        now = time.time()
+        self.connection.executemany(
+            "UPDATE fragments SET last_used = ? WHERE extractor = ? AND version = ? AND key = ?",
+            [(now, self.extractor, self.version, key) for key in hits]
+        )
+        self.connection.executemany(
+            "INSERT OR REPLACE INTO fragments VALUES (?, ?, ?, ?, ?, ?)",
+            [(self.extractor, self.version, key, bet_id, json.dumps(details), now) for key, bet_id, details in entries]
+        )
+        self.evict()
+        self.connection.commit()
+
+    def evict(self):
+        """
+        Removes the entries of other versions of the extractor and, above max_entries, the least recently used ones.
+        """
+        self.connection.execute(
+            "DELETE FROM fragments WHERE extractor = ? AND version != ?",
+            (self.extractor, self.version)
+        )
+        self.connection.execute(
+            """
+            DELETE FROM fragments WHERE rowid IN (
+                SELECT rowid FROM fragments ORDER BY last_used DESC LIMIT -1 OFFSET ?
+            )
+            """,
+            (self.max_entries,)
+        )
+
+    def stats(self):
+        """
+        Returns the hit/miss counters of the cache.
+
+        Returns:
+        A dictionary with the number of hits, misses and the hit rate.
+        """
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+    def close(self):
+        """
+        Closes the cache database.
+        """
+        self.connection.close()
@@ -0,0 +1,228 @@
+import functools
+import json
+import time
+from array import array
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# The percentiles reported for every histogram
+PERCENTILES = [0.5, 0.9, 0.99]
+
+# The upper bounds of the histogram buckets, in seconds: from a microsecond to about 18 minutes,
+# each a fourth of an octave above the previous one, so a percentile is at most 19% above the true value
+BUCKET_BOUNDS = [1e-6 * 2 ** (i / 4) for i in range(121)]
+
+class Histogram():
+    """
+    A histogram that counts observations in the fixed BUCKET_BOUNDS buckets.
+
+    Its size does not grow with the number of observations, so a long-running service can observe
+    every call, and merging or summarizing it costs the same however many values it holds.
+    Percentiles are the upper bound of the bucket they fall in (capped at the largest value).
+
+    Attributes:
+    - counts: The number of observations in each bucket; the last one counts those above every bound.
+    - count: The number of observations.
+    - sum: The sum of the observations.
+    - max: The largest observation.
+    """
+    def __init__(self):
+        self.counts = array('q', bytes(8 * (len(BUCKET_BOUNDS) + 1)))
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(BUCKET_BOUNDS, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other):
+        for index, count in enumerate(other.counts):
+            if count:
+                self.counts[index] += count
+        self.count += other.count
+        self.sum += other.sum
+        self.max = max(self.max, other.max)
+
+    def percentile(self, fraction):
+        """
+        Returns the given percentile of the observations, using the nearest-rank method.
+        """
+        if not self.count:
+            return 0.0
+        rank = min(self.count, max(1, int(round(fraction * self.count + 0.5))))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                break
+        return min(BUCKET_BOUNDS[index], self.max) if index < len(BUCKET_BOUNDS) else self.max
+
+class Metrics():
+    """
+    A registry of the timings and counters collected during a run.
+
+    It holds four kinds of metrics:
+    - stages: the wall time of each pipeline stage (parse, extract, classify, write, ...).
+    - histograms: the distribution of observations, such as the latency of every extract_bet_details or LLM call (see Histogram).
+    - counters: event counts, such as the number of LLM calls or errors.
+    - gauges: values set once, such as the hit rate of the classification cache.
+
+    Worker processes collect their own metrics and hand them to the main process with drain and merge.
+    """
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """
+        Clears every metric.
+        """
+        self.stages = {}
+        self.histograms = {}
+        self.counters = {}
+        self.gauges = {}
+
+    @contextmanager
+    def stage(self, name):
+        """
+        Times a pipeline stage; the time is added to the stage if it runs more than once.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - start
+
+    def observe(self, name, value):
+        """
+        Records one observation in a histogram.
+        """
+        if name not in self.histograms:
+            self.histograms[name] = Histogram()
+        self.histograms[name].observe(value)
+
+    def increment(self, name, amount=1):
+        """
+        Increases a counter.
+        """
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def set(self, name, value):
+        """
+        Sets a gauge.
+        """
+        self.gauges[name] = value
+
+    def set_all(self, prefix, values):
+        """
+        Sets a gauge for every entry of a stats dictionary (e.g., the stats of the classification cache).
+        """
+        for name, value in values.items():
+            self.set(f"{prefix}_{name}", value)
+
+    def drain(self):
+        """
+        Returns all metrics and clears the registry, so a worker process can send them to the main process.
+        """
+        snapshot = {
+            'stages': self.stages,
+            'histograms': self.histograms,
+            'counters': self.counters,
+            'gauges': self.gauges,
+        }
+        self.reset()
+        return snapshot
+
+    def merge(self, snapshot):
+        """
+        Adds the metrics drained from another registry.
+        """
+        for name, seconds in snapshot['stages'].items():
+            self.stages[name] = self.stages.get(name, 0.0) + seconds
+        for name, histogram in snapshot['histograms'].items():
+            self.histograms.setdefault(name, Histogram()).merge(histogram)
+        for name, count in snapshot['counters'].items():
+            self.increment(name, count)
+        self.gauges.update(snapshot['gauges'])
+
+    def summary(self):
+        """
+        Returns the metrics as a dictionary, with count, sum, mean, max and percentiles for every histogram.
+        """
+        histograms = {}
+        for name, histogram in self.histograms.items():
+            histograms[name] = {
+                'count': histogram.count,
+                'sum': histogram.sum,
+                'mean': histogram.sum / histogram.count if histogram.count else 0.0,
+                'max': histogram.max,
+            }
+            for fraction in PERCENTILES:
+                histograms[name][f"p{int(fraction * 100)}"] = histogram.percentile(fraction)
+
+        return {
+            'stages': dict(self.stages),
+            'histograms': histograms,
+            'counters': dict(self.counters),
+            'gauges': dict(self.gauges),
+        }
+
+    def to_json(self):
+        """
+        Returns the summary as JSON.
+        """
+        return json.dumps(self.summary(), indent=2)
+
+    def to_prometheus(self, prefix='bet_extractor'):
+        """
+        Returns the summary in the Prometheus text exposition format.
+
+        Stages become a gauge labelled by stage, histograms become summaries with quantiles,
+        counters get the '_total' suffix and gauges are exported as they are.
+        """
+        summary = self.summary()
+        lines = [f"# TYPE {prefix}_stage_seconds gauge"]
+        for name, seconds in summary['stages'].items():
+            lines.append(f'{prefix}_stage_seconds{{stage="{name}"}} {seconds}')
+
+        for name, histogram in summary['histograms'].items():
+            metric = f"{prefix}_{name}"
+            lines.append(f"# TYPE {metric} summary")
+            for fraction in PERCENTILES:
+                lines.append(f'{metric}{{quantile="{fraction}"}} {histogram[f"p{int(fraction * 100)}"]}')
+            lines.append(f"{metric}_sum {histogram['sum']}")
+            lines.append(f"{metric}_count {histogram['count']}")
+
+        for name, count in summary['counters'].items():
+            lines.append(f"# TYPE {prefix}_{name}_total counter")
+            lines.append(f"{prefix}_{name}_total {count}")
+
+        for name, value in summary['gauges'].items():
+            lines.append(f"# TYPE {prefix}_{name} gauge")
+            lines.append(f"{prefix}_{name} {value}")
+
+        return '\n'.join(lines) + '\n'
+
+# The registry used by the pipeline
+metrics = Metrics()
+
+def timed(name):
+    """
+    A decorator that records the latency of every call of a function in the given histogram.
+
+    Parameters:
+    - name: The name of the histogram (e.g., 'extract_bet_details_seconds').
+    """
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                metrics.observe(name, time.perf_counter() - start)
+        return wrapper
+    return decorator
@@ -0,0 +1,153 @@
+from collections import Counter
+
+from classification_cache import normalize_selection
+
+def classify_serially(llm, selections):
+    """
+    Classifies selection texts one at a time.
+
+    As in LLM.run_llm, an error is printed and only affects its own selection.
+
+    Parameters:
+    - llm: The LLM object used for the classification.
+    - selections: The selection texts to classify.
+
+    Returns:
+    A list with the Classification of each selection, or None where it failed, in the order given.
+    """
+    outputs = []
+    for selection in selections:
+        try:
+            outputs.append(llm.classify(selection))
+        except Exception as e:
+            print(f"Error: {e}")
+            outputs.append(None)
+    return outputs
+
+def aggregate_sports(leg_sports):
+    """
+    Combines the sports of the legs of a multi bet into the sport of the bet.
+
+    Parameters:
+    - leg_sports: The sport of each leg, in leg order ('Unknown' or None when not classified).
+
+    Returns:
+    The most common known sport among the legs (the earliest leg wins a tie), or 'Unknown' if no leg has one.
+    """
+    counts = Counter(sport for sport in leg_sports if sport and sport != 'Unknown')
+    if not counts:
+        return 'Unknown'
+
+    top = max(counts.values())
+    return next(sport for sport in leg_sports if counts.get(sport) == top)
+
+class LegClassifier():
+    """
+    Classifies multi bets leg by leg instead of sending the whole numbered selection as one prompt.
+
+    Legs are deduplicated by their normalized text across every bet the classifier is applied to
+    (all the bookmakers of a run), so a leg that appears in 40 parlays is classified once. Each
+    unique leg is first tried with the rule classifier (if any) and only then sent to the LLM. The
+    leg sports are aggregated into the sport of the bet; the bet type of a multi bet is already
+    known from its number of legs. As in LLM.run_llm, a bet whose legs all failed keeps an empty
+    sport.
+
+    Attributes:
+    - legs: The number of legs seen in multi bets.
+    - unique_legs: The number of distinct legs among them.
+    - rule_legs: The number of distinct legs labelled by the rules.
+    - llm_legs: The number of distinct legs sent to the LLM.
+    - leg_sports: The sport of every distinct leg classified so far, by normalized text. Legs the LLM
+                  failed on are left out, so a later apply sends them again.
+    """
+    def __init__(self, llm, classify_selections=classify_serially, rule_classifier=None):
+        """
+        Initializes the leg classifier.
+
+        Parameters:
+        - llm: The LLM object used for the legs the rules cannot resolve.
+        - classify_selections: A function taking (llm, selections) and returning a Classification
+                               (or None) per selection, e.g. classify_serially or
+                               async_classifier.classify_selections.
+        - rule_classifier: An optional RuleClassifier tried before the LLM.
+        """
+        self.llm = llm
+        self.classify_selections = classify_selections
+        self.rule_classifier = rule_classifier
+        self.legs = 0
+        self.unique_legs = 0
+        self.rule_legs = 0
+        self.llm_legs = 0
+        self.leg_sports = {}
+
+    def apply(self, bet_outputs, all_bet_details, bet_extractor):
+        """
+        Sets the sport of the multi bets from their legs and returns the bets that are not multi bets.
+
+        Parameters:
+        - bet_outputs: The processed bet dictionaries, updated in place.
+        - all_bet_details: The extracted bet details, in the same order as bet_outputs.
+        - bet_extractor: The extractor that produced the bets, used to split them into legs.
+
+        Returns:
+        A tuple of two lists: the processed bets with a single leg, to be classified as a whole, and their extracted details.
+        """
+        singles = []
+        singles_details = []
+        multis = []
+        distinct_legs = {}
+
+        for bet_output, bet_details in zip(bet_outputs, all_bet_details):
+            legs = bet_extractor.leg_selections(bet_details)
+            if len(legs) < 2:
+                singles.append(bet_output)
+                singles_details.append(bet_details)
+                continue
+
+            keys = []
+            for leg in legs:
+                key = normalize_selection(leg)
+                if key not in self.leg_sports:
+                    distinct_legs.setdefault(key, leg)
+                keys.append(key)
+            multis.append((bet_output, keys))
+            self.legs += len(keys)
+
+        self.unique_legs += len(distinct_legs)
+
+        # try the rules first, then send the remaining new legs to the LLM in one batch
+        pending = {}
+        for key, leg in distinct_legs.items():
+            result = self.rule_classifier.classify(leg, need_bet_type=False) if self.rule_classifier else None
+            if result is not None:
+                self.leg_sports[key] = result[0]
+                self.rule_legs += 1
+            else:
+                pending[key] = leg
+
+        if pending:
+            self.llm_legs += len(pending)
+            outputs = self.classify_selections(self.llm, list(pending.values()))
+            for key, output in zip(pending, outputs):
+                if output is not None:
+                    self.leg_sports[key] = output.sport
+
+        for bet_output, keys in multis:
+            sports = [self.leg_sports.get(key) for key in keys]
+            bet_output['sport'] = aggregate_sports(sports) if any(sport is not None for sport in sports) else ''
+
+        return singles, singles_details
+
+    def stats(self):
+        """
+        Returns the leg counters.
+
+        Returns:
+        A dictionary with the number of legs, distinct legs, and distinct legs labelled by the rules and by the LLM.
+        """
+        return {
+            'legs': self.legs,
+            'unique_legs': self.unique_legs,
+            'rule_legs': self.rule_legs,
+            'llm_legs': self.llm_legs,
+        }
@@ -0,0 +1,235 @@
+import re
+import sys
+from collections import namedtuple
+
+from classification_cache import normalize_selection
+
+# The normalized components of a leg:
+# - entity: the player or team the leg is about (lower case), or None for game-level markets (e.g., total goals)
+# - market: what is measured (e.g., 'points', 'shots on target', 'money line'), lower case
+# - line: the threshold as a float ('25+' is stored as over 24.5) or the handicap of a spread (-5.5), or None
+# - side: 'over', 'under', 'yes', 'no' or None
+Leg = namedtuple('Leg', ['entity', 'market', 'line', 'side'])
+
+# Leg patterns, tried in order; each one may capture entity, market, line (a number), count (an N+ threshold) and side
+LEG_PATTERNS = [re.compile(pattern, re.IGNORECASE) for pattern in [
+    r'^(?P<entity>.+?) - (?P<side>Over|Under) \(?(?P<line>\d+(?:\.\d+)?)\)?(?: (?P<market>.+))?$',  # Justin Steele - Over 5.5 Strikeouts
+    r'^(?P<side>Over|Under) \(?(?P<line>\d+(?:\.\d+)?)\)?(?: (?P<market>.+))?$',                     # Over 1.5 Goals, Under 2.5
+    r'^(?P<market>Money ?Line) - (?P<entity>.+)$',                                                    # Money Line - MIA Marlins
+    r'^(?P<market>Match Result) will be (?P<entity>.+)$',                                             # Match result will be Brazil
+    r'^(?P<market>.+) - (?P<side>Yes|No)$',                                                           # A Run in the Top of the 1st - No
+    r'^(?P<entity>.+?) to (?:Record (?P<record>\d+)\+ )?(?P<market>.+)$',                             # Ryan Nugent-Hopkins to Score a Goal, Ke'Bryan Hayes To Record 2+ Hits
+    r'^(?P<entity>.+?):? (?P<count>\d+)\+ (?P<market>.+)$',                                           # Brittney Griner: 25+ Points
+    r'^(?P<entity>.+?) \(?(?P<line>[+-]\d+(?:\.\d+)?)\)?$',                                           # Lakers -5.5, MIA Marlins (+1.5)
+]]
+
+# The market Bet365 repeats after some selections, with the entity again ("Walker Buehler 7+ Strikeouts - Walker Buehler - Alt Strikeouts")
+MARKET_SUFFIX = re.compile(r'^(?P<name>.+) - (?P<entity>.+?) - (?P<market>(?!(?:Yes|No)$).+)$', re.IGNORECASE)
+
+# The promotion prefix of boosted legs ("Oilers Super Boost - ...") and the terms in parentheses at their end ("(Max Bet $25)")
+BOOST_PREFIX = re.compile(r'^.*?\bBoost\b\s*-\s*', re.IGNORECASE)
+TRAILING_TERMS = re.compile(r'\s*\((?:[^()]*(?:Max Bet|\d{4}|Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[^()]*)\)$', re.IGNORECASE)
+
+# A team in parentheses after a player name ("Alec Bohm (PHI Phillies)") and the alternate-line marker of a market
+ENTITY_TEAM = re.compile(r'\s*\([^()]*\)$')
+ALTERNATE_MARKET = re.compile(r'^alt\.?\s+|\balt\.?\s+', re.IGNORECASE)
+
+def intern(text):
+    return sys.intern(text) if text is not None else None
+
+def normalize_market(market):
+    """
+    Lower-cases a market and drops the alternate-line marker, so 'Alt Strikeouts' and 'Strikeouts' share a market.
+    """
+    if not market:
+        return None
+    return normalize_selection(ALTERNATE_MARKET.sub('', market)) or None
+
+def match_leg(text):
+    """
+    Matches a leg text against LEG_PATTERNS.
+
+    Returns:
+    A Leg, or None if no pattern matches.
+    """
+    for pattern in LEG_PATTERNS:
+        match = pattern.match(text)
+        if match is None:
+            continue
+
+        groups = match.groupdict()
+        entity = groups.get('entity')
+        line = float(groups['line']) if groups.get('line') else None
+        side = groups['side'].lower() if groups.get('side') else None
+
+        # "N+" means at least N, the same bet as over N - 0.5
+        count = groups.get('count') or groups.get('record')
+        if count:
+            line = int(count) - 0.5
+            side = 'over'
+        elif 'record' in groups:
+            side = 'yes'
+
+        if entity is not None:
+            entity = normalize_selection(ENTITY_TEAM.sub('', entity)) or None
+        return Leg(entity, normalize_market(groups.get('market')), line, side)
+    return None
+
+def parse_leg(name, info=None):
+    """
+    Parses a leg into its entity, market, line and side.
+
+    Parameters:
+    - name: The selection text of the leg (a Bet365 selection label or a Fanduel leg name).
+    - info: The market text shown under a Fanduel leg (e.g., 'To Record 2+ Hits'), or None.
+
+    Returns:
+    A Leg. A leg that no pattern recognizes is taken as a selection of its whole normalized text
+    (usually a team, e.g. 'Toronto Maple Leafs'), with its info as the market.
+    """
+    name = TRAILING_TERMS.sub('', BOOST_PREFIX.sub('', name.replace('\xa0', ' ').strip()))
+    info = info.replace('\xa0', ' ').strip() if info else None
+
+    # the repeated entity and market at the end of a Bet365 selection play the part of the Fanduel info
+    suffix_entity = None
+    suffix = MARKET_SUFFIX.match(name) if not info else None
+    if suffix is not None:
+        name, suffix_entity, info = suffix.group('name', 'entity', 'market')
+
+    leg = match_leg(name)
+    if leg is not None and leg.market is None and info:
+        # the market of a Fanduel over/under is in its info ("Under 2.5" of "Total Sets")
+        leg = leg._replace(market=normalize_market(info))
+    if leg is None and info:
+        # a Fanduel leg named after the player, with the market in its info ("Ke'Bryan Hayes" "To Record 2+ Hits")
+        leg = match_leg(name + ' ' + info)
+    if leg is None:
+        leg = Leg(normalize_selection(name) or None, normalize_market(info), None, None)
+    if leg.entity is None and suffix_entity:
+        leg = leg._replace(entity=normalize_selection(ENTITY_TEAM.sub('', suffix_entity)) or None)
+    if leg.market is None and leg.side is None and leg.line is not None:
+        leg = leg._replace(market='spread')
+    return leg
+
+class LegIndex():
+    """
+    An in-memory index of the legs of processed bets, by entity and by market.
+
+    Every leg is parsed once into its (entity, market, line, side) components (see parse_leg). The
+    same leg text is parsed only once, and equal components share one interned Leg (and interned
+    strings), so a history of many bets over the same players and markets stays small. Per-player
+    or per-market queries are then dictionary lookups instead of scans over the selection texts.
+
+    Bets are keyed by (bookmaker, bet_id); adding a bet again replaces its legs.
+
+    Attributes:
+    - bet_legs: The legs of each bet, keyed by (bookmaker, bet_id).
+    - by_entity: The keys of the bets with a leg on each entity.
+    - by_market: The keys of the bets with a leg on each market.
+    """
+    def __init__(self):
+        self.bet_legs = {}
+        self.by_entity = {}
+        self.by_market = {}
+        # the interned Leg of every distinct component tuple, and the Leg of every distinct (name, info) text
+        self.components = {}
+        self.parsed = {}
+
+    def leg(self, name, info=None):
+        """
+        Returns the interned Leg of a leg text, parsing it only the first time it is seen.
+        """
+        key = (name, info)
+        leg = self.parsed.get(key)
+        if leg is None:
+            parsed = parse_leg(name, info)
+            parsed = Leg(intern(parsed.entity), intern(parsed.market), parsed.line, parsed.side)
+            leg = self.parsed[key] = self.components.setdefault(parsed, parsed)
+        return leg
+
+    def add(self, bookmaker, bet_id, legs):
+        """
+        Indexes the legs of a bet, replacing the legs it was indexed with before.
+
+        Parameters:
+        - bookmaker: The bookmaker of the bet.
+        - bet_id: The ID of the bet.
+        - legs: The legs of the bet, as dictionaries with a 'name' and an 'info' (see typed_details).
+        """
+        key = (bookmaker, bet_id)
+        self.remove(key)
+
+        bet_legs = tuple(self.leg(leg['name'], leg['info']) for leg in legs)
+        self.bet_legs[key] = bet_legs
+        for leg in bet_legs:
+            if leg.entity is not None:
+                self.by_entity.setdefault(leg.entity, {})[key] = None
+            if leg.market is not None:
+                self.by_market.setdefault(leg.market, {})[key] = None
+
+    def add_bets(self, bookmaker, bets, bet_extractor):
+        """
+        Indexes processed bets.
+
+        Parameters:
+        - bookmaker: The bookmaker of the bets.
+        - bets: A list of (bet_output, bet_details) pairs.
+        - bet_extractor: The extractor of the bookmaker, whose typed_details splits a bet into legs.
+        """
+        for bet_output, bet_details in bets:
+            self.add(bookmaker, bet_output['bet_id'], bet_extractor.typed_details(bet_details)['legs'])
+
+    def remove(self, key):
+        for leg in self.bet_legs.pop(key, ()):
+            for index, component in ((self.by_entity, leg.entity), (self.by_market, leg.market)):
+                if component in index:
+                    index[component].pop(key, None)
+                    if not index[component]:
+                        del index[component]
+
+    def bets(self, entity=None, market=None):
+        """
+        Finds the bets with a leg on an entity and/or a market.
+
+        Parameters:
+        - entity: A player or team name (matched after normalization, e.g., case-insensitively).
+        - market: A market name (e.g., 'Points' or 'Alt Strikeouts').
+
+        Returns:
+        The (bookmaker, bet_id) keys of the matching bets, in the order they were indexed. With both
+        an entity and a market, the same leg must have both.
+        """
+        if entity is None and market is None:
+            return list(self.bet_legs)
+
+        entity = normalize_selection(entity) if entity is not None else None
+        market = normalize_market(market) if market is not None else None
+        candidates = self.by_entity.get(entity, {}) if entity is not None else self.by_market.get(market, {})
+        if entity is None or market is None:
+            return list(candidates)
+        return [key for key in candidates if any(leg.entity == entity and leg.market == market for leg in self.bet_legs[key])]
+
+    def rows(self):
+        """
+        Returns one row per leg: the bookmaker, bet ID, leg number (from 1) and the components of the leg.
+        """
+        return [[bookmaker, bet_id, number, *leg] for (bookmaker, bet_id), legs in self.bet_legs.items()
+                for number, leg in enumerate(legs, 1)]
+
+    def stats(self):
+        """
+        Returns the size of the index.
+
+        Returns:
+        A dictionary with the number of bets, legs, distinct legs, entities and markets.
+        """
+        return {
+            'bets': len(self.bet_legs),
+            'legs': sum(len(legs) for legs in self.bet_legs.values()),
+            'distinct_legs': len(self.components),
+            'entities': len(self.by_entity),
+            'markets': len(self.by_market),
+        }
+
+# The columns of the rows returned by LegIndex.rows
+LEG_COLUMNS = ['bookmaker', 'bet_id', 'leg', 'entity', 'market', 'line', 'side']
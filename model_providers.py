@@ -0,0 +1,175 @@
+import asyncio
+import json
+import os
+import time
+
+from classification_cache import normalize_selection
+
+# the LLM client (langchain, pydantic) is imported when a chain is built, so the command line
+# options of this module can be read without loading it
+
+# The model providers the LLM can classify with
+# - openai: the OpenAI chat-completions API (or an OpenAI-compatible server given by its base URL)
+# - stub: the StubChain of async_classifier.py, which labels every selection 'Unknown'
+# - record: the OpenAI chain, with every response appended to a recording
+# - replay: the responses of a recording, without any model
+PROVIDERS = ['openai', 'stub', 'record', 'replay']
+
+# Default location of the recorded responses
+RECORDING_FILE = "llm_recording.jsonl"
+
+def load_recording(path):
+    """
+    Loads the responses of a recording.
+
+    Parameters:
+    - path: The path of the recording, a JSON lines file with one {"input", "sport", "bet_type"} object per response.
+
+    Returns:
+    A dictionary mapping each normalized selection to its (sport, bet_type) tuple. When a selection
+    was recorded more than once, its last response is kept.
+    """
+    responses = {}
+    if not os.path.exists(path):
+        return responses
+    with open(path, encoding='utf-8') as file:
+        for line in file:
+            if line.strip():
+                response = json.loads(line)
+                responses[normalize_selection(response['input'])] = (response['sport'], response['bet_type'])
+    return responses
+
+class RecordingChain():
+    """
+    Wraps a chain and appends each of its responses to a recording, so a run against the real model
+    can be replayed later without it (see ReplayChain).
+
+    Selections that are already in the recording are not written again, so recording a new export
+    into an existing file only adds its new selections.
+
+    Attributes:
+    - chain: The wrapped chain.
+    - path: The path of the recording.
+    - recorded: The number of responses appended to the recording.
+    """
+    def __init__(self, chain, path=RECORDING_FILE):
+        """
+        Initializes the recording chain.
+
+        Parameters:
+        - chain: The chain whose responses are recorded.
+        - path: The path of the recording; it is created if needed.
+        """
+        self.chain = chain
+        self.path = path
+        self.recorded = 0
+        self._known = load_recording(path)
+
+    def _record(self, inputs, output):
+        key = normalize_selection(inputs['input'])
+        if self._known.get(key) == (output.sport, output.bet_type):
+            return output
+
+        self._known[key] = (output.sport, output.bet_type)
+        with open(self.path, 'a', encoding='utf-8') as file:
+            file.write(json.dumps({'input': inputs['input'], 'sport': output.sport, 'bet_type': output.bet_type}) + '\n')
+        self.recorded += 1
+        return output
+
+    def invoke(self, inputs):
+        return self._record(inputs, self.chain.invoke(inputs))
+
+    async def ainvoke(self, inputs):
+        return self._record(inputs, await self.chain.ainvoke(inputs))
+
+class ReplayChain():
+    """
+    Answers classification requests from a recording (see RecordingChain), so the pipeline runs
+    deterministically and without network access.
+
+    A selection that is not in the recording raises an error, which the classifiers report like any
+    failed model request.
+
+    Attributes:
+    - responses: The recorded (sport, bet_type) of each normalized selection.
+    - latency: The number of seconds each request takes, to emulate the model.
+    - hits: The number of requests answered from the recording.
+    - misses: The number of requests for selections that were not recorded.
+    """
+    def __init__(self, path=RECORDING_FILE, latency=0.0):
+        """
+        Loads the recording.
+
+        Parameters:
+        - path: The path of the recording.
+        - latency: The number of seconds each request takes.
+        """
+        from config import Classification
+        self.classification = Classification
+        self.responses = load_recording(path)
+        self.latency = latency
+        self.hits = 0
+        self.misses = 0
+
+    def _answer(self, inputs):
+        response = self.responses.get(normalize_selection(inputs['input']))
+        if response is None:
+            self.misses += 1
+            raise LookupError(f"No recorded response for {inputs['input']!r}")
+        self.hits += 1
+        sport, bet_type = response
+        return self.classification(sport=sport, bet_type=bet_type)
+
+    def invoke(self, inputs):
+        if self.latency:
+            time.sleep(self.latency)
+        return self._answer(inputs)
+
+    async def ainvoke(self, inputs):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self._answer(inputs)
+
+def build_chain(provider, recording=RECORDING_FILE, base_url=None, latency=0.0):
+    """
+    Builds the chain of a model provider.
+
+    Parameters:
+    - provider: One of PROVIDERS.
+    - recording: The path of the recording written by 'record' and read by 'replay'.
+    - base_url: The base URL of an OpenAI-compatible API for 'openai' and 'record' (e.g., the
+                local stand-in server in stub_model_server.py), or None for OpenAI.
+    - latency: The number of seconds each request takes for 'stub' and 'replay'.
+
+    Returns:
+    A runnable with invoke and ainvoke, to pass as the chain of the LLM.
+    """
+    from async_classifier import StubChain
+    from config import openai_chain
+
+    if provider == 'openai':
+        return openai_chain(base_url)
+    if provider == 'record':
+        return RecordingChain(openai_chain(base_url), recording)
+    if provider == 'replay':
+        return ReplayChain(recording, latency)
+    if provider == 'stub':
+        return StubChain(latency=latency)
+    raise ValueError(f"Unknown model provider '{provider}', expected one of {', '.join(PROVIDERS)}")
+
+def cache_model(provider, base_url=None):
+    """
+    Returns the model name the classification cache of a provider is versioned by (see classification_version).
+
+    Only the OpenAI API gives real labels; a run against another server keeps its answers under its
+    own version, so they are never served to a run against OpenAI.
+
+    Returns:
+    The model name, or None when the provider should not use the classification cache (the stub
+    labels everything 'Unknown', a recording must see every selection, and a replay needs no cache).
+    """
+    from config import MODEL_NAME
+
+    if provider != 'openai':
+        return None
+    return MODEL_NAME if base_url is None else f"{MODEL_NAME}@{base_url}"
@@ -0,0 +1,230 @@
+import re
+
+# Market keywords and league names that identify a sport. Every pattern is matched case-insensitively.
+# Markets that other sports also offer (e.g., hits and saves in hockey, runs and innings in cricket,
+# field goals in basketball, double chance and draw no bet in hockey) are deliberately left out.
+SPORT_KEYWORDS = {
+    'MLB': [r'\bMLB\b', r'Pitcher Strikeouts', r'\bStrikeouts\b', r'Home Runs?', r'Hits Allowed', r'\bRBIs?\b',
+            r'Total Bases', r'Stolen Bases?', r'Run Line', r'\bNRFI\b', r'\bYRFI\b'],
+    'NBA': [r'\bNBA\b'],
+    'NHL': [r'\bNHL\b', r'Puck Line', r'Power Play Points'],
+    'NFL': [r'\bNFL\b', r'Touchdowns?', r'Passing Yards', r'Rushing Yards', r'Receiving Yards',
+            r'\bReceptions\b'],
+    'Soccer': [r'Shots on Target', r'Both Teams to Score', r'Clean Sheet', r'Match Result', r'Full Time Result', r'\bCorners\b', r'\bMLS\b', r'\bEPL\b', r'Premier League',
+               r'Champions League', r'\bUEFA\b', r'\bLa Liga\b', r'Serie A', r'Bundesliga', r'Copa America'],
+    'Tennis': [r'\bATP\b', r'\bWTA\b', r'Total Sets', r'Set Betting', r'Total Games', r'Games Handicap',
+               r'Tie ?Break'],
+    'Golf': [r'\bPGA\b', r'\bLPGA\b', r'\bLIV Golf\b', r'DP World Tour', r'\bBirdies?\b', r'\bBogeys?\b',
+             r'or Better in Round'],
+    'UFC': [r'\bUFC\b', r'Method of Victory', r'by (?:KO|TKO|Submission|Decision)\b', r'Go the Distance'],
+    'Formula 1': [r'Formula 1', r'\bF1\b', r'Grand Prix', r'Fastest Lap', r'Pole Position'],
+}
+
+# Team nicknames that identify a sport. These are matched case-sensitively; nicknames shared by
+# teams in two leagues (e.g., Giants, Rangers, Kings, Panthers) are deliberately left out.
+TEAM_NAMES = {
+    'MLB': ['Diamondbacks', 'D-backs', 'D-Backs', 'Braves', 'Orioles', 'Red Sox', 'Cubs', 'White Sox', 'Reds',
+            'Guardians', 'Rockies', 'Tigers', 'Astros', 'Royals', 'Angels', 'Dodgers', 'Marlins', 'Brewers',
+            'Twins', 'Mets', 'Yankees', 'Athletics', 'Phillies', 'Pirates', 'Padres', 'Mariners', 'Rays',
+            'Blue Jays', 'Nationals'],
+    'NBA': ['Celtics', 'Knicks', '76ers', 'Raptors', 'Bulls', 'Cavaliers', 'Pistons', 'Pacers', 'Bucks',
+            'Hawks', 'Hornets', 'Wizards', 'Nuggets', 'Timberwolves', "T'Wolves", 'Thunder', 'Trail Blazers',
+            'Warriors', 'Clippers', 'Lakers', 'Suns', 'Mavericks', 'Mavs', 'Rockets', 'Grizzlies', 'Pelicans',
+            'Spurs'],
+    'NHL': ['Bruins', 'Sabres', 'Red Wings', 'Canadiens', 'Senators', 'Lightning', 'Maple Leafs', 'Hurricanes',
+            'Blue Jackets', 'Devils', 'Islanders', 'Flyers', 'Penguins', 'Capitals', 'Blackhawks', 'Avalanche',
+            'Predators', 'Blues', 'Ducks', 'Coyotes', 'Flames', 'Oilers', 'Canucks', 'Golden Knights', 'Kraken',
+            'Sharks'],
+    'NFL': ['Bills', 'Dolphins', 'Patriots', 'Ravens', 'Bengals', 'Browns', 'Steelers', 'Texans', 'Colts',
+            'Jaguars', 'Titans', 'Broncos', 'Chiefs', 'Raiders', 'Chargers', 'Cowboys', 'Commanders', 'Bears',
+            'Lions', 'Packers', 'Vikings', 'Falcons', 'Saints', 'Buccaneers', '49ers', 'Seahawks', 'Rams'],
+}
+
+# Markers of leagues that have no sport label of their own (e.g., WNBA games share NBA markets);
+# a selection containing one is always left to the LLM
+VETO_KEYWORDS = [r'\bWNBA\b', r'\bNCAA[FB]?\b', r'\bCFL\b', r'\bKBO\b', r'\bNPB\b']
+VETO_TEAM_NAMES = ['Mercury', 'Wings', 'Aces', 'Sparks', 'Storm', 'Fever', 'Lynx', 'Liberty', 'Mystics',
+                   'Dream', 'Sky', 'Sun', 'Valkyries']
+
+# Patterns that identify a bet type, matched case-insensitively against the selection only. Where
+# the patterns of two bet types match at the same place, the one listed first wins, so the specific
+# bet types come before the generic ones (e.g., '1+ Home Runs' is a home run bet, not an over).
+BET_TYPE_KEYWORDS = {
+    'No Run First Inning': [r'\bNRFI\b', r'No Runs? (?:in the )?First Inning',
+                            r'A Run in the (?:Top|Bottom) of the 1st - No'],
+    'To Hit Home Run': [r'to Hit a Home Run', r'\b1\+ Home Runs?'],
+    'Not to Win': [r'Not to Win'],
+    'Over / Under': [r'^\s*(?:\d+\.\s*)?(?:Over|Under)\b', r'\b(?:Over|Under) \(?\d', r'\d\+ ', r'\bAlt\.? '],
+    'Head to Head': [r'Money ?Line', r'Head to Head', r'\bH2H\b'],
+    'Winner': [r'(?<!Not )to Win\b', r'Match Result will be', r'\bWinner\b', r'\bOutright\b'],
+}
+
+# Patterns of the line of a prop (e.g., '25+', 'Over 8.5'), matched case-insensitively against the
+# selection only. A selection with several lines combines several props (e.g., 'Player A 25+ Points &
+# Player B 8+ Rebounds'), so it is left to the LLM even when each prop alone would be an over.
+THRESHOLD_KEYWORDS = [r'\d\+', r'\b(?:Over|Under) \(?\d']
+
+def compile_index(rules, flags=0, boundaries=False):
+    """
+    Compiles label → patterns rules into one alternation so a text is scanned once for all labels.
+
+    Parameters:
+    - rules: A dictionary mapping each label to its patterns.
+    - flags: The regex flags of the compiled pattern.
+    - boundaries: Whether the patterns are literal names that must not be part of a longer word.
+
+    Returns:
+    A (pattern, labels) tuple, where labels maps the name of each group in the pattern to its label.
+    """
+    alternatives = []
+    labels = {}
+    for label, patterns in rules.items():
+        if boundaries:
+            patterns = [re.escape(pattern) for pattern in patterns]
+        group = f"g{len(labels)}"
+        alternatives.append(f"(?P<{group}>{'|'.join(patterns)})")
+        labels[group] = label
+
+    pattern = '|'.join(alternatives)
+    if boundaries:
+        pattern = f"(?<![\\w'-])(?:{pattern})(?![\\w'-])"
+    return re.compile(pattern, flags), labels
+
+class RuleClassifier():
+    """
+    A deterministic classifier that labels bets from keywords, league names and team names.
+
+    It is used as a fast path before the LLM: a bet is resolved only when the rules point to
+    exactly one sport (and, for single bets, exactly one bet type); every other bet is left for
+    the LLM. The labels are the same ones allowed by the 'Classification' model in config.py.
+
+    Attributes:
+    - resolved: The number of bets labelled by the rules.
+    - unresolved: The number of bets left for the LLM.
+    """
+    def __init__(self, sport_keywords=SPORT_KEYWORDS, team_names=TEAM_NAMES, bet_type_keywords=BET_TYPE_KEYWORDS,
+                 veto_keywords=VETO_KEYWORDS, veto_team_names=VETO_TEAM_NAMES, threshold_keywords=THRESHOLD_KEYWORDS):
+        """
+        Compiles the rule index.
+
+        Parameters:
+        - sport_keywords: Case-insensitive patterns for each sport.
+        - team_names: Case-sensitive team nicknames for each sport.
+        - bet_type_keywords: Case-insensitive patterns for each bet type.
+        - veto_keywords: Case-insensitive patterns that always send a bet to the LLM.
+        - veto_team_names: Case-sensitive names that always send a bet to the LLM.
+        - threshold_keywords: Case-insensitive patterns of the line of a prop; a single bet with more
+                              than one line is sent to the LLM.
+        """
+        self.sport_pattern, self.sport_labels = compile_index(sport_keywords, re.IGNORECASE | re.MULTILINE)
+        self.team_pattern, self.team_labels = compile_index(team_names, boundaries=True)
+        self.bet_type_pattern, self.bet_type_labels = compile_index(bet_type_keywords, re.IGNORECASE | re.MULTILINE)
+        self.veto_pattern, _ = compile_index({'veto': veto_keywords}, re.IGNORECASE)
+        self.veto_team_pattern, _ = compile_index({'veto': veto_team_names}, boundaries=True)
+        self.threshold_pattern, _ = compile_index({'threshold': threshold_keywords}, re.IGNORECASE)
+        self.resolved = 0
+        self.unresolved = 0
+
+    def match_sports(self, text):
+        """
+        Returns the set of sports the text points to.
+        """
+        sports = {self.sport_labels[match.lastgroup] for match in self.sport_pattern.finditer(text)}
+        sports.update(self.team_labels[match.lastgroup] for match in self.team_pattern.finditer(text))
+        return sports
+
+    def match_bet_types(self, text):
+        """
+        Returns the set of bet types the text points to.
+        """
+        return {self.bet_type_labels[match.lastgroup] for match in self.bet_type_pattern.finditer(text)}
+
+    def classify(self, selection, context='', need_bet_type=True):
+        """
+        Classifies a selection if the rules can do so with confidence.
+
+        Parameters:
+        - selection: The selection text of the bet.
+        - context: Other text about the bet that can reveal the sport (fixture, FanDuel leg info).
+        - need_bet_type: Whether the bet type is needed; multi bets already have theirs.
+
+        Returns:
+        A (sport, bet_type) tuple, or None if the bet must go to the LLM. The bet type is None
+        when it was not needed.
+        """
+        text = selection + '\n' + context
+        if self.veto_pattern.search(text) or self.veto_team_pattern.search(text):
+            return None
+
+        sports = self.match_sports(text)
+        if len(sports) != 1:
+            return None
+
+        bet_type = None
+        if need_bet_type:
+            # a selection that combines several props is not a single bet type
+            bet_types = self.match_bet_types(selection)
+            if len(bet_types) != 1 or len(self.threshold_pattern.findall(selection)) > 1:
+                return None
+            bet_type = bet_types.pop()
+
+        return sports.pop(), bet_type
+
+    def apply(self, bet_outputs, all_bet_details):
+        """
+        Labels the processed bets the rules can resolve and returns the ones left for the LLM.
+
+        Parameters:
+        - bet_outputs: The processed bet dictionaries, updated in place when resolved.
+        - all_bet_details: The extracted bet details, in the same order as bet_outputs.
+
+        Returns:
+        A tuple of two lists: the processed bets that still need the LLM, and their extracted details.
+        """
+        unresolved = []
+        unresolved_details = []
+        for bet_output, bet_details in zip(bet_outputs, all_bet_details):
+            need_bet_type = bet_output['bet_type'] == ''
+            result = self.classify(bet_output['selection'], bet_context(bet_output, bet_details), need_bet_type)
+
+            if result is None:
+                self.unresolved += 1
+                unresolved.append(bet_output)
+                unresolved_details.append(bet_details)
+                continue
+
+            self.resolved += 1
+            bet_output['sport'], bet_type = result
+            if need_bet_type:
+                bet_output['bet_type'] = bet_type
+
+        return unresolved, unresolved_details
+
+    def stats(self):
+        """
+        Returns the share of bets that were classified without the LLM.
+
+        Returns:
+        A dictionary with the number of resolved and unresolved bets and the short-circuit rate.
+        """
+        total = self.resolved + self.unresolved
+        return {
+            'resolved': self.resolved,
+            'unresolved': self.unresolved,
+            'short_circuit_rate': self.resolved / total if total else 0.0,
+        }
+
+def bet_context(bet_output, bet_details):
+    """
+    Collects the text about a bet, other than its selection, that can reveal the sport.
+
+    Parameters:
+    - bet_output: The processed bet dictionary.
+    - bet_details: The extracted bet details.
+
+    Returns:
+    The fixture and, for FanDuel, the leg info of every leg (e.g., 'NHL Super Boost - May 31'), one per line.
+    """
+    parts = [bet_output.get('fixture') or '']
+    parts += [leg['leg_info'] for leg in bet_details.get('legs') or []]
+    return '\n'.join(parts)
@@ -1,100 +1,697 @@
-from bs4 import BeautifulSoup
-from pprint import pprint
-from config import LLM
-
-from bet_extractor import Bet365, Fanduel
-import csv
-
-# specify the bookmaker to extract the bets from - either 'fanduel' or 'bet365'
-bookmaker = 'bet365'
-
-# specify the html file to extract the bets from
-if bookmaker == 'fanduel':
-    html_file = "fanduel.html"
-    bet_extractor = Fanduel()
-    csv_file = "fanduel.csv"
-elif bookmaker == 'bet365':
-    html_file = "bet365.html"
-    bet_extractor = Bet365()
-    csv_file = "bet365.csv"
-
-# Read the HTML content from the file
-with open(html_file) as f:
-    html_content = f.read()
-    
-# Parse the HTML content
-soup = BeautifulSoup(html_content, 'html.parser')
-
-# Extract all bets
-if bookmaker == 'fanduel':
-    bet_summaries = soup.select('.stmnt-bet')
-elif bookmaker == 'bet365':
-    bet_summaries = soup.find_all('div', class_='h-BetSummary')
-
-# Extract the details of each bet
-all_bet_details = [bet_extractor.extract_bet_details(bet_summary) for bet_summary in bet_summaries]
-
-
-# Print the extracted bet details in a nicely formatted way
-pprint(all_bet_details)
-
-# save the extracted bet details to a csv file - this can be used to check the extracted details before processing them
-csv_columns = all_bet_details[0].keys()
-
-# save the extracted bet details to a csv file in a specific order of columns
-try:
-    with open(csv_file, 'w', newline='') as csvfile:
-        writer = csv.DictWriter(csvfile, fieldnames=csv_columns)
-        writer.writeheader()
-        
-        # Write the data to the CSV file row by row
-        
-        for data in all_bet_details:
-            writer.writerow(data)
-except IOError:
-    print("I/O error")
-    
-# define the llm object
-llm = LLM()
-    
-# Process the extracted details
-processed_bet_details = [bet_extractor.process_extracted_details(bet_details) for bet_details in all_bet_details]
-processed_bet_details = [llm.run_llm(bet_details) for bet_details in processed_bet_details]
-
-# save the extracted bet details to a csv file in a specific order of columns
-if bookmaker == 'fanduel':
-    csv_file = "fanduel_processed.csv"
-elif bookmaker == 'bet365':
-    csv_file = "bet365_processed.csv"
-
-# define the new order of columns
-new_csv_columns = ["Date", 'Notes', 'Bookmaker', 'Sport / League', 'Selection', 'Bet Type', 'My Variable', 'Fixture / Event', 'Stake', 'Odds (US)','BB', 'Win']
-
-# rename the columns to match the new order
-for data in processed_bet_details:
-    data['Date'] = data.pop('date')
-    data['Notes'] = data.pop('bet_id')
-    data['Bookmaker'] = data.pop('bookmaker')
-    data['Sport / League'] = data.pop('sport')
-    data['Selection'] = data.pop('selection')
-    data['Bet Type'] = data.pop('bet_type')
-    data['My Variable'] = data.pop('boost')
-    data['Fixture / Event'] = data.pop('fixture')
-    data['Stake'] = data.pop('wager')
-    data['Odds (US)'] = data.pop('odds')
-    data['BB'] = data.pop('bonus_bet')
-    data['Win'] = data.pop('bet_status')
-
-# save the processed bet details to a csv file
-try:
-    with open(csv_file, 'w', newline='') as csvfile:
-        writer = csv.DictWriter(csvfile, fieldnames=new_csv_columns)
-        writer.writeheader()
-        
-        # Write the data to the CSV file row by row
-        
-        for data in processed_bet_details:
-            writer.writerow(data)
-        
-except IOError:
-    print("I/O error")
\ No newline at end of file
+from pprint import pprint
+from rule_classifier import RuleClassifier
+from leg_classifier import LegClassifier, classify_serially
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from bookmaker_registry import bookmakers, create_extractor, detect_bookmaker, get_extractor, SNIFF_SIZE
+from bet_stream import iter_bet_fragments, iter_bet_summaries
+from bet_parsers import BACKENDS
+from bet_ledger import BetLedger, LEDGER_FILE
+from fragment_cache import FragmentCache, FRAGMENT_CACHE_FILE, fragment_key
+from bet_record import TRACKER_COLUMNS
+from instrumentation import Metrics, metrics
+from tracker_writer import check_tracker, upsert_tracker
+from bet_store import BetStore
+from leg_index import LegIndex, LEG_COLUMNS
+from bet_analytics import BankrollAnalytics, REPORT_COLUMNS
+from bet_fingerprints import FingerprintIndex, FINGERPRINT_FILE, CONFLICT_COLUMNS, occurrence_keys
+from bet_validation import InvalidBet, QUARANTINE_FILE, failure_rates, quarantine_entry, write_quarantine
+from model_providers import PROVIDERS, RECORDING_FILE
+import argparse
+import csv
+import glob
+import os
+
+def find_exports(paths):
+    """
+    Collects the HTML exports to process.
+
+    Parameters:
+    - paths: Files, directories (all .html files inside are used) or glob patterns.
+
+    Returns:
+    The paths of the HTML files, oldest first, so that newer exports win when the same bet appears twice.
+    """
+    html_files = set()
+    for path in paths:
+        if os.path.isdir(path):
+            html_files.update(glob.glob(os.path.join(path, '*.html')))
+        elif os.path.isfile(path):
+            html_files.add(path)
+        else:
+            html_files.update(glob.glob(path))
+
+    return sorted(html_files, key=lambda html_file: (os.path.getmtime(html_file), html_file))
+
+# Default number of bet summaries sent to a worker process at a time when the bets of an export are extracted in parallel
+FRAGMENT_BATCH_SIZE = 250
+
+def extract_summaries(bet_extractor, bet_summaries, bookmaker, ledger_path=None, fragment_cache_path=None):
+    """
+    Extracts the bet details of bet summaries, skipping the bets the ledger has already processed.
+
+    With a fragment cache, the bet summaries are the raw HTML of each summary (see
+    bet_stream.iter_bet_fragments) and only the ones that are not in the cache are parsed and
+    extracted. The cache is only read here; the entries to store are returned to the main process.
+
+    Parameters:
+    - bet_extractor: The extractor of the bookmaker.
+    - bet_summaries: The parsed bet summaries (or their raw HTML with a fragment cache), in export order.
+    - bookmaker: The name of the bookmaker.
+    - ledger_path: The path of the bet ledger, or None to extract every bet.
+    - fragment_cache_path: The path of the fragment cache, or None to extract every bet summary.
+
+    Bets that do not match the schema of the bookmaker (see bet_validation.py) are left out and
+    returned with their HTML and the reason, so one malformed bet never stops the export.
+
+    Returns:
+    A dictionary with the IDs of all the valid bets ('bet_ids'), the (bet_id, bet_details) pairs of
+    the bets that were extracted ('bets'), the cache keys of the summaries found in the fragment cache
+    ('cache_hits'), the (key, bet_id, details) entries of the ones that were not ('cache_entries')
+    and the bets that failed validation ('quarantined', see bet_validation.quarantine_entry).
+    """
+    ledger = BetLedger(ledger_path) if ledger_path else None
+    fragment_cache = FragmentCache.for_extractor(bet_extractor, fragment_cache_path) if fragment_cache_path else None
+
+    # Extract the details of each bet, skipping the bets the ledger has already processed (settled bets never change)
+    bet_ids = []
+    bets = []
+    cache_hits = []
+    cache_entries = []
+    quarantined = []
+    for bet_summary in bet_summaries:
+        fragment = bet_summary
+        bet_id = None
+        bet_details = None
+        try:
+            if fragment_cache is not None:
+                key = fragment_key(fragment)
+                cached = fragment_cache.get(key)
+                if cached is not None:
+                    bet_id, details = cached
+                    bet_details = bet_extractor.details_class(**details)
+                    cache_hits.append(key)
+                else:
+                    bet_summary = bet_extractor.parse_fragment(fragment)
+                    bet_id = bet_extractor.extract_bet_id(bet_summary)
+                    # an unknown summary is always extracted, so the cache has its details next time
+                    bet_details = bet_extractor.extract_bet_details(bet_summary)
+                    cache_entries.append((key, bet_id, bet_details.to_dict()))
+            else:
+                bet_id = bet_extractor.extract_bet_id(bet_summary)
+
+            skipped = ledger is not None and not ledger.needs_processing(bookmaker, bet_id)
+            if not skipped and bet_details is None:
+                bet_details = bet_extractor.extract_bet_details(bet_summary)
+        except InvalidBet as error:
+            # set the bet aside with its HTML and carry on with the rest of the export
+            if not isinstance(fragment, str):
+                fragment = bet_extractor.backend.to_html(bet_summary)
+            quarantined.append(quarantine_entry(bookmaker, bet_id, fragment, error))
+            metrics.increment('bets_quarantined')
+            continue
+
+        bet_ids.append(bet_id)
+        if skipped:
+            metrics.increment('bets_skipped')
+            continue
+        metrics.increment('bets_extracted')
+        bets.append((bet_id, bet_details))
+
+    if ledger is not None:
+        ledger.close()
+    if fragment_cache is not None:
+        metrics.increment('fragment_cache_hits', fragment_cache.hits)
+        metrics.increment('fragment_cache_misses', fragment_cache.misses)
+        fragment_cache.close()
+
+    return {'bet_ids': bet_ids, 'bets': bets, 'cache_hits': cache_hits, 'cache_entries': cache_entries, 'quarantined': quarantined}
+
+def extract_file(html_file, bookmaker, parser_backend='bs4', streaming=True, ledger_path=None, fragment_cache_path=None):
+    """
+    Extracts the bet details of a single export. This runs in a worker process.
+
+    Parameters:
+    - html_file: The path of the HTML export.
+    - bookmaker: The name of the bookmaker of the export.
+    - parser_backend: The html parser backend - either 'bs4' or 'lxml'.
+    - streaming: Whether to stream the export one bet summary at a time.
+    - ledger_path: The path of the bet ledger, or None to extract every bet.
+    - fragment_cache_path: The path of the fragment cache, or None to extract every bet summary
+                           (only used when streaming).
+
+    Returns:
+    A dictionary with the IDs of all bets in the export ('bet_ids', in export order), the
+    (bet_id, bet_details) pairs of the bets that were extracted ('bets'), the fragment cache hits
+    and new entries ('cache_hits' and 'cache_entries', see extract_summaries) and the metrics
+    collected while extracting them ('metrics', see Metrics.drain).
+    """
+    bet_extractor = create_extractor(bookmaker, parser_backend)
+
+    # set aside the metrics collected before this export (a forked worker inherits those of the main process)
+    earlier_metrics = metrics.drain()
+
+    if streaming and fragment_cache_path:
+        # Yield the raw bet summaries one at a time, so the cached ones are never parsed
+        bet_summaries = iter_bet_fragments(html_file, bet_extractor.summary_class, bet_extractor.summary_tag)
+    elif streaming:
+        # Yield the bet summaries one at a time as the file is read
+        bet_summaries = iter_bet_summaries(html_file, bet_extractor.summary_class, bet_extractor.summary_tag, bet_extractor.backend)
+    else:
+        # Read and parse the HTML content from the file, then extract all bets
+        with open(html_file) as f:
+            soup = bet_extractor.parse_document(f.read())
+        bet_summaries = soup.find_all(bet_extractor.summary_tag, class_=bet_extractor.summary_class)
+        fragment_cache_path = None
+
+    result = extract_summaries(bet_extractor, bet_summaries, bookmaker, ledger_path, fragment_cache_path)
+
+    # in a worker process the metrics are only seen by the main process if they are returned
+    result['metrics'] = metrics.drain()
+    metrics.merge(earlier_metrics)
+
+    return result
+
+def extract_fragments(fragments, bookmaker, parser_backend='bs4', ledger_path=None, fragment_cache_path=None):
+    """
+    Extracts the bet details of a batch of bet summaries cut from an export. This runs in a worker process.
+
+    Parameters:
+    - fragments: The raw HTML of the bet summaries (see bet_stream.iter_bet_fragments).
+    - bookmaker, parser_backend, ledger_path, fragment_cache_path: As for extract_file.
+
+    Returns:
+    A dictionary with the same keys as the result of extract_file, for the bets of the batch.
+    """
+    bet_extractor = create_extractor(bookmaker, parser_backend)
+
+    # set aside the metrics collected before this batch (a forked worker inherits those of the main process)
+    earlier_metrics = metrics.drain()
+
+    if fragment_cache_path:
+        bet_summaries = fragments
+    else:
+        bet_summaries = (bet_extractor.parse_fragment(fragment) for fragment in fragments)
+    result = extract_summaries(bet_extractor, bet_summaries, bookmaker, ledger_path, fragment_cache_path)
+
+    result['metrics'] = metrics.drain()
+    metrics.merge(earlier_metrics)
+
+    return result
+
+def iter_fragment_batches(html_file, bookmaker, batch_size=FRAGMENT_BATCH_SIZE):
+    """
+    Cuts an export into batches of raw bet summaries, reading it one chunk at a time.
+
+    Parameters:
+    - html_file: The path of the HTML export.
+    - bookmaker: The name of the bookmaker of the export.
+    - batch_size: The number of bet summaries per batch.
+
+    Returns:
+    A generator of lists of HTML strings, in export order.
+    """
+    extractor_class = get_extractor(bookmaker)
+    batch = []
+    for fragment in iter_bet_fragments(html_file, extractor_class.summary_class, extractor_class.summary_tag):
+        batch.append(fragment)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def combine_results(results):
+    """
+    Combines the results of the batches of an export into the result of the whole export, keeping their order.
+    """
+    combined = {'bet_ids': [], 'bets': [], 'cache_hits': [], 'cache_entries': [], 'quarantined': []}
+    combined_metrics = Metrics()
+    for result in results:
+        for key, values in combined.items():
+            values.extend(result[key])
+        combined_metrics.merge(result['metrics'])
+    combined['metrics'] = combined_metrics.drain()
+    return combined
+
+def extract_files(jobs, parser_backend='bs4', streaming=True, ledger_path=None, workers=None, per_bet=False, batch_size=FRAGMENT_BATCH_SIZE, fragment_cache_path=None):
+    """
+    Extracts the bet details of several exports, in parallel across a process pool.
+
+    By default each worker extracts whole exports, so a single large export runs on one core. With
+    per_bet, the main process cuts every export into batches of raw bet summaries (the HTML text,
+    which is cheap to send to another process, unlike parsed trees) while the workers parse and
+    extract the batches; the results are put back in export order, so they are the same as when
+    the exports are extracted one at a time.
+
+    Parameters:
+    - jobs: A list of (html_file, bookmaker) pairs.
+    - parser_backend, streaming, ledger_path, fragment_cache_path: As for extract_file (per_bet always streams the exports).
+    - workers: The number of worker processes (defaults to the number of CPUs).
+    - per_bet: Whether to spread the bets of each export across the workers.
+    - batch_size: The number of bet summaries sent to a worker at a time with per_bet.
+
+    Returns:
+    The results of extract_file, in the order of the jobs.
+    """
+    if per_bet and workers != 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # submit every batch before waiting for any of them, so the workers are busy while the exports are read
+            futures = []
+            for html_file, bookmaker in jobs:
+                futures.append([executor.submit(extract_fragments, batch, bookmaker, parser_backend, ledger_path, fragment_cache_path)
+                                for batch in iter_fragment_batches(html_file, bookmaker, batch_size)])
+            return [combine_results(future.result() for future in batches) for batches in futures]
+
+    arguments = [(html_file, bookmaker, parser_backend, streaming, ledger_path, fragment_cache_path) for html_file, bookmaker in jobs]
+
+    # a single file is not worth the cost of starting a process pool
+    if len(jobs) <= 1 or workers == 1:
+        return [extract_file(*job) for job in arguments]
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(extract_file, *zip(*arguments)))
+
+def write_csv(csv_file, records, columns):
+    """
+    Saves bet records (see bet_record.py) to a csv file, one row per record with the fields in the order of the record.
+
+    Parameters:
+    - csv_file: The path of the csv file.
+    - records: The records to save.
+    - columns: The header of the csv file, one name per field.
+    """
+    write_rows(csv_file, (record.values() for record in records), columns)
+
+def write_rows(csv_file, rows, columns):
+    """
+    Saves rows of values to a csv file.
+
+    The rows are written to a temporary file that then replaces the csv file, so a reader never sees
+    a half-written file.
+
+    Parameters:
+    - csv_file: The path of the csv file.
+    - rows: The rows to save, each a list of values in the order of the columns.
+    - columns: The header of the csv file.
+    """
+    temporary_file = csv_file + '.tmp'
+    try:
+        with open(temporary_file, 'w', newline='') as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(columns)
+
+            # Write the data to the CSV file row by row
+            writer.writerows(rows)
+        os.replace(temporary_file, csv_file)
+    except IOError:
+        print("I/O error")
+
+def report_quarantine(exports, quarantine_file):
+    """
+    Saves the bets that failed validation to the quarantine file and reports the failure rate of every selector.
+
+    Parameters:
+    - exports: (html_file, bookmaker, checked, quarantined) tuples with the number of bets validated
+               in each export and its quarantine entries (see extract_summaries).
+    - quarantine_file: The path of the quarantine file.
+
+    Returns:
+    The failure rates per bookmaker and selector (see bet_validation.failure_rates).
+    """
+    checked = {}
+    quarantined = []
+    for html_file, bookmaker, count, entries in exports:
+        checked[bookmaker] = checked.get(bookmaker, 0) + count
+        quarantined.extend(dict(entry, export=html_file) for entry in entries)
+    write_quarantine(quarantine_file, quarantined)
+
+    summary = failure_rates(checked, quarantined)
+    for bookmaker, rates in summary.items():
+        metrics.set_all(f"selector_failure_rate_{bookmaker}", rates['selectors'])
+        if rates['quarantined']:
+            selectors = ', '.join(f"{selector} {rate:.2%}" for selector, rate in rates['selectors'].items())
+            print(f"{bookmaker}: {rates['quarantined']} of {rates['checked']} bets failed validation and were saved to {quarantine_file} ({selectors})")
+    return summary
+
+# Default location of the report of the bets that share an ID or were exported twice
+CONFLICTS_FILE = "bet_conflicts.csv"
+
+def report_conflicts(fingerprints, conflicts_file):
+    """
+    Saves every conflict the fingerprint index has found to the conflicts file and reports the ones found in this run.
+
+    Parameters:
+    - fingerprints: The FingerprintIndex the bets of the run were given their stable IDs by.
+    - conflicts_file: The path of the conflicts file. It is only written once there is a conflict.
+    """
+    stats = fingerprints.stats()
+    metrics.set_all('fingerprints', stats)
+    if stats['conflicts']:
+        write_rows(conflicts_file, fingerprints.conflict_rows(), CONFLICT_COLUMNS)
+    if stats['collisions'] or stats['duplicates']:
+        print(f"Fingerprints: {stats['collisions']} bets shared an ID with another bet and were given a new one, "
+              f"{stats['duplicates']} were the same bet as another with the time shifted (see {conflicts_file})")
+
+def build_llm(args):
+    """
+    Builds the LLM object used to classify the bets, with the model provider given by --model-provider
+    and the on-disk classification cache unless --no-cache is given.
+    """
+    # imported here so the LLM client (langchain, pydantic) is only loaded when bets are classified
+    from config import LLM, classification_version
+    from classification_cache import ClassificationCache
+    from model_providers import build_chain, cache_model
+
+    chain = build_chain(args.model_provider, args.recording, args.model_base_url, args.model_latency)
+    model = cache_model(args.model_provider, args.model_base_url)
+    if args.no_cache or model is None:
+        return LLM(chain=chain)
+    return LLM(cache=ClassificationCache(classification_version(model)), chain=chain)
+
+def process_extracted(extracted, args):
+    """
+    Processes the extracted bet details of each bookmaker.
+
+    Parameters:
+    - extracted: A dictionary mapping each bookmaker to a dictionary of bet details, keyed by
+                 (bet_id, occurrence) (see bet_fingerprints.occurrence_keys).
+    - args: The parsed command line arguments.
+
+    Returns:
+    A dictionary mapping each bookmaker to a list of (bet_output, bet_details) pairs.
+    """
+    processed = {}
+    for bookmaker, bets in extracted.items():
+        bet_extractor = create_extractor(bookmaker)
+        processed[bookmaker] = [(bet_extractor.process_extracted_details(bet_details), bet_details) for bet_details in bets.values()]
+    return processed
+
+def bet_date(bookmaker, bet_output):
+    """
+    Parses the date of a processed bet from its bookmaker's format, so the bets of all bookmakers can be sorted together.
+    """
+    return datetime.strptime(bet_output.date, get_extractor(bookmaker).date_format)
+
+def classify(processed, args, llm=None):
+    """
+    Classifies the sport and bet type of the processed bets, in place.
+
+    Parameters:
+    - processed: A dictionary mapping each bookmaker to a list of (bet_output, bet_details) pairs.
+    - args: The parsed command line arguments.
+    - llm: The LLM object to use, defaults to the OpenAI model with the classification cache. The
+           cache of an LLM passed in is saved and left open, so the caller can classify more bets with it.
+    """
+    # imported here so the LLM client (langchain, pydantic) is only loaded when bets are classified
+    from async_classifier import classify_bets, classify_selections
+
+    # define the llm object
+    owns_llm = llm is None
+    if owns_llm:
+        llm = build_llm(args)
+
+    rule_classifier = None if args.no_rules else RuleClassifier()
+
+    if args.serial_llm:
+        classify_legs = classify_serially
+    else:
+        classify_legs = partial(classify_selections, concurrency=args.llm_concurrency, rate_limit=args.llm_rate_limit, retries=args.llm_retries)
+    leg_classifier = None if args.no_per_leg else LegClassifier(llm, classify_legs, rule_classifier)
+
+    # the bets are updated in place, so each stage only passes on the bets it could not classify
+    llm_bet_details = []
+    for bookmaker, bets in processed.items():
+        pending_bet_details = [bet_output for bet_output, bet_details in bets]
+        pending_extracted_details = [bet_details for bet_output, bet_details in bets]
+
+        if rule_classifier is not None:
+            with metrics.stage('classify_rules'):
+                pending_bet_details, pending_extracted_details = rule_classifier.apply(pending_bet_details, pending_extracted_details)
+
+        if leg_classifier is not None:
+            bet_extractor = create_extractor(bookmaker)
+            with metrics.stage('classify_legs'):
+                pending_bet_details, pending_extracted_details = leg_classifier.apply(pending_bet_details, pending_extracted_details, bet_extractor)
+
+        llm_bet_details.extend(pending_bet_details)
+
+    if rule_classifier is not None:
+        print(f"Rule classifier: {rule_classifier.stats()}")
+        metrics.set_all('rule_classifier', rule_classifier.stats())
+    if leg_classifier is not None:
+        print(f"Leg classifier: {leg_classifier.stats()}")
+        metrics.set_all('leg_classifier', leg_classifier.stats())
+
+    metrics.increment('bets_sent_to_llm', len(llm_bet_details))
+    with metrics.stage('classify_llm'):
+        if args.serial_llm:
+            [llm.run_llm(bet_details) for bet_details in llm_bet_details]
+        else:
+            classify_bets(llm, llm_bet_details, args.llm_concurrency, args.llm_rate_limit, args.llm_retries)
+
+    if llm.cache is not None:
+        print(f"Classification cache: {llm.cache.stats()}")
+        metrics.set_all('classification_cache', llm.cache.stats())
+        if owns_llm:
+            llm.cache.close()
+        else:
+            llm.cache.save()
+
+def write_metrics(metrics_format, metrics_file=None):
+    """
+    Emits the metrics collected during the run.
+
+    Parameters:
+    - metrics_format: Either 'json' or 'prometheus'.
+    - metrics_file: The file to write the metrics to, or None to print them.
+    """
+    text = metrics.to_json() if metrics_format == 'json' else metrics.to_prometheus()
+    if metrics_file is None:
+        print(text)
+        return
+
+    with open(metrics_file, 'w') as f:
+        f.write(text)
+
+def build_parser():
+    """
+    Builds the command line parser of the runner (also used by the watch service in bet_service.py).
+    """
+    parser = argparse.ArgumentParser(description="Extract and classify bets from Bet365 and FanDuel bet history exports.")
+    parser.add_argument('paths', nargs='*', default=['.'], help="html exports, directories of exports or glob patterns (default: the current directory)")
+    parser.add_argument('--bookmaker', choices=bookmakers(), help="skip detection and treat every export as this bookmaker")
+    parser.add_argument('--sniff-size', type=int, default=SNIFF_SIZE, help="bytes read from the start of each export to detect its bookmaker (default: %(default)s)")
+    parser.add_argument('--output', default="processed_bets.csv", help="the processed csv file (default: %(default)s)")
+    parser.add_argument('--workers', type=int, default=None, help="number of processes used to parse the exports (default: number of CPUs)")
+    parser.add_argument('--parser-backend', choices=sorted(BACKENDS), default='bs4', help="html parser backend (default: %(default)s)")
+    parser.add_argument('--per-bet', action='store_true', help="spread the bets of each export across the worker processes, for very large exports")
+    parser.add_argument('--no-streaming', action='store_true', help="parse each export as a whole instead of one bet summary at a time")
+    parser.add_argument('--ledger', default=LEDGER_FILE, help="the ledger of processed bets (default: %(default)s)")
+    parser.add_argument('--no-ledger', action='store_true', help="process every bet, even if it was processed in an earlier run")
+    parser.add_argument('--fragment-cache', default=FRAGMENT_CACHE_FILE, help="the cache of the details extracted from each bet summary (default: %(default)s)")
+    parser.add_argument('--no-fragment-cache', action='store_true', help="parse and extract every bet summary, even if it has not changed since an earlier run")
+    parser.add_argument('--fingerprints', default=FINGERPRINT_FILE, help="the index of the fingerprints of the processed bets, which gives them stable IDs (default: %(default)s)")
+    parser.add_argument('--no-fingerprints', action='store_true', help="only tell apart and deduplicate the bets of this run, without the fingerprints of earlier runs")
+    parser.add_argument('--conflicts', default=CONFLICTS_FILE, help="the report of the bets that shared an ID with another bet or were exported twice with shifted times (default: %(default)s)")
+    parser.add_argument('--quarantine', default=QUARANTINE_FILE, help="the file the bets that fail validation are saved to, with their HTML and the reason (default: %(default)s)")
+    parser.add_argument('--no-cache', action='store_true', help="do not use the on-disk classification cache")
+    parser.add_argument('--no-rules', action='store_true', help="send every bet to the LLM instead of trying the keyword rules first")
+    parser.add_argument('--no-per-leg', action='store_true', help="classify multi bets as a whole instead of leg by leg")
+    parser.add_argument('--serial-llm', action='store_true', help="classify the bets one request at a time")
+    parser.add_argument('--llm-concurrency', type=int, default=8, help="maximum number of LLM requests in flight (default: %(default)s)")
+    parser.add_argument('--llm-rate-limit', type=float, default=None, help="maximum number of LLM requests started per second")
+    parser.add_argument('--llm-retries', type=int, default=3, help="retries of a failed LLM request (default: %(default)s)")
+    parser.add_argument('--model-provider', choices=PROVIDERS, default='openai',
+                        help="the model that classifies the bets: openai, stub (labels every bet 'Unknown'), record (openai, saving every response to --recording) or replay (the responses of --recording, offline) (default: %(default)s)")
+    parser.add_argument('--recording', default=RECORDING_FILE, help="the recording of model responses written by 'record' and read by 'replay' (default: %(default)s)")
+    parser.add_argument('--model-base-url', help="the base URL of an OpenAI-compatible API to use instead of OpenAI (e.g., http://127.0.0.1:8766/v1 for stub_model_server.py)")
+    parser.add_argument('--model-latency', type=float, default=0.0, help="seconds each request of the stub and replay providers takes (default: %(default)s)")
+    parser.add_argument('--extract-only', action='store_true', help="only write the raw csv file of each bookmaker, without processing or classifying the bets (the LLM client is never loaded)")
+    parser.add_argument('--tracker', help="also upsert the processed bets into the 'Bets' sheet of this tracker workbook (.xlsx)")
+    parser.add_argument('--parquet', metavar='DIR', help="also write the processed bets to a Parquet store in this directory, partitioned by bookmaker and month")
+    parser.add_argument('--legs-csv', help="also write the legs of the processed bets, parsed into entity, market, line and side, to this csv file")
+    parser.add_argument('--analytics', metavar='FILE', help="keep running totals of stakes, profit, ROI and bonus-bet conversion by bookmaker, sport, bet type, boost and month in this JSON file, updated with the bets of every run")
+    parser.add_argument('--analytics-csv', metavar='FILE', help="with --analytics, also write the totals of every group to this csv file")
+    parser.add_argument('--verbose', action='store_true', help="print the extracted bet details")
+    parser.add_argument('--metrics', choices=['json', 'prometheus'], help="emit stage timings, latency percentiles and counters at the end of the run")
+    parser.add_argument('--metrics-file', help="write the metrics to this file instead of printing them")
+    return parser
+
+def parse_args(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    check_args(parser, args)
+    return args
+
+def check_args(parser, args):
+    """
+    Checks the arguments that can only be checked against the file system, exiting with a usage
+    error before any export is processed.
+
+    Parameters:
+    - parser: The argument parser, used to report the error.
+    - args: The parsed command line arguments.
+    """
+    # the tracker is written at the end of the run, after the classification has been paid for
+    if args.tracker:
+        try:
+            check_tracker(args.tracker)
+        except ValueError as error:
+            parser.error(f"--tracker: {error}")
+
+def main(argv=None):
+    args = parse_args(argv)
+    ledger_path = None if args.no_ledger else args.ledger
+    fragment_cache_path = None if args.no_fragment_cache else args.fragment_cache
+    fingerprint_path = None if args.no_fingerprints else args.fingerprints
+
+    # find the exports and detect which bookmaker each one comes from
+    jobs = []
+    with metrics.stage('detect'):
+        for html_file in find_exports(args.paths):
+            bookmaker = args.bookmaker or detect_bookmaker(html_file, args.sniff_size)
+            if bookmaker is None:
+                print(f"Skipping {html_file}: unknown bookmaker")
+                continue
+            jobs.append((html_file, bookmaker))
+    metrics.increment('exports', len(jobs))
+
+    # create the ledger and the fragment cache before the workers open them
+    if ledger_path:
+        BetLedger(ledger_path).close()
+    if fragment_cache_path:
+        FragmentCache(None, None, fragment_cache_path).close()
+
+    with metrics.stage('extract'):
+        results = extract_files(jobs, args.parser_backend, not args.no_streaming, ledger_path, args.workers, args.per_bet,
+                                fragment_cache_path=fragment_cache_path)
+
+    # merge the exports, keeping the bet from the newest export when a bet appears in several of them
+    # (bets of an export that share an ID are kept apart by their occurrence until they get their stable IDs)
+    extracted = {}
+    origins = {}
+    export_bet_ids = {}
+    for (html_file, bookmaker), result in zip(jobs, results):
+        metrics.merge(result['metrics'])
+        bookmaker_bets = extracted.setdefault(bookmaker, {})
+        for key, bet_details in occurrence_keys(result['bets']):
+            bookmaker_bets[key] = bet_details
+            origins[(bookmaker, key)] = (html_file, key[1])
+        export_bet_ids.setdefault(bookmaker, []).extend(result['bet_ids'])
+        print(f"{html_file} ({bookmaker}): {len(result['bets'])} of {len(result['bet_ids'])} bets are new or pending")
+
+    # set aside the bets that failed validation, with their HTML and the reason
+    report_quarantine([(html_file, bookmaker, len(result['bets']) + len(result['quarantined']), result['quarantined'])
+                       for (html_file, bookmaker), result in zip(jobs, results)], args.quarantine)
+
+    # store the newly extracted bet summaries, so unchanged ones are not parsed again in the next run
+    if fragment_cache_path:
+        with metrics.stage('fragment_cache'):
+            for bookmaker in dict.fromkeys(bookmaker for html_file, bookmaker in jobs):
+                bookmaker_results = [result for (html_file, job_bookmaker), result in zip(jobs, results) if job_bookmaker == bookmaker]
+                fragment_cache = FragmentCache.for_extractor(create_extractor(bookmaker, args.parser_backend), fragment_cache_path)
+                fragment_cache.update([key for result in bookmaker_results for key in result['cache_hits']],
+                                      [entry for result in bookmaker_results for entry in result['cache_entries']])
+                fragment_cache.close()
+
+    # save the extracted bet details to a csv file - this can be used to check the extracted details before processing them
+    with metrics.stage('write_raw'):
+        for bookmaker, bets in extracted.items():
+            all_bet_details = list(bets.values())
+            if args.verbose:
+                pprint(all_bet_details)
+            if all_bet_details:
+                write_csv(get_extractor(bookmaker).raw_csv, all_bet_details, all_bet_details[0].keys())
+
+    # only the raw csv files were requested, so the bets are neither processed nor classified
+    if args.extract_only:
+        if args.metrics:
+            write_metrics(args.metrics, args.metrics_file)
+        return
+
+    # Process the extracted details
+    with metrics.stage('process'):
+        processed = process_extracted(extracted, args)
+
+    # give the bets their stable IDs, so bets that share an ID are kept apart and a bet exported twice is kept once
+    with metrics.stage('fingerprint'):
+        fingerprints = FingerprintIndex(fingerprint_path)
+        for bookmaker, bets in processed.items():
+            processed[bookmaker] = fingerprints.assign_bets(bookmaker, bets, create_extractor(bookmaker),
+                                                            [origins[(bookmaker, key)] for key in extracted[bookmaker]])
+        fingerprints.close()
+    report_conflicts(fingerprints, args.conflicts)
+
+    if any(processed.values()):
+        with metrics.stage('classify'):
+            classify(processed, args)
+
+    # save the typed bets to the Parquet store, which keeps the bets of earlier runs
+    if args.parquet and any(processed.values()):
+        with metrics.stage('parquet'):
+            store = BetStore(args.parquet)
+            for bookmaker, bets in processed.items():
+                store.write(bookmaker, bets, create_extractor(bookmaker))
+
+    # parse the legs of the processed bets into their entity, market, line and side
+    if args.legs_csv:
+        with metrics.stage('normalize'):
+            leg_index = LegIndex()
+            for bookmaker, bets in processed.items():
+                leg_index.add_bets(bookmaker, bets, create_extractor(bookmaker))
+            write_rows(args.legs_csv, leg_index.rows(), LEG_COLUMNS)
+        metrics.set_all('leg_index', leg_index.stats())
+        print(f"Leg index: {leg_index.stats()}")
+
+    # add the processed bets to the running totals of the earlier runs
+    if args.analytics:
+        with metrics.stage('analytics'):
+            analytics = BankrollAnalytics.load(args.analytics)
+            for bookmaker, bets in processed.items():
+                analytics.add_bets(bookmaker, bets, create_extractor(bookmaker), bet_date)
+            analytics.save(args.analytics)
+            if args.analytics_csv:
+                write_rows(args.analytics_csv, analytics.rows(), ['dimension', 'group', *REPORT_COLUMNS])
+        total = analytics.summary()['total']
+        roi = f"{total['roi']:.2%}" if total['roi'] is not None else 'n/a'
+        print(f"Analytics: {total['bets']} bets, {total['settled']} settled, profit {total['profit']} on {total['staked']} staked (ROI {roi})")
+
+    # merge the processed bets with the bets processed in earlier runs
+    rows = []
+    with metrics.stage('ledger'):
+        ledger = BetLedger(ledger_path) if ledger_path else None
+        for bookmaker, bets in processed.items():
+            bookmaker_bets = [bet_output for bet_output, bet_details in bets]
+
+            if ledger is not None:
+                for bet_output in bookmaker_bets:
+                    ledger.record(bookmaker, bet_output)
+                bookmaker_bets = ledger.merge(bookmaker, export_bet_ids[bookmaker])
+
+            rows.extend((bet_date(bookmaker, bet_output), bet_output) for bet_output in bookmaker_bets)
+
+        if ledger is not None:
+            ledger.close()
+
+    # sort the bets of all bookmakers by date
+    rows.sort(key=lambda row: row[0])
+
+    # save the processed bet details to a csv file
+    with metrics.stage('write'):
+        write_csv(args.output, [bet_output for date, bet_output in rows], list(TRACKER_COLUMNS.values()))
+    metrics.increment('rows_written', len(rows))
+
+    # upsert the processed bets into the tracker workbook, with the dates as real dates so Excel sorts them
+    if args.tracker:
+        with metrics.stage('tracker'):
+            updated, inserted = upsert_tracker(args.tracker, [bet_output for date, bet_output in rows], [date for date, bet_output in rows])
+        print(f"{args.tracker}: {updated} bets updated, {inserted} inserted")
+
+    if args.metrics:
+        write_metrics(args.metrics, args.metrics_file)
+
+if __name__ == '__main__':
+    main()
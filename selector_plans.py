@@ -0,0 +1,164 @@
+import re
+
+# A step of a selector: an optional tag name, any number of .classes and an optional :last-child
+STEP_PATTERN = re.compile(r'([a-zA-Z][\w-]*)?((?:\.[\w-]+)*)(:last-child)?')
+
+class SelectorPlan():
+    """
+    A declarative spec of the fields of a bet summary, compiled once into a plan that finds every
+    field in a single walk over the bet's subtree.
+
+    Looking up each field with its own find or select_one scans the whole subtree once per field;
+    the plan visits every element once and checks it only against the selector steps indexed under
+    its classes and tag name, so the cost of extracting a bet grows with its size, not with the
+    number of fields.
+
+    The spec maps each field name to ('select_one', selector) for the first match in document order
+    or ('select', selector) for all matches, as in BeautifulSoup. A third item names an earlier
+    'select_one' field to search within, like calling select on the node found for that field.
+
+    Selectors use a subset of CSS: steps separated by spaces (the descendant combinator), each made
+    of a tag name and/or one or more .classes, and the last step may end with :last-child.
+
+    Attributes:
+    - fields: The field names, in the order of the spec.
+    - selectors: The selector of each field.
+    """
+    def __init__(self, spec):
+        """
+        Compiles the spec.
+
+        Parameters:
+        - spec: A dictionary mapping each field name to a ('select_one' or 'select', selector) pair,
+                optionally followed by the name of the field to search within.
+
+        Raises:
+        - ValueError: If a selector uses syntax outside the supported subset.
+        """
+        self.fields = list(spec)
+        self.selectors = {field: field_spec[1] for field, field_spec in spec.items()}
+        self.many = []
+        self.last_child = []
+        self.last_steps = []
+        self.scopes = []
+
+        # the (field, step) pairs to check for an element, indexed by a class (or the tag name) of the step
+        self.by_class = {}
+        self.by_tag = {}
+        self.steps = []
+
+        for field_index, (field, (method, selector, *scope)) in enumerate(spec.items()):
+            if method not in ('select_one', 'select'):
+                raise ValueError(f"Unknown method '{method}' for field '{field}'")
+            self.many.append(method == 'select')
+
+            if scope:
+                if scope[0] not in self.fields[:field_index] or self.many[self.fields.index(scope[0])]:
+                    raise ValueError(f"The scope of field '{field}' must be an earlier 'select_one' field")
+                self.scopes.append(self.fields.index(scope[0]))
+            else:
+                self.scopes.append(None)
+
+            steps = selector.split()
+            self.last_steps.append(len(steps) - 1)
+            self.last_child.append(False)
+            for step_index, step in enumerate(steps):
+                match = STEP_PATTERN.fullmatch(step)
+                if match is None or not (match.group(1) or match.group(2)) or (match.group(3) and step_index != len(steps) - 1):
+                    raise ValueError(f"Unsupported selector '{selector}' for field '{field}'")
+
+                tag = match.group(1)
+                classes = frozenset(match.group(2).split('.')[1:])
+                if match.group(3):
+                    self.last_child[field_index] = True
+
+                self.steps.append((tag, classes))
+                entry = (field_index, step_index, len(self.steps) - 1)
+                if classes:
+                    self.by_class.setdefault(min(classes), []).append(entry)
+                else:
+                    self.by_tag.setdefault(tag, []).append(entry)
+
+        self.needs_siblings = any(self.last_child)
+
+    def run(self, node, backend):
+        """
+        Finds the fields of the spec below a node.
+
+        Parameters:
+        - node: The node of the bet summary.
+        - backend: The parser backend that produced the node.
+
+        Returns:
+        A dictionary mapping each field to its first matching node (or None), or to the list of
+        all matching nodes for 'select' fields.
+        """
+        field_count = len(self.fields)
+        # the index of the next selector step to match, for each field, at the current element
+        progress = [0] * field_count
+        # (depth, field, progress) to restore once the walk leaves the element that advanced a field
+        undo = []
+
+        matches = [[] for _ in range(field_count)]
+        # the depth of the node found for each scope field while the walk is inside it, and the scopes the walk has left
+        open_scopes = {}
+        closed_scopes = set()
+        # the most recent element at each depth below the current parent, and the elements that have a later sibling
+        open_elements = []
+        followed = set()
+
+        for position, (depth, name, classes, element) in enumerate(backend.walk(node)):
+            while undo and undo[-1][0] >= depth:
+                _, field_index, previous = undo.pop()
+                progress[field_index] = previous
+
+            for scope in [scope for scope, scope_depth in open_scopes.items() if scope_depth >= depth]:
+                del open_scopes[scope]
+                closed_scopes.add(scope)
+
+            if self.needs_siblings:
+                if len(open_elements) >= depth:
+                    followed.add(open_elements[depth - 1])
+                    del open_elements[depth - 1:]
+                open_elements.append(position)
+
+            candidates = []
+            for class_name in classes:
+                candidates.extend(self.by_class.get(class_name, ()))
+            candidates.extend(self.by_tag.get(name, ()))
+            if not candidates:
+                continue
+
+            advanced = []
+            for field_index, step_index, step in candidates:
+                if progress[field_index] != step_index:
+                    continue
+                tag, step_classes = self.steps[step]
+                if (tag is not None and tag != name) or not step_classes.issubset(classes):
+                    continue
+
+                if step_index == self.last_steps[field_index]:
+                    scope = self.scopes[field_index]
+                    if scope is not None and scope not in open_scopes:
+                        continue
+                    if self.many[field_index] or self.last_child[field_index] or not matches[field_index]:
+                        matches[field_index].append((position, element))
+                        # the fields scoped to this one are searched in the subtree of its first match
+                        if not matches[field_index][1:] and field_index not in closed_scopes:
+                            open_scopes[field_index] = depth
+                else:
+                    advanced.append(field_index)
+
+            # the next step of a field can only match below this element
+            for field_index in advanced:
+                undo.append((depth, field_index, progress[field_index]))
+                progress[field_index] += 1
+
+        results = {}
+        for field_index, field in enumerate(self.fields):
+            found = matches[field_index]
+            if self.last_child[field_index]:
+                found = [(position, element) for position, element in found if position not in followed]
+            nodes = [backend.wrap(element) for position, element in found]
+            results[field] = nodes if self.many[field_index] else (nodes[0] if nodes else None)
+        return results
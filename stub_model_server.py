@@ -0,0 +1,231 @@
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from rule_classifier import RuleClassifier
+
+# Default address of the stand-in server
+STUB_PORT = 8766
+
+# The line of the tagging prompt (see config.py) that the selection follows
+INPUT_MARKER = "Text:"
+
+def prompt_selection(messages):
+    """
+    Returns the selection of a classification request: the text after the 'Text:' line of the last user message.
+    """
+    content = ''
+    for message in messages:
+        if message.get('role') in ('user', 'human'):
+            content = message.get('content') or ''
+    if isinstance(content, list):
+        content = ''.join(part.get('text', '') for part in content if isinstance(part, dict))
+    _, _, selection = content.partition(INPUT_MARKER)
+    return (selection or content).strip()
+
+class StubModel():
+    """
+    A stand-in for the OpenAI chat-completions API that answers classification requests locally.
+
+    The labels come from the keyword rules of RuleClassifier (with 'Unknown' for the selections the
+    rules leave open), so runs against the server give realistic, deterministic labels. Requests take
+    a configurable latency and a share of them fail, so the concurrency, retry and caching settings of
+    the classifiers can be benchmarked without network access or an API key.
+
+    Attributes:
+    - latency: The number of seconds each request takes.
+    - jitter: The maximum number of seconds added at random to the latency.
+    - error_rate: The probability that a request fails.
+    - error_status: The HTTP status of the failed requests (e.g., 500 or 429).
+    - requests: The number of requests received.
+    - errors: The number of requests that were failed.
+    - in_flight: The number of requests being answered.
+    - max_in_flight: The largest number of requests answered at once.
+    """
+    def __init__(self, latency=0.05, jitter=0.0, error_rate=0.0, error_status=500, seed=None):
+        """
+        Initializes the stand-in model.
+
+        Parameters:
+        - latency: The number of seconds each request takes.
+        - jitter: The maximum number of seconds added at random to the latency.
+        - error_rate: The probability that a request fails.
+        - error_status: The HTTP status of the failed requests.
+        - seed: The seed of the random latency and errors, for reproducible runs.
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.random = random.Random(seed)
+        self.rules = RuleClassifier()
+        self.requests = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def label(self, selection):
+        """
+        Returns the (sport, bet_type) of a selection, 'Unknown' where the rules cannot tell.
+        """
+        sport, bet_type = self.rules.classify(selection) or (None, None)
+        if sport is None:
+            sport = (self.rules.classify(selection, need_bet_type=False) or ('Unknown', None))[0]
+        return sport, bet_type or 'Unknown'
+
+    def complete(self, request):
+        """
+        Answers a chat-completions request.
+
+        Parameters:
+        - request: The decoded JSON body of the request.
+
+        Returns:
+        A (status, body) tuple, with the body as a dictionary.
+        """
+        with self._lock:
+            self.requests += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            delay = self.latency + self.random.uniform(0, self.jitter)
+            failed = self.random.random() < self.error_rate
+        try:
+            time.sleep(delay)
+            if failed:
+                with self._lock:
+                    self.errors += 1
+                return self.error_status, {'error': {'message': "Stub model error", 'type': 'server_error', 'code': None}}
+            return 200, self.response(request)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def response(self, request):
+        """
+        Builds the chat completion of a request.
+
+        With tools in the request (as sent by with_structured_output), the labels are returned as a
+        call to the first tool; otherwise they are the JSON content of the message.
+        """
+        sport, bet_type = self.label(prompt_selection(request.get('messages') or []))
+        arguments = json.dumps({'sport': sport, 'bet_type': bet_type})
+
+        tools = request.get('tools') or []
+        if tools:
+            message = {
+                'role': 'assistant',
+                'content': None,
+                'tool_calls': [{
+                    'id': f"call_{uuid.uuid4().hex[:24]}",
+                    'type': 'function',
+                    'function': {'name': tools[0]['function']['name'], 'arguments': arguments},
+                }],
+            }
+            finish_reason = 'tool_calls'
+        else:
+            message = {'role': 'assistant', 'content': arguments}
+            finish_reason = 'stop'
+
+        return {
+            'id': f"chatcmpl-{uuid.uuid4().hex[:24]}",
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': request.get('model', 'stub'),
+            'choices': [{'index': 0, 'message': message, 'logprobs': None, 'finish_reason': finish_reason}],
+            'usage': {'prompt_tokens': 0, 'completion_tokens': 0, 'total_tokens': 0},
+        }
+
+    def stats(self):
+        """
+        Returns the request counters of the server.
+        """
+        with self._lock:
+            return {
+                'requests': self.requests,
+                'errors': self.errors,
+                'in_flight': self.in_flight,
+                'max_in_flight': self.max_in_flight,
+            }
+
+class StubModelHandler(BaseHTTPRequestHandler):
+    """
+    Serves POST /v1/chat/completions (or /chat/completions) and GET /stats from the StubModel of the server.
+    """
+    def do_POST(self):
+        if self.path.rstrip('/') not in ('/v1/chat/completions', '/chat/completions'):
+            self.send_json(404, {'error': {'message': f"Unknown path {self.path}"}})
+            return
+        try:
+            length = int(self.headers.get('Content-Length') or 0)
+            request = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            self.send_json(400, {'error': {'message': "Invalid JSON body"}})
+            return
+        self.send_json(*self.server.model.complete(request))
+
+    def do_GET(self):
+        if self.path.rstrip('/') == '/stats':
+            self.send_json(200, self.server.model.stats())
+        else:
+            self.send_json(404, {'error': {'message': f"Unknown path {self.path}"}})
+
+    def send_json(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        # keep the output of benchmarks clean
+        pass
+
+def start_stub_server(port=0, host='127.0.0.1', **options):
+    """
+    Starts the stand-in server in a background thread.
+
+    Parameters:
+    - port: The port to listen on; 0 picks a free one.
+    - host: The address to listen on.
+    - options: The settings of the StubModel (latency, jitter, error_rate, error_status, seed).
+
+    Returns:
+    The running server. Its base URL for the OpenAI client is in its url attribute, its StubModel in
+    its model attribute; call shutdown() to stop it.
+    """
+    server = ThreadingHTTPServer((host, port), StubModelHandler)
+    server.daemon_threads = True
+    server.model = StubModel(**options)
+    server.url = f"http://{host}:{server.server_address[1]}/v1"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Run a local stand-in for the OpenAI chat-completions API that labels bets with the keyword rules.")
+    parser.add_argument('--host', default='127.0.0.1', help="the address to listen on (default: %(default)s)")
+    parser.add_argument('--port', type=int, default=STUB_PORT, help="the port to listen on (default: %(default)s)")
+    parser.add_argument('--latency', type=float, default=0.05, help="seconds each request takes (default: %(default)s)")
+    parser.add_argument('--jitter', type=float, default=0.0, help="maximum seconds added at random to the latency (default: %(default)s)")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="share of the requests that fail (default: %(default)s)")
+    parser.add_argument('--error-status', type=int, default=500, help="HTTP status of the failed requests, e.g. 500 or 429 (default: %(default)s)")
+    parser.add_argument('--seed', type=int, default=None, help="seed of the random latency and errors")
+    return parser
+
+if __name__ == '__main__':
+    args = build_parser().parse_args()
+    server = ThreadingHTTPServer((args.host, args.port), StubModelHandler)
+    server.daemon_threads = True
+    server.model = StubModel(args.latency, args.jitter, args.error_rate, args.error_status, args.seed)
+    print(f"Stub model listening on http://{args.host}:{server.server_address[1]}/v1")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,151 @@
+import argparse
+import os
+import random
+import re
+from datetime import datetime, timedelta
+
+from bet_stream import BetFragmentParser, iter_bet_fragments
+
+# The example exports the synthetic bets are built from
+EXAMPLE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Example')
+
+# The container element that wraps all bets of an export, per bookmaker
+OPEN_CONTAINERS = {
+    'bet365': '<div class="hl-SummaryRenderer_Container ">\n',
+    'fanduel': '<div data-v-6813858d="" class="stmnt-bets">\n',
+}
+
+# The most recent time a synthetic bet is placed at; every following bet is placed earlier
+START_TIME = datetime(2024, 7, 3, 21, 0, 0)
+
+def load_templates(bookmaker):
+    """
+    Loads the bet summaries of the example export of a bookmaker.
+
+    Parameters:
+    - bookmaker: Either 'bet365' or 'fanduel'.
+
+    Returns:
+    The raw HTML of each bet summary in the example export.
+    """
+    if bookmaker == 'bet365':
+        return list(iter_bet_fragments(os.path.join(EXAMPLE_DIR, 'bet365.html'), 'h-BetSummary', 'div'))
+    return list(iter_bet_fragments(os.path.join(EXAMPLE_DIR, 'fanduel.html'), 'stmnt-bet'))
+
+def bet365_bonus_bet(fragment):
+    """
+    Turns a Bet365 bet summary into a bonus bet, which uses the IPOffer stake and return section.
+    """
+    fragment = fragment.replace('h-StakeReturnSection_StakeContainer', 'h-StakeReturnSectionIPOffer_StakeDetails')
+    return fragment.replace('h-StakeReturnSection_ReturnText', 'h-StakeReturnSectionIPOffer_ReturnContainer')
+
+def fanduel_legs(fragment):
+    """
+    Returns the raw HTML of each leg of a FanDuel bet summary.
+    """
+    parser = BetFragmentParser('leg', 'div')
+    parser.feed(fragment)
+    parser.close()
+    return parser.pop_fragments()
+
+def fanduel_parlay(fragment, legs):
+    """
+    Turns a FanDuel single bet summary into a parlay with the given legs.
+    """
+    first = fanduel_legs(fragment)[0]
+    fragment = fragment.replace(first, '\n'.join(legs))
+    return fragment.replace('bet-type-S single-leg', 'bet-type-P multi-leg')
+
+def fanduel_bonus_bet(fragment, wager):
+    """
+    Adds the bonus bet section to a FanDuel bet summary.
+    """
+    bonus = ('<div data-v-6813858d="" class="bonus-bets"><span data-v-6813858d="" class="bonus-amount">'
+             + wager + '</span> <span data-v-6813858d="" class="bonus-text">Bonus Bet</span></div>')
+    return fragment.replace('<div data-v-6813858d="" class="betfooter">',
+                            '<div data-v-6813858d="" class="betfooter">' + bonus, 1)
+
+def synthetic_bet(bookmaker, templates, index, rng, parlay_rate=0.3, bonus_rate=0.1):
+    """
+    Builds the HTML of one synthetic bet summary from the example templates.
+
+    Every bet gets a unique placement time (and, for FanDuel, a unique bet ID), so the bets never
+    collide. The templates already mix singles, parlays and boosts; bonus bets and FanDuel parlays
+    are added at the given rates.
+
+    Parameters:
+    - bookmaker: Either 'bet365' or 'fanduel'.
+    - templates: The example bet summaries of the bookmaker.
+    - index: The position of the bet in the export (0 is the most recent).
+    - rng: The random.Random instance used to pick templates and variants.
+    - parlay_rate: The share of FanDuel bets turned into parlays.
+    - bonus_rate: The share of bets turned into bonus bets.
+
+    Returns:
+    The HTML of the bet summary.
+    """
+    placed = START_TIME - timedelta(minutes=7 * index, seconds=index % 60)
+    fragment = rng.choice(templates)
+
+    if bookmaker == 'bet365':
+        fragment = re.sub(r'(h-BetSummary_DateAndTime ">)[^<]*', r'\g<1>' + placed.strftime('%m/%d/%Y %H:%M:%S'), fragment)
+        if rng.random() < bonus_rate:
+            fragment = bet365_bonus_bet(fragment)
+        return fragment
+
+    fragment = re.sub(r'#\d+\.\d+', f"#{90000000 + index}.25", fragment)
+    placed_text = placed.strftime('%b %d, %Y %I:%M%p').replace(' 0', ' ')
+    fragment = re.sub(r'(class="time"><span[^>]*>Placed: </span> <span[^>]*>)[^<]*', r'\g<1>' + placed_text + ' ', fragment)
+
+    if rng.random() < parlay_rate:
+        legs = [fanduel_legs(rng.choice(templates))[0] for _ in range(rng.randint(2, 4))]
+        fragment = fanduel_parlay(fragment, legs)
+    if rng.random() < bonus_rate:
+        wager = re.search(r'class="betstake">\s*<div[^>]*><span[^>]*>([^<]*)', fragment).group(1)
+        fragment = fanduel_bonus_bet(fragment, wager)
+    return fragment
+
+def iter_export(bookmaker, bets, seed=0, parlay_rate=0.3, bonus_rate=0.1):
+    """
+    Yields the HTML of a synthetic export piece by piece, so exports of any size can be written without building them in memory.
+
+    Parameters:
+    - bookmaker: Either 'bet365' or 'fanduel'.
+    - bets: The number of bets in the export.
+    - seed: The seed of the random choices, so the same arguments always give the same export.
+    - parlay_rate, bonus_rate: As for synthetic_bet.
+
+    Returns:
+    A generator of HTML strings.
+    """
+    templates = load_templates(bookmaker)
+    rng = random.Random(seed)
+
+    yield OPEN_CONTAINERS[bookmaker]
+    for index in range(bets):
+        yield '    ' + synthetic_bet(bookmaker, templates, index, rng, parlay_rate, bonus_rate) + '\n'
+    yield '</div>\n'
+
+def write_export(path, bookmaker, bets, seed=0, parlay_rate=0.3, bonus_rate=0.1):
+    """
+    Writes a synthetic export to a file.
+
+    Parameters:
+    - path: The path of the HTML file to write.
+    - bookmaker, bets, seed, parlay_rate, bonus_rate: As for iter_export.
+    """
+    with open(path, 'w') as f:
+        for piece in iter_export(bookmaker, bets, seed, parlay_rate, bonus_rate):
+            f.write(piece)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Generate a synthetic bet history export from the example exports.")
+    parser.add_argument('bookmaker', choices=list(OPEN_CONTAINERS))
+    parser.add_argument('bets', type=int, help="number of bets in the export")
+    parser.add_argument('output', help="the html file to write")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--parlay-rate', type=float, default=0.3, help="share of FanDuel bets turned into parlays (default: %(default)s)")
+    parser.add_argument('--bonus-rate', type=float, default=0.1, help="share of bets turned into bonus bets (default: %(default)s)")
+    args = parser.parse_args()
+
+    write_export(args.output, args.bookmaker, args.bets, args.seed, args.parlay_rate, args.bonus_rate)
@@ -0,0 +1,62 @@
+import asyncio
+import random
+
+import async_classifier
+from async_classifier import RateLimiter, StubChain, aclassify_selections, classify_bets
+from config import LLM
+
+def bets(count):
+    return [{'selection': f"Selection {i}", 'bet_type': '', 'sport': ''} for i in range(count)]
+
+def test_failed_requests_are_retried_with_backoff(monkeypatch):
+    delays = []
+    sleep = asyncio.sleep
+    async def record_sleep(delay):
+        if delay:
+            delays.append(delay)
+        await sleep(0)
+    monkeypatch.setattr(async_classifier.asyncio, 'sleep', record_sleep)
+
+    # half the requests fail, but each selection gets enough retries to succeed
+    random.seed(1)
+    chain = StubChain(latency=0, failure_rate=0.5, sport='NBA', bet_type='Winner')
+    outputs = asyncio.run(aclassify_selections(LLM(chain=chain), [f"Selection {i}" for i in range(20)], retries=12, backoff=0.1))
+    assert all(output.sport == 'NBA' for output in outputs)
+    assert chain.calls == 20 + len(delays) > 20
+
+    # every retry waits twice as long as the one before, plus up to half of it as jitter
+    delays.clear()
+    chain = StubChain(latency=0, failure_rate=1.0)
+    assert asyncio.run(aclassify_selections(LLM(chain=chain), ['Selection'], retries=3, backoff=1.0)) == [None]
+    assert chain.calls == 4
+    assert [1.0 <= delays[0] <= 1.5, 2.0 <= delays[1] <= 3.0, 4.0 <= delays[2] <= 6.0] == [True] * 3
+
+def test_rate_limiter_spaces_request_starts():
+    async def starts(rate, count):
+        limiter = RateLimiter(rate)
+        loop = asyncio.get_running_loop()
+        async def start():
+            await limiter.acquire()
+            return loop.time()
+        return sorted(await asyncio.gather(*[start() for _ in range(count)]))
+
+    times = asyncio.run(starts(50, 10))
+    assert all(later - earlier >= 0.02 - 0.002 for earlier, later in zip(times, times[1:]))
+    assert times[-1] - times[0] >= 9 * 0.02 - 0.002
+
+def test_concurrency_cap_is_never_exceeded():
+    for concurrency in [1, 4]:
+        chain = StubChain(latency=0.005, sport='NBA', bet_type='Winner')
+        classified = classify_bets(LLM(chain=chain), bets(30), concurrency=concurrency)
+        assert chain.max_in_flight == concurrency
+        assert all(bet_output['sport'] == 'NBA' for bet_output in classified)
+
+def test_failed_bets_are_left_unclassified_as_in_run_llm():
+    chain = StubChain(latency=0, sport='NBA', bet_type='Winner', failing_inputs=['Selection 3', 'Selection 7'])
+    llm = LLM(chain=chain)
+
+    concurrent = classify_bets(llm, bets(10), concurrency=4, retries=1, backoff=0)
+    serial = [llm.run_llm(bet_output) for bet_output in bets(10)]
+    assert concurrent == serial
+    assert [bet_output['sport'] for bet_output in concurrent] == ['NBA'] * 3 + [''] + ['NBA'] * 3 + [''] + ['NBA'] * 2
+    assert concurrent[3]['bet_type'] == ''
@@ -0,0 +1,59 @@
+from bet_extractor import Bet365, Fanduel
+from bet_ledger import BetLedger
+from bet_stream import iter_bet_fragments
+
+def example_bets(bet_extractor, html_file, replace=None):
+    bets = []
+    for fragment in iter_bet_fragments(html_file, bet_extractor.summary_class, bet_extractor.summary_tag):
+        if replace:
+            fragment = fragment.replace(*replace)
+        bets.append(bet_extractor.extract_bet_details(bet_extractor.parse_fragment(fragment)))
+    return bets
+
+def statuses(bet_extractor, all_bet_details):
+    scalar = [bet_extractor.process_extracted_details(bet_details).bet_status for bet_details in all_bet_details]
+    batch = [bet_output.bet_status for bet_output in bet_extractor.process_batch(all_bet_details)[0]]
+    assert scalar == batch
+    return scalar
+
+def test_settled_bets_are_never_pending():
+    assert 'P' not in statuses(Bet365(), example_bets(Bet365(), 'Example/bet365.html'))
+    assert 'P' not in statuses(Fanduel(), example_bets(Fanduel(), 'Example/fanduel.html'))
+
+def test_open_bet365_bets_are_pending():
+    all_bet_details = example_bets(Bet365(), 'Example/bet365.html', ('>Return $', '>To Return $'))
+    assert set(statuses(Bet365(), all_bet_details)) == {'P'}
+
+def test_open_fanduel_bets_are_pending():
+    all_bet_details = example_bets(Fanduel(), 'Example/fanduel.html', ('betstatus-won', 'betstatus-open'))
+    assert statuses(Fanduel(), all_bet_details).count('P') == 7
+
+def test_pending_bets_are_processed_again(tmp_path):
+    bet_extractor = Fanduel()
+    open_bet, settled_bet = [bet_extractor.process_extracted_details(bet_details) for bet_details in
+                             example_bets(bet_extractor, 'Example/fanduel.html', ('betstatus-won', 'betstatus-open'))[:2]]
+    assert (open_bet.bet_status, settled_bet.bet_status) == ('P', 'N')
+
+    ledger = BetLedger(str(tmp_path / 'ledger.sqlite'))
+    ledger.record('fanduel', open_bet)
+    ledger.record('fanduel', settled_bet)
+    assert ledger.needs_processing('fanduel', open_bet.bet_id)
+    assert not ledger.needs_processing('fanduel', settled_bet.bet_id)
+    ledger.close()
+
+def test_batch_processing_matches_the_per_bet_path():
+    from bet_analytics import implied_probability
+
+    for bet_extractor, html_file in [(Bet365(), 'Example/bet365.html'), (Fanduel(), 'Example/fanduel.html')]:
+        all_bet_details = example_bets(bet_extractor, html_file)
+        bet_outputs, typed_columns = bet_extractor.process_batch(all_bet_details)
+        assert bet_outputs == [bet_extractor.process_extracted_details(bet_details) for bet_details in all_bet_details]
+        assert typed_columns['bet_id'].tolist() == [bet_output.bet_id for bet_output in bet_outputs]
+        assert typed_columns['odds'].tolist() == [float(bet_output.odds) for bet_output in bet_outputs]
+        assert typed_columns['implied_probability'].tolist() == [implied_probability(bet_output.odds) for bet_output in bet_outputs]
+
+def test_processing_prints_nothing(capsys):
+    for bet_extractor, html_file in [(Bet365(), 'Example/bet365.html'), (Fanduel(), 'Example/fanduel.html')]:
+        for bet_details in example_bets(bet_extractor, html_file):
+            bet_extractor.process_extracted_details(bet_details)
+    assert capsys.readouterr().out == ''
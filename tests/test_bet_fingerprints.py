@@ -0,0 +1,54 @@
+from datetime import datetime, timedelta
+
+from bet_fingerprints import FingerprintIndex
+
+PLACED = datetime(2024, 6, 18, 19, 5, 7)
+LEGS = [{'name': 'Money Line - CHI Cubs', 'info': None}]
+
+def assign(index, placed=PLACED, stake='20.00', export='/x/bet365.html', occurrence=1):
+    bet_id = placed.strftime('%d%m%Y%H%M%S')
+    return index.assign('bet365', bet_id, placed, stake, 'N', '+150', LEGS, export, occurrence)
+
+def kinds(index):
+    return [(row[0], row[2], row[3]) for row in index.conflict_rows()]
+
+def test_export_overwritten_in_another_time_zone_is_a_duplicate(tmp_path):
+    path = str(tmp_path / 'fingerprints.sqlite')
+    index = FingerprintIndex(path)
+    assert assign(index) == '18062024190507'
+    index.close()
+
+    # the next run reads the same file, exported again an hour ahead
+    index = FingerprintIndex(path)
+    assert assign(index, PLACED + timedelta(hours=1)) == '18062024190507'
+    assert kinds(index) == [('duplicate', '18062024200507', '18062024190507')]
+    index.close()
+
+def test_the_watch_service_starts_a_run_for_every_export():
+    index = FingerprintIndex(None)
+    assert assign(index) == '18062024190507'
+    index.start_run()
+    assert assign(index, PLACED - timedelta(hours=3, minutes=30)) == '18062024190507'
+    assert index.stats()['duplicates'] == 1
+
+def test_bets_an_hour_apart_in_one_export_are_different_bets():
+    index = FingerprintIndex(None)
+    assert assign(index) == '18062024190507'
+    assert assign(index, PLACED + timedelta(hours=1)) == '18062024200507'
+    assert kinds(index) == []
+
+def test_bets_that_share_an_id_are_suffixed(tmp_path):
+    path = str(tmp_path / 'fingerprints.sqlite')
+    index = FingerprintIndex(path)
+    assert [assign(index, stake=stake, occurrence=occurrence) for occurrence, stake in enumerate(['10.00', '20.00', '30.00'], 1)] \
+        == ['18062024190507', '18062024190507_2', '18062024190507_3']
+    index.close()
+
+    # a later run keeps the IDs of the bets it has seen and gives a new bet the next free suffix
+    index = FingerprintIndex(path)
+    assert assign(index, stake='20.00', export='/x/bet365 (1).html', occurrence=2) == '18062024190507_2'
+    assert assign(index, stake='40.00', export='/x/bet365 (1).html') == '18062024190507_4'
+    assert kinds(index) == [('collision', '18062024190507', '18062024190507_2'),
+                            ('collision', '18062024190507', '18062024190507_3'),
+                            ('collision', '18062024190507', '18062024190507_4')]
+    index.close()
@@ -0,0 +1,17 @@
+import pytest
+
+from bet_record import Bet365Details, ProcessedBet
+
+def test_misspelled_fields_raise():
+    with pytest.raises(TypeError, match='odd'):
+        ProcessedBet(bet_id='1', odd='+150')
+    bet_output = ProcessedBet(bet_id='1', odds='+150')
+    with pytest.raises(KeyError):
+        bet_output['sports'] = 'NBA'
+    with pytest.raises(AttributeError):
+        bet_output.sports = 'NBA'
+
+def test_fields_that_are_not_set_are_none():
+    bet_details = Bet365Details(odds='+150')
+    assert bet_details['odds'] == '+150'
+    assert bet_details['stake'] is None and bet_details.get('legs', []) == []
@@ -0,0 +1,24 @@
+from bet_stream import iter_bet_fragments
+
+EXPORT = """<html><body><div class="history">
+<div class="bet"><p>Lakers -5.5<p>Stake $10.00<br></div>
+<div class="bet"><ul><li>Over 1.5 Goals<li>Under 9.5 Goals</ul><img src="boost.png"></div>
+<div class="bet"><div class="legs"><p>Money Line - CHI Cubs</div>
+<div class="bet"><span>Match result will be Brazil</span></div>
+</div></body></html>
+"""
+
+def test_unclosed_tags_do_not_merge_bets(tmp_path):
+    html_file = tmp_path / 'export.html'
+    html_file.write_text(EXPORT)
+
+    # small chunks, so tags are split across reads
+    for chunk_size in [7, 64 * 1024]:
+        fragments = list(iter_bet_fragments(str(html_file), 'bet', 'div', chunk_size))
+        assert fragments == [
+            '<div class="bet"><p>Lakers -5.5<p>Stake $10.00<br></div>',
+            '<div class="bet"><ul><li>Over 1.5 Goals<li>Under 9.5 Goals</ul><img src="boost.png"></div>',
+            # the third bet is never closed, so it ends where the next one starts
+            '<div class="bet"><div class="legs"><p>Money Line - CHI Cubs</div>\n',
+            '<div class="bet"><span>Match result will be Brazil</span></div>',
+        ]
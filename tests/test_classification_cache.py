@@ -0,0 +1,65 @@
+import itertools
+
+import pytest
+
+import classification_cache
+from classification_cache import ClassificationCache
+
+@pytest.fixture
+def clock(monkeypatch):
+    # a clock that moves one second on every reading, so entries are ordered by use
+    ticks = itertools.count(1000)
+    monkeypatch.setattr(classification_cache.time, 'time', lambda: float(next(ticks)))
+
+def test_lookups_and_new_entries_are_written_once_per_run(tmp_path, clock):
+    path = str(tmp_path / 'cache.sqlite')
+    cache = ClassificationCache('v1', path)
+    changes = cache.connection.total_changes
+
+    assert cache.get('Lakers -5.5') is None
+    cache.put('Lakers -5.5', 'NBA', 'Winner')
+    assert cache.get('LAKERS  -5.5') == ('NBA', 'Winner')
+    assert cache.connection.total_changes == changes
+
+    cache.close()
+    cache = ClassificationCache('v1', path)
+    assert cache.get('Lakers -5.5') == ('NBA', 'Winner')
+    assert ClassificationCache('v2', path).get('Lakers -5.5') is None
+    assert cache.stats()['hits'] == 1
+    cache.close()
+
+def test_least_recently_used_entries_are_evicted_over_the_limit(tmp_path, clock):
+    path = str(tmp_path / 'cache.sqlite')
+    cache = ClassificationCache('v1', path, max_entries=3)
+    for i in range(3):
+        cache.put(f"Selection {i}", 'NBA', 'Winner')
+
+    # below the limit the entries are only counted
+    def evict(now=None):
+        raise AssertionError("evicted below max_entries")
+    cache.evict = evict
+    cache.save()
+    assert cache.entries == 3
+    del cache.evict
+
+    assert cache.get('Selection 0') == ('NBA', 'Winner')
+    cache.put('Selection 3', 'NBA', 'Winner')
+    cache.put('Selection 4', 'NBA', 'Winner')
+    cache.close()
+
+    cache = ClassificationCache('v1', path, max_entries=3)
+    assert cache.entries == 3
+    assert [cache.get(f"Selection {i}") is not None for i in range(5)] == [True, False, False, True, True]
+    cache.close()
+
+def test_expired_entries_are_ignored_and_removed(tmp_path, clock):
+    path = str(tmp_path / 'cache.sqlite')
+    cache = ClassificationCache('v1', path, ttl=10)
+    cache.put('Lakers -5.5', 'NBA', 'Winner')
+    cache.save()
+    for _ in range(20):
+        classification_cache.time.time()
+    assert cache.get('Lakers -5.5') is None
+    cache.close()
+
+    assert ClassificationCache('v1', path, ttl=10).entries == 0
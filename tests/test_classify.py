@@ -0,0 +1,28 @@
+import bet_parsers
+from async_classifier import StubChain
+from bet_fingerprints import occurrence_keys
+from classification_cache import ClassificationCache
+from config import LLM
+from run_bet_extractor import classify, extract_file, parse_args, process_extracted
+
+def processed_example(args):
+    result = extract_file('Example/fanduel.html', 'fanduel')
+    return process_extracted({'fanduel': dict(occurrence_keys(result['bets']))}, args)
+
+def test_classify_leaves_the_cache_of_a_shared_llm_open(tmp_path):
+    args = parse_args(['--no-rules', '--no-per-leg', '--serial-llm'])
+    llm = LLM(cache=ClassificationCache('test', str(tmp_path / 'cache.sqlite')), chain=StubChain(latency=0, sport='NBA', bet_type='Winner'))
+
+    # the watch service classifies every export with the same LLM
+    for _ in range(2):
+        processed = processed_example(args)
+        classify(processed, args, llm)
+        assert processed['fanduel']
+        assert all(bet_output.sport == 'NBA' for bet_output, bet_details in processed['fanduel'])
+
+    assert llm.cache.stats()['hits'] > 0
+    llm.cache.close()
+
+def test_every_registered_parser_backend_can_be_chosen(monkeypatch):
+    monkeypatch.setitem(bet_parsers.BACKENDS, 'html5', bet_parsers.SoupBackend)
+    assert [parse_args(['--parser-backend', name]).parser_backend for name in ['bs4', 'html5', 'lxml']] == ['bs4', 'html5', 'lxml']
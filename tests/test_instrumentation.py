@@ -0,0 +1,41 @@
+import pickle
+
+import pytest
+
+from bet_amounts import extract_numbers
+from instrumentation import BUCKET_BOUNDS, Metrics, metrics
+
+def test_histograms_have_a_fixed_size():
+    registry = Metrics()
+    for i in range(1, 20001):
+        registry.observe('latency_seconds', i / 10000)
+
+    histogram = registry.histograms['latency_seconds']
+    assert len(histogram.counts) == len(BUCKET_BOUNDS) + 1
+    summary = registry.summary()['histograms']['latency_seconds']
+    assert summary['count'] == 20000
+    assert summary['max'] == 2.0
+    for name, value in [('p50', 1.0), ('p90', 1.8), ('p99', 1.98)]:
+        assert value <= summary[name] <= value * 1.19
+
+def test_worker_histograms_merge_into_the_same_summary():
+    direct = Metrics()
+    combined = Metrics()
+    for worker in range(3):
+        registry = Metrics()
+        for i in range(1, 1001):
+            registry.observe('latency_seconds', worker + i / 1000)
+            direct.observe('latency_seconds', worker + i / 1000)
+        # drained metrics are sent from the worker processes pickled
+        combined.merge(pickle.loads(pickle.dumps(registry.drain())))
+
+    merged = combined.summary()['histograms']['latency_seconds']
+    expected = direct.summary()['histograms']['latency_seconds']
+    assert merged.pop('sum') == pytest.approx(expected.pop('sum'))
+    assert merged.pop('mean') == pytest.approx(expected.pop('mean'))
+    assert merged == expected
+
+def test_extract_numbers_is_not_timed():
+    metrics.reset()
+    assert extract_numbers('Stake $20.00, Return $52.50') == ['20.00', '52.50']
+    assert 'extract_numbers_seconds' not in metrics.histograms
@@ -0,0 +1,46 @@
+from types import SimpleNamespace
+
+from leg_classifier import LegClassifier
+
+class Legs():
+    # an extractor whose bet details are the legs themselves
+    def leg_selections(self, bet_details):
+        return bet_details
+
+def test_legs_are_classified_once_across_bookmakers():
+    sent = []
+    def classify_selections(llm, selections):
+        sent.extend(selections)
+        return [SimpleNamespace(sport='NBA') for _ in selections]
+
+    leg_classifier = LegClassifier(None, classify_selections)
+    bet365 = [['Brittney Griner: 25+ Points', 'Lakers -5.5'], ['Lakers -5.5', 'Suns +5.5']]
+    fanduel = [['brittney griner:  25+ points', 'Celtics -3.5'], ['Single leg']]
+    bet365_outputs = [{'sport': ''} for _ in bet365]
+    fanduel_outputs = [{'sport': ''} for _ in fanduel]
+
+    assert leg_classifier.apply(bet365_outputs, bet365, Legs()) == ([], [])
+    assert leg_classifier.apply(fanduel_outputs, fanduel, Legs()) == ([fanduel_outputs[1]], [['Single leg']])
+
+    assert sent == ['Brittney Griner: 25+ Points', 'Lakers -5.5', 'Suns +5.5', 'Celtics -3.5']
+    assert [bet_output['sport'] for bet_output in bet365_outputs + fanduel_outputs[:1]] == ['NBA'] * 3
+    assert leg_classifier.stats() == {'legs': 6, 'unique_legs': 4, 'rule_legs': 0, 'llm_legs': 4}
+
+def test_failed_legs_are_retried_and_leave_the_sport_empty():
+    failing = {'Lakers -5.5', 'Suns +5.5'}
+    sent = []
+    def classify_selections(llm, selections):
+        sent.extend(selections)
+        return [None if selection in failing else SimpleNamespace(sport='Unknown') for selection in selections]
+
+    leg_classifier = LegClassifier(None, classify_selections)
+    bets = [['Lakers -5.5', 'Suns +5.5'], ['Lakers -5.5', 'Celtics -3.5']]
+    bet_outputs = [{'sport': ''} for _ in bets]
+    leg_classifier.apply(bet_outputs, bets, Legs())
+    # every leg failed, or the LLM did not know the sport of the one that did not
+    assert [bet_output['sport'] for bet_output in bet_outputs] == ['', 'Unknown']
+
+    failing.clear()
+    sent.clear()
+    leg_classifier.apply(bet_outputs[:1], bets[:1], Legs())
+    assert sent == ['Lakers -5.5', 'Suns +5.5']
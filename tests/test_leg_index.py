@@ -0,0 +1,24 @@
+from leg_index import Leg, LegIndex, parse_leg
+
+def test_bet365_market_suffix_is_not_part_of_the_market():
+    assert parse_leg('Walker Buehler 7+ Strikeouts - Walker Buehler - Alt Strikeouts') == Leg('walker buehler', 'strikeouts', 6.5, 'over')
+    assert parse_leg('Over (3.5) - Los Angeles Angels - Alt. Total Runs') == Leg('los angeles angels', 'total runs', 3.5, 'over')
+    assert parse_leg('A Run in the Top of the 1st - No') == Leg(None, 'a run in the top of the 1st', None, 'no')
+
+def test_team_selections_and_spreads():
+    assert parse_leg('Toronto Maple Leafs') == Leg('toronto maple leafs', None, None, None)
+    assert parse_leg('Toronto Maple Leafs', 'Moneyline') == Leg('toronto maple leafs', 'moneyline', None, None)
+    assert parse_leg('Lakers -5.5') == Leg('lakers', 'spread', -5.5, None)
+    assert parse_leg('MIA Marlins (+1.5)', 'Run Line') == Leg('mia marlins', 'run line', 1.5, None)
+
+def test_queries_by_entity_and_market():
+    index = LegIndex()
+    index.add('bet365', '1', [{'name': 'Walker Buehler 7+ Strikeouts - Walker Buehler - Alt Strikeouts', 'info': None}])
+    index.add('fanduel', '2', [{'name': 'Walker Buehler 7+ Strikeouts', 'info': 'Walker Buehler - Alt Strikeouts'},
+                               {'name': 'Toronto Maple Leafs', 'info': 'Moneyline'}])
+    index.add('bet365', '3', [{'name': 'Lakers -5.5', 'info': None}])
+
+    assert index.bets(market='Strikeouts') == [('bet365', '1'), ('fanduel', '2')]
+    assert index.bets('Walker Buehler', 'Alt Strikeouts') == [('bet365', '1'), ('fanduel', '2')]
+    assert index.bets('Toronto Maple Leafs') == [('fanduel', '2')]
+    assert index.bets('Lakers', 'Spread') == [('bet365', '3')]
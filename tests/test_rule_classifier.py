@@ -0,0 +1,34 @@
+from rule_classifier import RuleClassifier
+
+def test_specific_bet_types_win_over_generic_ones():
+    rules = RuleClassifier()
+    assert rules.classify('Aaron Judge 1+ Home Runs') == ('MLB', 'To Hit Home Run')
+    assert rules.classify('Aaron Judge 2+ Home Runs') == ('MLB', 'Over / Under')
+    assert rules.classify('Yankees Not to Win') == ('MLB', 'Not to Win')
+    assert rules.classify('Yankees to Win') == ('MLB', 'Winner')
+
+def test_markets_shared_by_other_sports_are_left_to_the_llm():
+    rules = RuleClassifier()
+    assert rules.classify('Connor McDavid Over 2.5 Hits') is None
+    assert rules.classify('Igor Shesterkin Over 28.5 Saves') is None
+    assert rules.classify('Jayson Tatum Over 9.5 Field Goals Made') is None
+    assert rules.classify('Connor McDavid Over 2.5 Hits', 'Edmonton Oilers @ Florida Panthers') == ('NHL', 'Over / Under')
+
+def test_team_names_and_vetoes():
+    rules = RuleClassifier()
+    assert rules.classify('Lakers Over 220.5') == ('NBA', 'Over / Under')
+    # a team name inside a longer word is not a match
+    assert rules.classify('Sunsets Over 220.5') is None
+    # two sports, or a league without a label of its own
+    assert rules.classify('Lakers to Win', 'Yankees') is None
+    assert rules.classify('Aces to Win', 'WNBA') is None
+
+def test_compound_boosts_are_left_to_the_llm():
+    rules = RuleClassifier()
+    assert rules.classify('Player A 25+ Points', 'NBA') == ('NBA', 'Over / Under')
+    assert rules.classify('Player A 25+ Points & Player B 8+ Rebounds', 'NBA') is None
+    assert rules.classify('Aaron Judge 1+ Home Runs & Juan Soto 1+ Home Runs') is None
+    # a market suffix does not count as a second line
+    assert rules.classify('Over (3.5) - Los Angeles Angels - Alt. Total Runs') == ('MLB', 'Over / Under')
+    # multi bets only need the sport
+    assert rules.classify('Player A 25+ Points & Player B 8+ Rebounds', 'NBA', need_bet_type=False) == ('NBA', None)
@@ -0,0 +1,68 @@
+from datetime import datetime
+
+import openpyxl
+import pytest
+
+from bet_record import ProcessedBet
+from run_bet_extractor import parse_args
+from tracker_writer import FIRST_DATA_ROW, HEADER_ROW, check_tracker, upsert_tracker
+
+HEADERS = ['Date', 'Notes', 'Bookmaker', 'Sport / League', 'Selection', 'Stake', 'Odds (US)', 'Profit']
+
+def make_tracker(path, rows):
+    # a title block above the headers, as in the real tracker
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.title = 'Bets'
+    sheet['A1'] = 'Betting Tracker'
+    for column, header in enumerate(HEADERS, 1):
+        sheet.cell(HEADER_ROW, column).value = header
+    for row_number, values in enumerate(rows, FIRST_DATA_ROW):
+        for column, value in enumerate(values, 1):
+            sheet.cell(row_number, column).value = value
+    workbook.save(path)
+
+def read_rows(path):
+    sheet = openpyxl.load_workbook(path)['Bets']
+    return [list(values) for values in sheet.iter_rows(min_row=FIRST_DATA_ROW, max_col=len(HEADERS), values_only=True)]
+
+def bet(bet_id, selection='Lakers -5.5', wager='10.00', odds='+150'):
+    return ProcessedBet(bet_id=bet_id, bookmaker='FanDuel', sport='NBA', selection=selection, wager=wager, odds=odds)
+
+def test_bets_are_upserted_by_id_and_sorted_by_date(tmp_path):
+    path = str(tmp_path / 'tracker.xlsx')
+    # Excel keeps the IDs as numbers, and the profit column holds formulas on the stake
+    make_tracker(path, [[datetime(2024, 7, 3), 20240703210000, 'Bet365', 'MLB', 'Yankees to Win', 20, 150, '=F11*G11/100'],
+                        [datetime(2024, 7, 1), 87120469.25, 'FanDuel', 'NBA', 'Celtics', 5, -110, '=F12*100/-G12']])
+
+    selection = '1. Lakers -5.5\n2. Celtics Over 220.5'
+    updated, inserted = upsert_tracker(path, [bet('87120469.25', wager='7.50'), bet('20240702120000', selection, odds='+264')],
+                                       [datetime(2024, 7, 1), datetime(2024, 7, 2)])
+    assert (updated, inserted) == (1, 1)
+
+    assert read_rows(path) == [
+        [datetime(2024, 7, 1), 87120469.25, 'FanDuel', 'NBA', 'Lakers -5.5', 7.5, 150, '=F11*100/-G11'],
+        [datetime(2024, 7, 2), 20240702120000, 'FanDuel', 'NBA', selection, 10, 264, None],
+        [datetime(2024, 7, 3), 20240703210000, 'Bet365', 'MLB', 'Yankees to Win', 20, 150, '=F13*G13/100'],
+    ]
+
+    # the bets are found again under their numeric IDs
+    assert upsert_tracker(path, [bet('20240703210000'), bet('20240702120000', selection)],
+                          [datetime(2024, 7, 3), datetime(2024, 7, 2)]) == (2, 0)
+    assert len(read_rows(path)) == 3
+
+def test_a_bad_tracker_is_reported_before_the_run(tmp_path, capsys):
+    path = str(tmp_path / 'tracker.xlsx')
+    with pytest.raises(ValueError, match='does not exist'):
+        check_tracker(path)
+
+    make_tracker(path, [])
+    check_tracker(path)
+    with pytest.raises(ValueError, match="no 'Ledger' sheet"):
+        check_tracker(path, 'Ledger')
+    with pytest.raises(ValueError, match="no 'Ledger' sheet"):
+        upsert_tracker(path, [], [], 'Ledger')
+
+    with pytest.raises(SystemExit):
+        parse_args(['exports', '--tracker', str(tmp_path / 'missing.xlsx')])
+    assert 'missing.xlsx does not exist' in capsys.readouterr().err
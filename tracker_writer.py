@@ -0,0 +1,228 @@
+import os
+import re
+from datetime import date, datetime
+
+# Layout of the "Bets" sheet of the tracker workbook (see import_data.bas)
+SHEET_NAME = "Bets"
+HEADER_ROW = 9
+FIRST_DATA_ROW = 11
+MAX_COLUMN = 25  # columns A to Y
+
+# The tracker column that holds the bet ID, and the one the sheet is sorted by
+ID_COLUMN = 'Notes'
+DATE_COLUMN = 'Date'
+
+def index_key(value):
+    """
+    Returns the key of a bet ID in the index.
+
+    Excel stores IDs like "86904029.25" or "20240703210000" as numbers, so a cell may hold a float,
+    an int or a string for the same bet.
+    """
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+# Strings Excel turns into numbers when they are assigned to a cell
+NUMBER_PATTERN = re.compile(r'[+-]?\d+(?:\.\d+)?')
+
+def cell_value(value):
+    """
+    Converts a value the way Excel converts a string assigned to a cell (as import_data.bas does), so
+    stakes, odds and IDs stay numbers that the formulas of the tracker can use.
+    """
+    if isinstance(value, str) and NUMBER_PATTERN.fullmatch(value.strip()):
+        number = float(value)
+        return int(number) if number.is_integer() and '.' not in value else number
+    return value
+
+def sort_key(value):
+    """
+    Returns the sort key of a date cell, with empty or non-date cells last.
+    """
+    if isinstance(value, datetime):
+        return (0, value)
+    if isinstance(value, date):
+        return (0, datetime(value.year, value.month, value.day))
+    return (1, datetime.min)
+
+def header_columns(sheet):
+    """
+    Returns a dictionary mapping each header in the header row of the sheet to its column number
+    (the first column when a header repeats).
+    """
+    columns = {}
+    headers = next(sheet.iter_rows(min_row=HEADER_ROW, max_row=HEADER_ROW, max_col=MAX_COLUMN, values_only=True), ())
+    for column, header in enumerate(headers, 1):
+        if header is not None and str(header).strip() not in columns:
+            columns[str(header).strip()] = column
+    return columns
+
+def check_tracker(path, sheet_name=SHEET_NAME):
+    """
+    Checks that a tracker workbook can be upserted into, so a bad --tracker is reported before the
+    exports are extracted and classified rather than once the run is over.
+
+    Parameters:
+    - path: The path of the workbook.
+    - sheet_name: The name of the sheet that holds the bets.
+
+    Raises:
+    - ValueError: If the workbook does not exist or cannot be read, has no such sheet, or the sheet has
+                  no 'Notes' header.
+    """
+    import openpyxl
+
+    if not os.path.isfile(path):
+        raise ValueError(f"The tracker workbook {path} does not exist")
+    try:
+        workbook = openpyxl.load_workbook(path, read_only=True)
+    except Exception as error:
+        raise ValueError(f"The tracker workbook {path} cannot be read: {error}")
+    try:
+        if sheet_name not in workbook.sheetnames:
+            raise ValueError(f"The tracker workbook {path} has no '{sheet_name}' sheet")
+        if ID_COLUMN not in header_columns(workbook[sheet_name]):
+            raise ValueError(f"The '{sheet_name}' sheet of {path} has no '{ID_COLUMN}' column in row {HEADER_ROW}")
+    finally:
+        workbook.close()
+
+class TrackerWriter():
+    """
+    Upserts processed bets into the "Bets" sheet of the tracker workbook.
+
+    This replaces the ImportCSVtoBetsSheetAndSort macro in import_data.bas, which scans the whole Notes
+    column for every csv line and splits lines on raw commas. The writer reads the sheet once and
+    indexes the rows by bet ID, so each upsert is a dictionary lookup. It then writes the rows back in
+    one pass, sorted by date. The rows are already mostly sorted, so Python's sort runs in close to linear time.
+
+    Attributes:
+    - path: The path of the workbook.
+    - columns: A dictionary mapping each header of the sheet to its column number.
+    - rows: The data rows of the sheet, as lists of cell values.
+    - origins: The sheet row each line of rows was read from (None for new bets).
+    - index: A dictionary mapping each bet ID to its position in rows.
+    """
+    def __init__(self, path, sheet_name=SHEET_NAME):
+        """
+        Loads the workbook and indexes the rows of the sheet.
+
+        Parameters:
+        - path: The path of the .xlsx (or .xlsm) workbook.
+        - sheet_name: The name of the sheet that holds the bets.
+
+        Raises:
+        - ValueError: If the workbook has no such sheet, or the sheet has no 'Notes' header.
+        """
+        # imported here so openpyxl is only required when a workbook is written
+        import openpyxl
+        from openpyxl.formula.translate import Translator
+        self._translator = Translator
+
+        self.path = path
+        self.workbook = openpyxl.load_workbook(path, keep_vba=path.lower().endswith('.xlsm'))
+        if sheet_name not in self.workbook.sheetnames:
+            raise ValueError(f"The tracker workbook {path} has no '{sheet_name}' sheet")
+        self.sheet = self.workbook[sheet_name]
+
+        self.columns = header_columns(self.sheet)
+        if ID_COLUMN not in self.columns:
+            raise ValueError(f"The '{sheet_name}' sheet has no '{ID_COLUMN}' column in row {HEADER_ROW}")
+
+        # keep the row each line was read from, so the formulas can be moved with it
+        self.rows = []
+        self.origins = []
+        self.last_row = max(self.sheet.max_row, FIRST_DATA_ROW - 1)
+        for row_number, values in enumerate(self.sheet.iter_rows(min_row=FIRST_DATA_ROW, max_row=self.last_row, max_col=MAX_COLUMN, values_only=True), FIRST_DATA_ROW):
+            if any(value is not None for value in values):
+                self.rows.append(list(values))
+                self.origins.append(row_number)
+
+        id_position = self.columns[ID_COLUMN] - 1
+        self.index = {index_key(values[id_position]): position for position, values in enumerate(self.rows) if values[id_position] is not None}
+
+    def upsert(self, bets, dates):
+        """
+        Updates the bets that are already in the sheet and appends the new ones.
+
+        Parameters:
+        - bets: The processed bets (ProcessedBet records). Their fields are written to the tracker
+                columns declared in ProcessedBet.COLUMNS; columns the sheet does not have are ignored.
+        - dates: The date of each bet as a datetime, written to the 'Date' column in place of the text date of the record.
+
+        Returns:
+        A tuple with the number of updated and inserted bets.
+        """
+        updated = inserted = 0
+        for bet, placed in zip(bets, dates):
+            key = index_key(bet.bet_id)
+            position = self.index.get(key)
+            if position is None:
+                position = len(self.rows)
+                self.rows.append([None] * MAX_COLUMN)
+                self.origins.append(None)
+                self.index[key] = position
+                inserted += 1
+            else:
+                updated += 1
+
+            values = self.rows[position]
+            for field, header in bet.COLUMNS.items():
+                column = self.columns.get(header)
+                if column is not None:
+                    values[column - 1] = placed if header == DATE_COLUMN else cell_value(getattr(bet, field))
+
+        return updated, inserted
+
+    def save(self):
+        """
+        Sorts the rows by date and writes them back to the sheet in a single pass.
+
+        The workbook is saved to a temporary file that then replaces the old one, so a reader never
+        opens a half-written workbook.
+        """
+        date_position = self.columns[DATE_COLUMN] - 1 if DATE_COLUMN in self.columns else None
+        order = list(range(len(self.rows)))
+        if date_position is not None:
+            order.sort(key=lambda position: sort_key(self.rows[position][date_position]))
+
+        for row_number, position in enumerate(order, FIRST_DATA_ROW):
+            origin = self.origins[position]
+            for column, value in enumerate(self.rows[position], 1):
+                # move formulas with their row, as the sort in Excel does
+                if origin is not None and origin != row_number and isinstance(value, str) and value.startswith('='):
+                    value = self._translator(value, origin=f"A{origin}").translate_formula(f"A{row_number}")
+                self.sheet.cell(row_number, column).value = value
+
+        # clear the rows left over from empty lines that were dropped
+        for row_number in range(FIRST_DATA_ROW + len(order), self.last_row + 1):
+            for column in range(1, MAX_COLUMN + 1):
+                self.sheet.cell(row_number, column).value = None
+
+        temporary_path = os.path.join(os.path.dirname(os.path.abspath(self.path)), '.' + os.path.basename(self.path) + '.tmp')
+        self.workbook.save(temporary_path)
+        os.replace(temporary_path, self.path)
+
+        # the rows now sit where they were written
+        new_positions = {position: new_position for new_position, position in enumerate(order)}
+        self.rows = [self.rows[position] for position in order]
+        self.origins = list(range(FIRST_DATA_ROW, FIRST_DATA_ROW + len(self.rows)))
+        self.index = {key: new_positions[position] for key, position in self.index.items()}
+        self.last_row = max(self.last_row, FIRST_DATA_ROW + len(self.rows) - 1)
+
+def upsert_tracker(path, bets, dates, sheet_name=SHEET_NAME):
+    """
+    Upserts processed bets into the tracker workbook and saves it.
+
+    Parameters:
+    - path: The path of the workbook.
+    - bets, dates: As for TrackerWriter.upsert.
+    - sheet_name: The name of the sheet that holds the bets.
+
+    Returns:
+    A tuple with the number of updated and inserted bets.
+    """
+    writer = TrackerWriter(path, sheet_name)
+    counts = writer.upsert(bets, dates)
+    writer.save()
+    return counts